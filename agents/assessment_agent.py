@@ -2,12 +2,11 @@
 Assessment Agent - Behavioral Indicator Extractor
 Führt strukturierte STAR-Interviews durch und bewertet EI-Komponenten.
 """
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from agents.state import AgentState
+from agents.llm import create_chat_model
 from dotenv import load_dotenv
 import json
-import os
 
 load_dotenv()
 
@@ -20,10 +19,7 @@ class AssessmentAgent:
     
     def __init__(self):
         self.name = "Assessment"
-        self.llm = ChatOpenAI(
-            model=os.getenv("MODEL_NAME", "gpt-4o"),
-            temperature=0.3  # Niedriger für konsistentere Bewertung
-        )
+        self._llm = None
         
         # Few-Shot Example für bessere Calibration
         self.few_shot_example = {
@@ -37,6 +33,15 @@ class AssessmentAgent:
             "reasoning": "Starke Empathie-Signale: Emotionserkennung, aktives Zuhören, Validierung. Punkt Abzug weil Antizipation fehlt."
         }
     
+    @property
+    def llm(self):
+        """Chat-Modell erst bei Bedarf - das Scoring selbst braucht keinen LLM-Call."""
+        if self._llm is None:
+            self._llm = create_chat_model(
+                temperature=0.3  # Niedriger für konsistentere Bewertung
+            )
+        return self._llm
+    
     def calculate_final_score(self, state: AgentState) -> float:
         """
         Aggregiert alle Response-Analysen zu einem finalen Score.
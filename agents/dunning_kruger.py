@@ -4,6 +4,7 @@ Vergleicht Self-Report mit Agent-Assessment und klassifiziert Bias.
 """
 from typing import Literal
 from agents.state import AgentState
+from utils.framework import get_framework
 
 class DunningKrugerAnalyzer:
     """
@@ -18,6 +19,7 @@ class DunningKrugerAnalyzer:
         """
         Args:
             goleman_framework: Framework-Daten für Skill-Namen
+                (None = jeweils aktuelle Registry, folgt Hot Reloads)
         """
         self.framework = goleman_framework
     
@@ -73,8 +75,9 @@ class DunningKrugerAnalyzer:
         skill_id = state.get("selected_skill", "empathy")
         
         # Wenn Framework verfügbar, hole echten Namen
-        if self.framework and skill_id in self.framework.get("skills", {}):
-            skill_name = self.framework["skills"][skill_id]["name"]
+        framework = self.framework if self.framework is not None else get_framework().data
+        if skill_id in framework.get("skills", {}):
+            skill_name = framework["skills"][skill_id]["name"]
         else:
             # Fallback
             skill_name = "diese Kompetenz"
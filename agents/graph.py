@@ -3,25 +3,169 @@ LangGraph Workflow - Hierarchical Multi-Agent System
 Orchestriert Coordinator, Reflection und Assessment Agents.
 """
 from typing import Literal
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.callbacks import adispatch_custom_event
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 from agents.state import AgentState
 from agents.coordinator import CoordinatorAgent
-from agents.reflection_agent import ReflectionAgent
+from agents.reflection_agent import ReflectionAgent, ReflectionError
 from agents.assessment_agent import AssessmentAgent
 from agents.dunning_kruger import DunningKrugerAnalyzer
-import json
-from pathlib import Path
+from agents.prefetch import pending_analyses
+from utils.budget import BUDGET_DOWNGRADE
+from utils.framework import get_framework
+from utils.metrics import registry, metric_labels, track_llm_usage
+import asyncio
+import contextvars
+import os
+import threading
+import time
 
-# Load Framework für DK-Analyzer
-FRAMEWORK_PATH = Path("data/frameworks/goleman_framework.json")
-with open(FRAMEWORK_PATH, "r", encoding="utf-8") as f:
-    GOLEMAN_FRAMEWORK = json.load(f)
+# Agents werden erst beim ersten Zugriff erstellt (Cold Start: kein LLM-Client beim Import)
+_agents: dict = {}
+_agents_lock = threading.Lock()
 
-# Initialize Agents
-coordinator = CoordinatorAgent()
-reflection_agent = ReflectionAgent()
-assessment_agent = AssessmentAgent()
-dk_analyzer = DunningKrugerAnalyzer(goleman_framework=GOLEMAN_FRAMEWORK)
+_AGENT_FACTORIES = {
+    "coordinator": CoordinatorAgent,
+    "reflection_agent": lambda: ReflectionAgent(goleman_framework=get_framework().data),
+    "assessment_agent": AssessmentAgent,
+    # Ohne festes Framework: Skill-Namen immer aus der aktuellen Registry
+    "dk_analyzer": DunningKrugerAnalyzer
+}
+
+
+def _agent(name: str):
+    with _agents_lock:
+        if name not in _agents:
+            _agents[name] = _AGENT_FACTORIES[name]()
+        return _agents[name]
+
+
+def get_reflection_agent() -> ReflectionAgent:
+    return _agent("reflection_agent")
+
+
+def get_assessment_agent() -> AssessmentAgent:
+    return _agent("assessment_agent")
+
+
+def get_dk_analyzer() -> DunningKrugerAnalyzer:
+    return _agent("dk_analyzer")
+
+
+def warm_up() -> None:
+    """Erstellt alle Agents vorab (z.B. im Hintergrund beim App-Start)."""
+    for name in _AGENT_FACTORIES:
+        _agent(name)
+
+
+def __getattr__(name: str):
+    # Kompatibilität: graph.reflection_agent, GOLEMAN_FRAMEWORK & Co. wie früher als Modul-Attribute
+    if name in _AGENT_FACTORIES:
+        return _agent(name)
+    if name == "GOLEMAN_FRAMEWORK":
+        return get_framework().data
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Max. gleichzeitige Reflection-Calls pro Assessment
+REFLECTION_CONCURRENCY = int(os.getenv("REFLECTION_CONCURRENCY", "3"))
+
+# Custom Event Name für gestreamte Einzel-Analysen
+REFLECTION_ANSWER_EVENT = "reflection_answer"
+
+NODE_DURATION = registry.histogram(
+    "ei_node_duration_seconds", "Dauer eines LangGraph-Nodes", ("node", "skill")
+)
+
+
+def _record_node_timing(state: AgentState, node: str, duration: float, usage) -> None:
+    """
+    Exportiert die Node-Dauer als Histogramm und ergänzt den kompakten
+    Timing-Record in agent_decisions (ein Eintrag pro Graph-Run, für die XAI-Ansicht).
+    """
+    NODE_DURATION.observe(duration, node=node, skill=state.get("selected_skill") or "unknown")
+    
+    decisions = state.setdefault("agent_decisions", [])
+    timing = next((d for d in decisions if d.get("decision") == "node_timing"), None)
+    if timing is None:
+        timing = {"agent": "Timing", "decision": "node_timing", "total_ms": 0.0, "nodes": {}}
+        decisions.append(timing)
+    
+    record = {"ms": round(duration * 1000, 1)}
+    if usage.calls:
+        record.update(llm_calls=usage.calls, tokens=usage.tokens, cost_usd=round(usage.cost_usd, 5))
+    if usage.queue_wait:
+        record["queue_ms"] = round(usage.queue_wait * 1000, 1)
+    timing["nodes"][node] = record
+    timing["total_ms"] = round(timing["total_ms"] + record["ms"], 1)
+
+
+def _node_context(state: AgentState):
+    """Labels (Skill, Session) und Budget-Downgrade für alle LLM-Calls eines Nodes."""
+    return (
+        metric_labels(skill=state.get("selected_skill"), session=state.get("session_id")),
+        get_reflection_agent().downgraded(state.get("budget_status") == BUDGET_DOWNGRADE)
+    )
+
+
+def timed_node(node: str, func, afunc=None) -> RunnableLambda:
+    """Wrappt einen Node mit Timing, Labels, Budget-Downgrade und LLM-Usage-Erfassung."""
+    def run(state: AgentState) -> AgentState:
+        labels, downgrade = _node_context(state)
+        with labels, downgrade, track_llm_usage() as usage:
+            start = time.perf_counter()
+            result = func(state)
+        _record_node_timing(result, node, time.perf_counter() - start, usage)
+        return result
+    
+    async def arun(state: AgentState) -> AgentState:
+        labels, downgrade = _node_context(state)
+        with labels, downgrade, track_llm_usage() as usage:
+            start = time.perf_counter()
+            result = await afunc(state)
+        _record_node_timing(result, node, time.perf_counter() - start, usage)
+        return result
+    
+    return RunnableLambda(run, afunc=arun if afunc else None, name=node)
+
+
+def _collect_reflection_stats() -> None:
+    """Collector: Reflection Cache, Prompt Cache und Output-Validierung als Gauges."""
+    reflection_agent = _agents.get("reflection_agent")
+    if reflection_agent is None:
+        return
+    
+    if reflection_agent.cache is not None:
+        cache_stats = reflection_agent.cache.stats()
+        cache_gauge = registry.gauge(
+            "ei_reflection_cache", "Reflection Ergebnis-Cache (hits, misses, evictions, entries)", ("stat",)
+        )
+        for stat in ("hits", "misses", "evictions", "entries"):
+            cache_gauge.set(cache_stats[stat], stat=stat)
+    
+    with reflection_agent._stats_lock:
+        prompt_stats = dict(reflection_agent.prompt_cache_stats)
+        output_stats = {model: dict(stats) for model, stats in reflection_agent.output_stats.items()}
+    
+    prompt_gauge = registry.gauge(
+        "ei_reflection_prompt_tokens", "Reflection Tokens seit Start (prompt, cached, completion)", ("type",)
+    )
+    for token_type in ("prompt", "cached", "completion"):
+        prompt_gauge.set(prompt_stats[f"{token_type}_tokens"], type=token_type)
+    registry.gauge(
+        "ei_reflection_prompt_cache_hit_ratio", "Anteil Prompt-Tokens aus dem Provider-Cache"
+    ).set(reflection_agent.prompt_cache_hit_rate())
+    
+    output_gauge = registry.gauge(
+        "ei_reflection_output_events", "Ungültige Outputs, LLM-Fehler und Retries", ("model", "event")
+    )
+    for model, stats in output_stats.items():
+        for event, count in stats.items():
+            output_gauge.set(count, model=model, event=event)
+
+
+registry.add_collector(_collect_reflection_stats)
 
 
 def framework_loading_node(state: AgentState) -> AgentState:
@@ -43,19 +187,21 @@ def interview_node(state: AgentState) -> AgentState:
     return state
 
 
-def reflection_node(state: AgentState) -> AgentState:
-    """Reflection Agent analysiert alle 3 User-Antworten."""
-    analyses = []
-    
-    for idx, response in enumerate(state["user_responses"]):
-        analysis = reflection_agent.analyze_response(
-            user_response=response,
-            question=state["star_questions"][idx],
-            behavioral_indicators=state["behavioral_indicators"],
-            question_index=idx
-        )
-        analyses.append(analysis)
-    
+def _reflection_jobs(state: AgentState) -> list[dict]:
+    """Baut die Argumente für alle Reflection-Calls (Reihenfolge = question_id)."""
+    return [
+        {
+            "user_response": response,
+            "question": state["star_questions"][idx],
+            "behavioral_indicators": state["behavioral_indicators"],
+            "question_index": idx
+        }
+        for idx, response in enumerate(state["user_responses"])
+    ]
+
+
+def _apply_reflection_results(state: AgentState, analyses: list) -> AgentState:
+    """Schreibt die Analysen in den State und trifft die Assessment-Entscheidung."""
     state["response_analyses"] = analyses
     
     # Decision: Trigger Assessment?
@@ -75,8 +221,153 @@ def reflection_node(state: AgentState) -> AgentState:
     return state
 
 
+def reflection_node(state: AgentState) -> AgentState:
+    """Reflection Agent analysiert alle 3 User-Antworten parallel (Thread-Pool)."""
+    reflection_agent = get_reflection_agent()
+    if reflection_agent.mode == "batched":
+        analyses = reflection_agent.analyze_responses_batched(
+            state["user_responses"],
+            state["star_questions"],
+            state["behavioral_indicators"]
+        )
+        return _apply_reflection_results(state, analyses)
+    
+    jobs = _reflection_jobs(state)
+    
+    with ThreadPoolExecutor(max_workers=REFLECTION_CONCURRENCY) as pool:
+        # Kontext kopieren, damit Metric-Labels und Usage-Erfassung auch in den Threads gelten
+        futures = [
+            pool.submit(contextvars.copy_context().run, reflection_agent.analyze_response, **job)
+            for job in jobs
+        ]
+    
+    # Der with-Block hat auf alle Calls gewartet; eine fehlgeschlagene Antwort
+    # (ReflectionError) bricht die Analyse ab statt mit einem Fake-Score weiterzulaufen
+    analyses = [future.result() for future in futures]
+    
+    return _apply_reflection_results(state, analyses)
+
+
+async def _emit_answer_result(analysis) -> None:
+    """Streamt das Ergebnis einer einzelnen Antwort (für XAI Steps im UI)."""
+    await adispatch_custom_event(REFLECTION_ANSWER_EVENT, {
+        "question_id": analysis.question_id,
+        "score": analysis.score,
+        "confidence": analysis.confidence,
+        "indicators_found": [ind.indicator for ind in analysis.indicators_found if ind.found],
+        "indicators_total": len(analysis.indicators_found),
+        "reasoning": analysis.reasoning
+    })
+
+
+async def areflection_node(state: AgentState) -> AgentState:
+    """
+    Async Reflection Node: alle Antworten gleichzeitig, begrenzt durch Semaphore.
+    Scheitert eine Antwort endgültig, laufen die übrigen trotzdem zu Ende;
+    danach wird der (erste) ReflectionError weitergereicht.
+    
+    Bereits während des Interviews gestartete Analysen (siehe schedule_reflection)
+    werden nur noch abgewartet statt neu angefragt; beide Wege teilen sich das
+    Semaphore der Session (REFLECTION_CONCURRENCY). Auch die hier gestarteten
+    Analysen landen in der Future Map, damit ein erneuter Lauf nach einem Fehler
+    nur die gescheiterte Antwort neu anfragt. Jede fertige Analyse wird sofort
+    als Custom Event gestreamt (astream_events).
+    """
+    reflection_agent = get_reflection_agent()
+    if reflection_agent.mode == "batched":
+        analyses = await reflection_agent.aanalyze_responses_batched(
+            state["user_responses"],
+            state["star_questions"],
+            state["behavioral_indicators"]
+        )
+        for analysis in analyses:
+            await _emit_answer_result(analysis)
+        return _apply_reflection_results(state, analyses)
+    
+    session_id = state.get("session_id")
+    semaphore = pending_analyses.semaphore(session_id, REFLECTION_CONCURRENCY)
+    
+    async def analyze_now(job: dict):
+        async with semaphore:
+            return await reflection_agent.aanalyze_response(**job)
+    
+    async def analyze(job: dict):
+        task = pending_analyses.get(session_id, job["question_index"], job["user_response"])
+        if task is not None:
+            try:
+                return await task
+            except asyncio.CancelledError:
+                # Nur den abgebrochenen Prefetch ersetzen, nicht den Node selbst
+                if asyncio.current_task().cancelling():
+                    raise
+        if session_id is None:
+            return await analyze_now(job)
+        return await pending_analyses.submit(
+            session_id, job["question_index"], job["user_response"], analyze_now(job)
+        )
+    
+    async def run(job: dict):
+        analysis = await analyze(job)
+        await _emit_answer_result(analysis)
+        return analysis
+    
+    # gather erhält die Reihenfolge der Jobs (= question_id); ein fehlgeschlagener
+    # Call bricht die anderen nicht ab
+    tasks = [asyncio.ensure_future(run(job)) for job in _reflection_jobs(state)]
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    except asyncio.CancelledError:
+        # Node selbst abgebrochen (z.B. Chat beendet): alle Calls der Session stoppen
+        for task in tasks:
+            task.cancel()
+        pending_analyses.cancel(session_id)
+        raise
+    
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # Nur Gescheitertes verwerfen: "Nochmal" übernimmt die erfolgreichen Analysen
+        pending_analyses.discard_failed(session_id)
+        raise next((e for e in errors if isinstance(e, ReflectionError)), errors[0])
+    pending_analyses.release(session_id)
+    
+    return _apply_reflection_results(state, results)
+
+
+def schedule_reflection(state: AgentState, question_index: int) -> None:
+    """
+    Startet die Analyse einer gerade gespeicherten Antwort im Hintergrund.
+    
+    Muss aus einem laufenden Event Loop aufgerufen werden (Chainlit Handler).
+    Im Batched Mode werden alle Antworten erst im Reflection Node gemeinsam analysiert.
+    """
+    if get_reflection_agent().mode == "batched":
+        return
+    
+    session_id = state.get("session_id")
+    job = _reflection_jobs(state)[question_index]
+    pending_analyses.submit(
+        session_id,
+        question_index,
+        job["user_response"],
+        _prefetch_analysis(
+            _node_context(state),
+            pending_analyses.semaphore(session_id, REFLECTION_CONCURRENCY),
+            job
+        )
+    )
+
+
+async def _prefetch_analysis(context: tuple, semaphore: asyncio.Semaphore, job: dict):
+    """Hintergrund-Analyse mit Labels und Budget-Status (läuft außerhalb des Reflection Nodes)."""
+    labels, downgrade = context
+    async with semaphore:
+        with labels, downgrade:
+            return await get_reflection_agent().aanalyze_response(**job)
+
+
 def assessment_node(state: AgentState) -> AgentState:
     """Assessment Agent berechnet finalen Score."""
+    assessment_agent = get_assessment_agent()
     final_score = assessment_agent.calculate_final_score(state)
     state["agent_score"] = final_score
     
@@ -124,7 +415,7 @@ def assessment_node(state: AgentState) -> AgentState:
 
 def dunning_kruger_node(state: AgentState) -> AgentState:
     """Dunning-Kruger Analyse."""
-    dk_result = dk_analyzer.analyze(state)
+    dk_result = get_dk_analyzer().analyze(state)
 
     print(f"🔍 DK RESULT: {dk_result}")  # DEBUG
     
@@ -165,13 +456,13 @@ def router(state: AgentState) -> Literal[
 workflow = StateGraph(AgentState)
 
 # Add Nodes
-workflow.add_node("framework_loading", framework_loading_node)
-workflow.add_node("self_report", self_report_node)
-workflow.add_node("interview", interview_node)
-workflow.add_node("reflection", reflection_node)
-workflow.add_node("assessment", assessment_node)
-workflow.add_node("dunning_kruger", dunning_kruger_node)
-workflow.add_node("feedback", feedback_node)
+workflow.add_node("framework_loading", timed_node("framework_loading", framework_loading_node))
+workflow.add_node("self_report", timed_node("self_report", self_report_node))
+workflow.add_node("interview", timed_node("interview", interview_node))
+workflow.add_node("reflection", timed_node("reflection", reflection_node, afunc=areflection_node))
+workflow.add_node("assessment", timed_node("assessment", assessment_node))
+workflow.add_node("dunning_kruger", timed_node("dunning_kruger", dunning_kruger_node))
+workflow.add_node("feedback", timed_node("feedback", feedback_node))
 
 # Set Entry Point
 workflow.set_entry_point("framework_loading")
@@ -0,0 +1,359 @@
+"""
+LLM Provider - zentrale Stelle, an der die Agents ihr Chat-Modell bekommen.
+
+LLM_PROVIDER=openai (Default) → ChatOpenAI
+LLM_PROVIDER=fake            → FakeChatModel (deterministisch, offline, ohne API Key)
+"""
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from utils.metrics import registry, current_label, report_usage
+from utils.rate_limit import get_rate_limiter, begin_queue_wait
+from dotenv import load_dotenv
+from typing import Any, Optional
+import asyncio
+import hashlib
+import httpx
+import importlib.util
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+
+load_dotenv()
+
+# USD pro 1M Tokens: (Input, Cached Input, Output)
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40)
+}
+
+LLM_DURATION = registry.histogram(
+    "ei_llm_request_duration_seconds", "Dauer eines LLM-Calls", ("model", "skill")
+)
+LLM_REQUESTS = registry.counter(
+    "ei_llm_requests_total", "LLM-Calls nach Status", ("model", "skill", "status")
+)
+LLM_TOKENS = registry.counter(
+    "ei_llm_tokens_total", "LLM-Tokens (prompt, cached, completion)", ("model", "skill", "type")
+)
+LLM_COST = registry.counter(
+    "ei_llm_cost_usd_total", "Geschätzte LLM-Kosten in USD", ("model", "skill")
+)
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """Kosten eines Calls in USD; Fake-Modelle kosten wie ihr echtes Vorbild, unbekannte 0."""
+    prices = MODEL_PRICES.get(model.removeprefix("fake-"))
+    if not prices:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Misst jeden LLM-Call: Dauer, Tokens und Kosten pro Modell und Skill.
+    
+    Läuft inline (nicht im Executor), damit die ContextVars des Aufrufers
+    (Skill-Label, Usage-Accumulator des Nodes) sichtbar sind.
+    """
+    
+    run_inline = True
+    
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._starts: dict = {}
+    
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        self._starts[run_id] = (time.perf_counter(), begin_queue_wait())
+    
+    def _duration(self, run_id) -> float:
+        """Dauer des Calls ohne Wartezeit im Rate Limiter (die hat ein eigenes Histogramm)."""
+        start, queue_wait = self._starts.pop(run_id, (time.perf_counter(), [0.0]))
+        return time.perf_counter() - start - queue_wait[0]
+    
+    def on_llm_end(self, response: LLMResult, *, run_id, **kwargs) -> None:
+        duration = self._duration(run_id)
+        skill = current_label("skill")
+        LLM_DURATION.observe(duration, model=self.model_name, skill=skill)
+        LLM_REQUESTS.inc(model=self.model_name, skill=skill, status="ok")
+        
+        message = response.generations[0][0].message if response.generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens", 0)
+        completion_tokens = usage.get("output_tokens", 0)
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        cost = estimate_cost(self.model_name, prompt_tokens, cached_tokens, completion_tokens)
+        
+        LLM_TOKENS.inc(prompt_tokens, model=self.model_name, skill=skill, type="prompt")
+        LLM_TOKENS.inc(cached_tokens, model=self.model_name, skill=skill, type="cached")
+        LLM_TOKENS.inc(completion_tokens, model=self.model_name, skill=skill, type="completion")
+        LLM_COST.inc(cost, model=self.model_name, skill=skill)
+        
+        report_usage(prompt_tokens + completion_tokens, cost)
+    
+    def on_llm_error(self, error: BaseException, *, run_id, **kwargs) -> None:
+        duration = self._duration(run_id)
+        skill = current_label("skill")
+        LLM_DURATION.observe(duration, model=self.model_name, skill=skill)
+        LLM_REQUESTS.inc(model=self.model_name, skill=skill, status="error")
+
+
+def parse_latency(spec: str):
+    """
+    Parst eine Latenz-Verteilung (Sekunden) zu einer Sampling-Funktion.
+
+    Formate:
+        fixed:0.5             immer 0.5s
+        uniform:0.2,1.5       gleichverteilt
+        normal:0.8,0.2        Mittelwert, Standardabweichung
+        lognormal:0.8,0.5     Median, Sigma (realistisch: lange Tail-Latenzen)
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v.strip()]
+
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unbekannte Latenz-Verteilung: {spec}")
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministisches Fake-Modell für Benchmarks und Load Tests.
+
+    - Inhalt hängt nur vom Prompt ab (gleicher Prompt → gleiche Antwort)
+    - Erzeugt gültiges Reflection-JSON passend zum angefragten response_format
+      (single oder batched), die Indicators kommen aus dem System-Prompt
+    - Latenz aus einer konfigurierbaren Verteilung (seeded)
+    - usage_metadata mit geschätzten Prompt-Tokens und festen Output-Tokens
+    """
+
+    model_name: str = "fake-gpt-4o"
+    temperature: float = 0.7
+    latency: str = "fixed:0"
+    output_tokens: int = 350
+    seed: int = 42
+    canned_response: Optional[str] = None
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._sample_latency = parse_latency(self.latency)
+        self._latency_rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _next_latency(self) -> float:
+        with self._rng_lock:
+            return self._sample_latency(self._latency_rng)
+
+    def _content_rng(self, messages: list[BaseMessage]) -> random.Random:
+        """RNG pro Prompt, damit die Antwort unabhängig von der Aufruf-Reihenfolge ist."""
+        digest = hashlib.sha256(
+            json.dumps([self.seed] + [str(m.content) for m in messages]).encode("utf-8")
+        ).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    @staticmethod
+    def _fake_analysis(rng: random.Random, indicators: list[str]) -> dict:
+        """Plausible, schema-konforme Analyse einer Antwort."""
+        found = [ind for ind in indicators if rng.random() < 0.6]
+        coverage = len(found) / len(indicators) if indicators else 0.5
+        return {
+            "star_analysis": {
+                "situation": "Simulierte Situation",
+                "task": "Simulierte Aufgabe",
+                "action": "Simulierte Handlung",
+                "result": "Simuliertes Ergebnis"
+            },
+            "indicators_found": [
+                {
+                    "indicator": ind,
+                    "found": ind in found,
+                    "evidence": ["simuliertes Zitat"] if ind in found else [],
+                    "confidence": round(rng.uniform(0.6, 0.95), 2)
+                }
+                for ind in indicators
+            ],
+            "indicators_missing": [ind for ind in indicators if ind not in found],
+            "score": round(2 * (1.0 + 4.0 * coverage)) / 2,
+            "reasoning": "Fake-Analyse für Benchmarks",
+            "confidence": round(rng.uniform(0.6, 0.95), 2)
+        }
+
+    def _content(self, messages: list[BaseMessage], response_format: Optional[dict]) -> str:
+        if self.canned_response is not None:
+            return self.canned_response
+
+        rng = self._content_rng(messages)
+        system_prompt = str(messages[0].content)
+        indicators = []
+        if "BEHAVIORAL INDICATORS:" in system_prompt:
+            indicators = json.loads(system_prompt.split("BEHAVIORAL INDICATORS:", 1)[1])
+
+        schema_name = ((response_format or {}).get("json_schema") or {}).get("name")
+        if schema_name == "reflection_analysis":
+            return json.dumps(self._fake_analysis(rng, indicators), ensure_ascii=False)
+        if schema_name == "reflection_analyses":
+            question_ids = [int(qid) for qid in re.findall(r"### question_id (\d+)", str(messages[-1].content))]
+            return json.dumps({
+                "analyses": [
+                    {"question_id": qid, **self._fake_analysis(rng, indicators)}
+                    for qid in question_ids
+                ]
+            }, ensure_ascii=False)
+        return "Fake-Antwort"
+
+    def _result(self, messages: list[BaseMessage], **kwargs: Any) -> ChatResult:
+        content = self._content(messages, kwargs.get("response_format"))
+        # Grobe Schätzung wie tiktoken-Fallback: ~4 Zeichen pro Token
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": self.output_tokens,
+                "total_tokens": input_tokens + self.output_tokens,
+                "input_token_details": {"cache_read": 0}
+            },
+            response_metadata={"model_name": self.model_name}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._next_latency())
+        return self._result(messages, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._next_latency())
+        return self._result(messages, **kwargs)
+
+
+def create_http_clients(
+    verify=True,
+    max_connections: Optional[int] = None,
+    max_keepalive: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None
+) -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Baut einen Keep-Alive Pool (sync + async) nach LLM_HTTP_* Einstellungen.
+
+    HTTP/2 (mehrere Requests über eine Verbindung) wird genutzt, wenn das
+    Paket h2 installiert ist (LLM_HTTP2=auto) oder explizit LLM_HTTP2=true.
+    """
+    http2_setting = os.getenv("LLM_HTTP2", "auto").lower()
+    http2 = importlib.util.find_spec("h2") is not None if http2_setting == "auto" else http2_setting == "true"
+    
+    max_connections = max_connections or int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "50"))
+    if max_keepalive is None:
+        # httpcore schließt idle Verbindungen, sobald der Pool mehr als max_keepalive
+        # Verbindungen hat (auch aktive) → kleiner als max_connections bedeutet Handshake-Churn
+        max_keepalive = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "0")) or max_connections
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        # Länger als der httpx/OpenAI-Default (5s), damit Denkpausen der User keinen neuen TLS-Handshake kosten
+        keepalive_expiry=keepalive_expiry or float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120"))
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv("LLM_HTTP_TIMEOUT", "60")),
+        connect=float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5"))
+    )
+    return (
+        httpx.Client(http2=http2, limits=limits, timeout=timeout, verify=verify),
+        httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout, verify=verify)
+    )
+
+
+_http_clients: Optional[tuple[httpx.Client, httpx.AsyncClient]] = None
+_http_clients_lock = threading.Lock()
+
+
+def get_http_clients() -> tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Gemeinsamer Pool aller Agents und Tools im Prozess (lazy erstellt).
+
+    Der AsyncClient gehört zum Event Loop, in dem er zuerst benutzt wird
+    (Chainlit bzw. das asyncio.run von batch_assess.py).
+    """
+    global _http_clients
+    with _http_clients_lock:
+        if _http_clients is None:
+            _http_clients = create_http_clients()
+        return _http_clients
+
+
+async def aclose_http_clients() -> None:
+    """Schließt den gemeinsamen Pool (App Shutdown)."""
+    global _http_clients
+    with _http_clients_lock:
+        clients, _http_clients = _http_clients, None
+    if clients:
+        clients[0].close()
+        await clients[1].aclose()
+
+
+def create_chat_model(temperature: float, model: Optional[str] = None) -> BaseChatModel:
+    """
+    Liefert das Chat-Modell des konfigurierten Providers.
+
+    Args:
+        temperature: Sampling Temperature des Agents
+        model: Modellname (Default aus MODEL_NAME)
+    """
+    model = model or os.getenv("MODEL_NAME", "gpt-4o")
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    # Gemeinsamer Limiter aller Agents (None = kein Limit)
+    rate_limiter = get_rate_limiter()
+
+    if provider == "openai":
+        # Erst hier importiert: langchain_openai/openai kosten ~1s Import-Zeit beim Cold Start
+        from langchain_openai import ChatOpenAI
+        
+        http_client, http_async_client = get_http_clients()
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            http_client=http_client,
+            http_async_client=http_async_client,
+            rate_limiter=rate_limiter,
+            callbacks=[LLMMetricsCallback(model)]
+        )
+
+    if provider == "fake":
+        canned_response = None
+        canned_path = os.getenv("FAKE_LLM_RESPONSE_FILE")
+        if canned_path:
+            with open(canned_path, "r", encoding="utf-8") as f:
+                canned_response = f.read()
+
+        # Eigener Modellname, damit Fake-Ergebnisse nie im echten Cache landen
+        return FakeChatModel(
+            model_name=f"fake-{model}",
+            temperature=temperature,
+            latency=os.getenv("FAKE_LLM_LATENCY", "lognormal:0.8,0.4"),
+            output_tokens=int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "350")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "42")),
+            canned_response=canned_response,
+            rate_limiter=rate_limiter,
+            callbacks=[LLMMetricsCallback(f"fake-{model}")]
+        )
+
+    raise ValueError(f"Unbekannter LLM_PROVIDER: {provider}")
@@ -0,0 +1,98 @@
+"""
+Pipelined Reflection - analysiert Antworten schon während des Interviews.
+Jede gespeicherte Antwort startet sofort einen Background-Task; der Graph
+wartet später nur noch auf die Analysen, die noch nicht fertig sind.
+"""
+import asyncio
+from typing import Coroutine, Optional
+
+
+class PendingAnalyses:
+    """
+    Per-Session Future Map: session_id → {question_index: (antwort, task)}.
+    
+    Hält starke Referenzen auf die Tasks, damit sie nicht vom GC
+    eingesammelt werden, bevor der Reflection Node sie abholt. Dazu ein
+    Semaphore pro Session, das Prefetch und Reflection Node gemeinsam nutzen.
+    """
+    
+    def __init__(self):
+        self._sessions: dict[str, dict[int, tuple[str, asyncio.Task]]] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+    
+    def semaphore(self, session_id: Optional[str], limit: int) -> asyncio.Semaphore:
+        """
+        Begrenzt die gleichzeitigen Reflection-Calls einer Session (Prefetch + Node).
+        Ohne session_id (z.B. Batch) gibt es kein Prefetch → eigenes Semaphore pro Aufruf.
+        """
+        if session_id is None:
+            return asyncio.Semaphore(limit)
+        semaphore = self._semaphores.get(session_id)
+        if semaphore is None:
+            semaphore = self._semaphores[session_id] = asyncio.Semaphore(limit)
+        return semaphore
+    
+    def submit(
+        self,
+        session_id: str,
+        question_index: int,
+        user_response: str,
+        coro: Coroutine
+    ) -> asyncio.Task:
+        """Startet die Analyse einer Antwort als Background-Task."""
+        session = self._sessions.setdefault(session_id, {})
+        
+        # Alte Analyse für denselben Slot verwerfen (z.B. nach Neustart)
+        previous = session.pop(question_index, None)
+        if previous:
+            previous[1].cancel()
+        
+        task = asyncio.create_task(coro, name=f"reflection-{session_id}-{question_index}")
+        session[question_index] = (user_response, task)
+        return task
+    
+    def get(
+        self,
+        session_id: Optional[str],
+        question_index: int,
+        user_response: str
+    ) -> Optional[asyncio.Task]:
+        """Liefert den Task nur, wenn er zur selben Antwort gehört."""
+        entry = self._sessions.get(session_id, {}).get(question_index)
+        if entry and entry[0] == user_response:
+            return entry[1]
+        return None
+    
+    def release(self, session_id: Optional[str]) -> None:
+        """Entfernt die Future Map einer Session (nach dem Abholen durch den Graph)."""
+        self._sessions.pop(session_id, None)
+        self._semaphores.pop(session_id, None)
+    
+    def discard_failed(self, session_id: Optional[str]) -> int:
+        """
+        Verwirft fehlgeschlagene, abgebrochene und noch offene Analysen einer Session.
+        Erfolgreiche bleiben erhalten, damit ein erneuter Lauf nur die fehlenden anfragt.
+        """
+        session = self._sessions.get(session_id, {})
+        discarded = 0
+        for question_index, (_, task) in list(session.items()):
+            if task.done() and not task.cancelled() and task.exception() is None:
+                continue
+            task.cancel()
+            del session[question_index]
+            discarded += 1
+        return discarded
+    
+    def cancel(self, session_id: Optional[str]) -> int:
+        """Bricht alle offenen Analysen einer Session ab (z.B. Session verlassen)."""
+        session = self._sessions.pop(session_id, {})
+        self._semaphores.pop(session_id, None)
+        cancelled = 0
+        for _, task in session.values():
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+
+pending_analyses = PendingAnalyses()
@@ -2,107 +2,317 @@
 Reflection Agent - Episodic Memory Specialist
 Analysiert User-Antworten mit Chain-of-Thought
 """
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from agents.state import AgentState, ResponseAnalysis, STARAnalysis, IndicatorScore
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from pydantic import BaseModel, ValidationError
+from agents.state import (
+    AgentState,
+    ResponseAnalysis,
+    STARAnalysis,
+    IndicatorScore,
+    ReflectionOutput,
+    BatchedReflectionOutput
+)
+from agents.llm import create_chat_model
+from prompts.reflection import compile_system_prompt, precompile_reflection_prompts
+from utils.llm_cache import ReflectionCache
 from dotenv import load_dotenv
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple, Optional
+import asyncio
 import json
 import os
+import threading
+import time
 
 load_dotenv()
 
 
+# Im Strict Mode nicht erlaubt; Wertebereiche prüft weiterhin die Pydantic-Validierung (→ Repair-Retry)
+_STRICT_UNSUPPORTED_KEYWORDS = ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "default")
+
+
+def _strict_schema(node):
+    """
+    Macht ein Pydantic-JSON-Schema Strict-Mode-kompatibel: jedes Objekt mit
+    additionalProperties=false und allen Feldern als required, ohne
+    minimum/maximum/default.
+    """
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    
+    strict = {}
+    for key, value in node.items():
+        if key in ("properties", "$defs"):
+            # Feldnamen nicht als Keywords behandeln
+            strict[key] = {name: _strict_schema(sub) for name, sub in value.items()}
+        elif key not in _STRICT_UNSUPPORTED_KEYWORDS:
+            strict[key] = _strict_schema(value)
+    
+    if strict.get("type") == "object":
+        strict["additionalProperties"] = False
+        strict["required"] = list(strict.get("properties", {}))
+    return strict
+
+
+def _json_schema_format(name: str, schema: type[BaseModel]) -> dict:
+    """OpenAI response_format für Structured Output nach Pydantic-Schema (vom Provider erzwungen)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": _strict_schema(schema.model_json_schema())}
+    }
+
+
+SINGLE_RESPONSE_FORMAT = _json_schema_format("reflection_analysis", ReflectionOutput)
+BATCHED_RESPONSE_FORMAT = _json_schema_format("reflection_analyses", BatchedReflectionOutput)
+
+# Budget-Downgrade: Calls in diesem Kontext nutzen das günstigere Fallback-Modell
+_downgraded: ContextVar[bool] = ContextVar("reflection_downgraded", default=False)
+
+
+class _AttemptOutcome(NamedTuple):
+    """Ergebnis eines Versuchs: Analyse oder (Fehler, nächster Request, Wartezeit vor dem Retry)."""
+    analysis: Optional[ResponseAnalysis]
+    error: Optional[Exception] = None
+    request: Optional[list] = None
+    delay: float = 0.0
+
+
+class ReflectionError(RuntimeError):
+    """Keine gültige Analyse einer Antwort nach allen Retries (LLM-Fehler oder ungültiger Output)."""
+    
+    def __init__(self, question_index: int, cause: Exception):
+        super().__init__(f"Frage {question_index + 1}: keine gültige Analyse ({cause})")
+        self.question_index = question_index
+
+
 class ReflectionAgent:
     """
     Verarbeitet narrative User-Antworten → episodisches Gedächtnis
     Nutzt Chain-of-Thought Prompting für STAR + EI Indicator Extraction
     """
     
-    def __init__(self):
+    def __init__(self, mode: str = None, goleman_framework: dict = None):
+        """
+        Args:
+            mode: "per_answer" oder "batched" (Default aus REFLECTION_MODE)
+            goleman_framework: Framework-Daten zum Vorkompilieren der Prompts
+        """
         self.name = "Reflection"
-        self.llm = ChatOpenAI(
-            model=os.getenv("MODEL_NAME", "gpt-4o"),
-            temperature=float(os.getenv("TEMPERATURE", "0.7"))
-        )
+        if goleman_framework:
+            precompile_reflection_prompts(goleman_framework)
+        
+        # Prompt-Token Statistik (cached vs. uncached) aus der Response-Metadata
+        self.prompt_cache_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        # Ungültige Outputs, LLM-Fehler und Retries pro Modell
+        self.output_stats = {}
+        self._stats_lock = threading.Lock()
+        
+        # Max. Retries pro Antwort (LLM-Fehler oder Output verletzt das Schema)
+        self.max_retries = int(os.getenv("REFLECTION_MAX_RETRIES", "2"))
+        # Wartezeit vor einem Retry nach LLM-Fehler (verdoppelt sich pro Versuch)
+        self.retry_backoff = float(os.getenv("REFLECTION_RETRY_BACKOFF", "0.5"))
+        
+        # "per_answer" (ein Call pro Antwort) oder "batched" (ein Call pro Skill)
+        self.mode = mode or os.getenv("REFLECTION_MODE", "per_answer")
+        
+        # Optionaler Ergebnis-Cache (Demos, QA, Replays); pro Call abschaltbar
+        self.cache = None
+        if os.getenv("REFLECTION_CACHE_ENABLED", "false").lower() == "true":
+            self.cache = ReflectionCache(
+                path=os.getenv("REFLECTION_CACHE_PATH", "data/cache/reflection_cache.sqlite"),
+                max_entries=int(os.getenv("REFLECTION_CACHE_MAX_ENTRIES", "10000")),
+                ttl_seconds=float(os.getenv("REFLECTION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+            )
+        self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
+        self.llm = create_chat_model(temperature=self.temperature)
+        
+        # Günstigeres Modell, wenn das Token-Budget einer Session erreicht ist (lazy)
+        self.fallback_model = os.getenv("REFLECTION_FALLBACK_MODEL", "gpt-4o-mini")
+        self._fallback_llm = None
+    
+    @contextmanager
+    def downgraded(self, active: bool = True):
+        """Alle Reflection-Calls im Kontext (auch Child-Tasks) laufen über das Fallback-Modell."""
+        token = _downgraded.set(active)
+        try:
+            yield
+        finally:
+            _downgraded.reset(token)
+    
+    def _active_llm(self):
+        """Chat-Modell für den aktuellen Kontext (Standard oder Budget-Fallback)."""
+        if not _downgraded.get():
+            return self.llm
+        if self._fallback_llm is None:
+            self._fallback_llm = create_chat_model(temperature=self.temperature, model=self.fallback_model)
+        return self._fallback_llm
     
     def analyze_response(
         self, 
         user_response: str,
         question: str,
         behavioral_indicators: list[str],
-        question_index: int
+        question_index: int,
+        use_cache: Optional[bool] = None
     ) -> ResponseAnalysis:
         """
         Analysiert eine User-Antwort mit CoT.
         
+        Der Output wird per JSON-Schema (Structured Output, strict) angefordert und
+        direkt als ResponseAnalysis validiert. Bei LLM-Fehler (mit Backoff) oder
+        ungültigem Output (mit Repair-Prompt) wird nur diese Antwort erneut
+        angefragt (max. REFLECTION_MAX_RETRIES mal).
+        
         Args:
             user_response: Die Antwort des Users
             question: Die gestellte STAR-Frage
             behavioral_indicators: Liste der zu prüfenden Indicators
             question_index: Index der Frage (0-2)
+            use_cache: False = Cache für diesen Call umgehen (None = Agent-Default)
         
         Returns:
             ResponseAnalysis Objekt mit strukturierten Ergebnissen
+        
+        Raises:
+            ReflectionError: keine gültige Analyse nach allen Retries
         """
+        messages = self._build_messages(user_response, question, behavioral_indicators)
         
-        system_prompt = f"""Du bist ein Reflection Agent für EI-Assessment.
-
-Analysiere User-Antworten schrittweise mit Chain-of-Thought:
-
-WICHTIG - BEWERTUNGSPRINZIPIEN:
-- Sei wohlwollend: Wenn ein Indicator auch nur ansatzweise erkennbar ist → found=true
-- Implizite Hinweise zählen: "hab das gelöst" → zeigt Problemlösungskompetenz
-- Kurze Antworten: Extrahiere das Maximum aus wenigen Worten
-- Benefit of the doubt: Im Zweifel für den User
-- Fokus auf Stärken: Suche aktiv nach positiven Signalen
-
-SCHRITT 1: STAR Extraction
-- Situation: Was war der Kontext?
-- Task: Welche Herausforderung?
-- Action: Was hat User gemacht?
-- Result: Was war das Ergebnis?
-
-SCHRITT 2: EI Indicator Mapping
-Prüfe jeden dieser Behavioral Indicators:
-{json.dumps(behavioral_indicators, indent=2, ensure_ascii=False)}
-
-Für jeden Indicator:
-- Gefunden? (true/false)
-- Evidence: Konkrete Zitate aus der Antwort (als Liste)
-- Confidence: 0.0-1.0
-
-SCHRITT 3: Scoring (1-5 Skala)
-- 5 = Alle 5 Indicators demonstriert (auch implizit)
-- 4 = 4 Indicators ODER 3 sehr stark
-- 3 = 3 Indicators klar vorhanden
-- 2 = 1-2 Indicators
-- 1 = Keine klaren Indicators
-
-SCHRITT 4: Reasoning
-Erkläre deine Bewertung evidence-based, fokussiere auf Stärken.
-
-OUTPUT FORMAT (nur JSON, keine Markdown, lowercase keys):
-{{
-  "star_analysis": {{
-    "situation": "...",
-    "task": "...",
-    "action": "...",
-    "result": "..."
-  }},
-  "indicators_found": [
-    {{
-      "indicator": "Indicator Name",
-      "found": true,
-      "evidence": ["Zitat 1", "Zitat 2"],
-      "confidence": 0.85
-    }}
-  ],
-  "indicators_missing": ["Indicator Name 1", "Indicator Name 2"],
-  "score": 3.5,
-  "reasoning": "Detaillierte Begründung...",
-  "confidence": 0.80
-}}
-"""
+        cache_key = self._cache_key(messages, use_cache)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return cached.model_copy(update={"question_id": question_index})
+        
+        outcome = _AttemptOutcome(None, request=messages)
+        for attempt in range(self.max_retries + 1):
+            if outcome.delay:
+                time.sleep(outcome.delay)
+            try:
+                response = self._active_llm().invoke(outcome.request, response_format=SINGLE_RESPONSE_FORMAT)
+                self._record_usage(response)
+            except Exception as e:
+                outcome = self._evaluate_attempt(messages, None, e, question_index, attempt, outcome.request)
+            else:
+                outcome = self._evaluate_attempt(messages, response, None, question_index, attempt)
+            
+            if outcome.analysis is not None:
+                if cache_key:
+                    self.cache.set(cache_key, outcome.analysis)
+                return outcome.analysis
+        
+        raise ReflectionError(question_index, outcome.error) from outcome.error
+    
+    async def aanalyze_response(
+        self, 
+        user_response: str,
+        question: str,
+        behavioral_indicators: list[str],
+        question_index: int,
+        use_cache: Optional[bool] = None
+    ) -> ResponseAnalysis:
+        """
+        Async-Variante von analyze_response (blockiert den Event Loop nicht).
+        
+        Raises:
+            ReflectionError: keine gültige Analyse nach allen Retries
+        """
+        messages = self._build_messages(user_response, question, behavioral_indicators)
+        
+        cache_key = self._cache_key(messages, use_cache)
+        if cache_key:
+            cached = await self.cache.aget(cache_key)
+            if cached:
+                return cached.model_copy(update={"question_id": question_index})
+        
+        outcome = _AttemptOutcome(None, request=messages)
+        for attempt in range(self.max_retries + 1):
+            if outcome.delay:
+                await asyncio.sleep(outcome.delay)
+            try:
+                response = await self._active_llm().ainvoke(outcome.request, response_format=SINGLE_RESPONSE_FORMAT)
+                self._record_usage(response)
+            except Exception as e:
+                outcome = self._evaluate_attempt(messages, None, e, question_index, attempt, outcome.request)
+            else:
+                outcome = self._evaluate_attempt(messages, response, None, question_index, attempt)
+            
+            if outcome.analysis is not None:
+                if cache_key:
+                    await self.cache.aset(cache_key, outcome.analysis)
+                return outcome.analysis
+        
+        raise ReflectionError(question_index, outcome.error) from outcome.error
+    
+    def analyze_responses_batched(
+        self,
+        user_responses: list[str],
+        questions: list[str],
+        behavioral_indicators: list[str]
+    ) -> list[ResponseAnalysis]:
+        """
+        Analysiert alle STAR-Antworten eines Skills in einem einzigen LLM-Call.
+        
+        Der große System-Prompt wird nur einmal statt pro Antwort gesendet.
+        Antworten, deren Analyse die Validierung nicht besteht, werden
+        automatisch einzeln nachgefragt.
+        
+        Returns:
+            Liste von ResponseAnalysis, sortiert nach question_id
+        """
+        messages = self._build_batched_messages(user_responses, questions, behavioral_indicators)
+        try:
+            response = self._active_llm().invoke(messages, response_format=BATCHED_RESPONSE_FORMAT)
+            self._record_usage(response)
+            analyses = self._parse_batched_response(response, len(user_responses))
+        except Exception as e:
+            print(f"⚠️ Batched Reflection fehlgeschlagen ({e}), Fallback auf Einzel-Calls")
+            analyses = {}
+        
+        # Nur die ungültigen Antworten einzeln neu anfragen
+        for idx, answer in enumerate(user_responses):
+            if idx not in analyses:
+                analyses[idx] = self.analyze_response(answer, questions[idx], behavioral_indicators, idx)
+        
+        return [analyses[idx] for idx in range(len(user_responses))]
+    
+    async def aanalyze_responses_batched(
+        self,
+        user_responses: list[str],
+        questions: list[str],
+        behavioral_indicators: list[str]
+    ) -> list[ResponseAnalysis]:
+        """Async-Variante von analyze_responses_batched (Fallback-Calls laufen parallel)."""
+        messages = self._build_batched_messages(user_responses, questions, behavioral_indicators)
+        try:
+            response = await self._active_llm().ainvoke(messages, response_format=BATCHED_RESPONSE_FORMAT)
+            self._record_usage(response)
+            analyses = self._parse_batched_response(response, len(user_responses))
+        except Exception as e:
+            print(f"⚠️ Batched Reflection fehlgeschlagen ({e}), Fallback auf Einzel-Calls")
+            analyses = {}
+        
+        # Nur die ungültigen Antworten einzeln (parallel) neu anfragen
+        missing = [idx for idx in range(len(user_responses)) if idx not in analyses]
+        retried = await asyncio.gather(*(
+            self.aanalyze_response(user_responses[idx], questions[idx], behavioral_indicators, idx)
+            for idx in missing
+        ))
+        analyses.update(zip(missing, retried))
+        
+        return [analyses[idx] for idx in range(len(user_responses))]
+    
+    def _build_messages(
+        self,
+        user_response: str,
+        question: str,
+        behavioral_indicators: list[str]
+    ) -> list:
+        """Baut System- und User-Prompt für eine Antwort."""
+        system_prompt = compile_system_prompt(tuple(behavioral_indicators))
         
         user_prompt = f"""Frage: {question}
 
@@ -111,83 +321,198 @@ User-Antwort:
 
 Analysiere diese Antwort Schritt für Schritt."""
 
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
+    
+    def _build_batched_messages(
+        self,
+        user_responses: list[str],
+        questions: list[str],
+        behavioral_indicators: list[str]
+    ) -> list:
+        """Baut einen Prompt mit allen Antworten eines Skills (Batched Mode)."""
+        system_prompt = compile_system_prompt(tuple(behavioral_indicators), batched=True)
         
-        response = self.llm.invoke(messages)
+        user_prompt = ""
+        for idx, (question, response) in enumerate(zip(questions, user_responses)):
+            user_prompt += f"""### question_id {idx}
+Frage: {question}
+
+User-Antwort:
+{response}
+
+"""
+        user_prompt += "Analysiere jede Antwort einzeln und Schritt für Schritt."
+
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _record_usage(self, response) -> None:
+        """Zählt Prompt-/Completion-Tokens und den Anteil, den der Provider aus seinem Prompt Cache liefert."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens", 0)
+        completion_tokens = usage.get("output_tokens", 0)
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read")
+        
+        if cached_tokens is None:
+            # Fallback: rohe OpenAI token_usage
+            token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+            prompt_tokens = prompt_tokens or token_usage.get("prompt_tokens", 0)
+            completion_tokens = completion_tokens or token_usage.get("completion_tokens", 0)
+            cached_tokens = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        
+        with self._stats_lock:
+            self.prompt_cache_stats["calls"] += 1
+            self.prompt_cache_stats["prompt_tokens"] += prompt_tokens
+            self.prompt_cache_stats["cached_tokens"] += cached_tokens
+            self.prompt_cache_stats["completion_tokens"] += completion_tokens
+    
+    def prompt_cache_hit_rate(self) -> float:
+        """Anteil der Prompt-Tokens, die vom Provider-Cache kamen (0.0-1.0)."""
+        with self._stats_lock:
+            total = self.prompt_cache_stats["prompt_tokens"]
+            return self.prompt_cache_stats["cached_tokens"] / total if total else 0.0
+    
+    def _cache_key(self, messages: list, use_cache: Optional[bool]) -> Optional[str]:
+        """Cache-Key für einen Call oder None, wenn der Cache umgangen wird."""
+        if self.cache is None or use_cache is False:
+            return None
+        llm = self._active_llm()
+        return ReflectionCache.make_key(
+            getattr(llm, "model_name", ""),
+            getattr(llm, "temperature", None),
+            messages[0].content,
+            messages[1].content
+        )
+    
+    def _validate(self, content: str, question_index: int) -> ResponseAnalysis:
+        """
+        Validiert den JSON-Output direkt als ResponseAnalysis.
         
-        # Parse JSON Response
+        Hält sich das Modell nicht exakt ans Schema, werden die bekannten
+        Abweichungen normalisiert (siehe _to_analysis), bevor es als Fehler zählt.
+        """
+        return self._validate_result(json.loads(content), question_index)
+    
+    def _validate_result(self, result: dict, question_index: int) -> ResponseAnalysis:
+        """Validiert ein bereits geparstes LLM-Resultat (siehe _validate)."""
         try:
-            result = json.loads(response.content)
-            
-            # FIX 1: Normalize STAR keys (LLM gibt manchmal Capitalized zurück)
-            star_raw = result.get("star_analysis", {})
-            star_normalized = {
-                "situation": star_raw.get("Situation") or star_raw.get("situation", ""),
-                "task": star_raw.get("Task") or star_raw.get("task", ""),
-                "action": star_raw.get("Action") or star_raw.get("action", ""),
-                "result": star_raw.get("Result") or star_raw.get("result", "")
-            }
-            
-            # FIX 2: Ensure evidence is always a list
-            for ind in result.get("indicators_found", []):
-                if isinstance(ind.get("evidence"), str):
-                    ind["evidence"] = [ind["evidence"]] if ind["evidence"] else []
-                elif not isinstance(ind.get("evidence"), list):
-                    ind["evidence"] = []
-            
-            # FIX 3: Ensure indicators_missing is list of strings (not dicts)
-            indicators_missing = result.get("indicators_missing", [])
-            if indicators_missing and isinstance(indicators_missing[0], dict):
-                indicators_missing = [ind.get("indicator", "") for ind in indicators_missing]
-            
-            # Convert to ResponseAnalysis
-            return ResponseAnalysis(
-                question_id=question_index,
-                star_analysis=STARAnalysis(**star_normalized),
-                indicators_found=[
-                    IndicatorScore(**ind) for ind in result["indicators_found"]
-                ],
-                indicators_missing=indicators_missing,
-                score=result["score"],
-                reasoning=result["reasoning"],
-                confidence=result["confidence"]
-            )
+            return ResponseAnalysis.model_validate({**result, "question_id": question_index})
+        except ValidationError:
+            return self._to_analysis(result, question_index)
+    
+    def _evaluate_attempt(
+        self,
+        messages: list,
+        response,
+        llm_error: Optional[Exception],
+        question_index: int,
+        attempt: int,
+        request: Optional[list] = None
+    ) -> _AttemptOutcome:
+        """
+        Wertet einen Versuch aus (gemeinsam für analyze_response und aanalyze_response).
         
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON Parse Error: {e}")
-            print(f"Raw response: {response.content[:500]}")
-            return ResponseAnalysis(
-                question_id=question_index,
-                star_analysis=STARAnalysis(
-                    situation="Parse Error",
-                    task="",
-                    action="",
-                    result=""
-                ),
-                indicators_found=[],
-                indicators_missing=behavioral_indicators,
-                score=1.0,
-                reasoning="LLM Response konnte nicht geparst werden",
-                confidence=0.0
-            )
+        - gültiger Output → Analyse
+        - ungültiger Output → Repair-Request ohne Wartezeit
+        - LLM-Fehler → derselbe Request nach exponentiellem Backoff
         
-        except Exception as e:
-            print(f"❌ Error creating ResponseAnalysis: {e}")
-            print(f"Result: {result if 'result' in locals() else 'N/A'}")
-            return ResponseAnalysis(
-                question_id=question_index,
-                star_analysis=STARAnalysis(
-                    situation="Error",
-                    task="",
-                    action="",
-                    result=""
-                ),
-                indicators_found=[],
-                indicators_missing=behavioral_indicators,
-                score=1.0,
-                reasoning=f"Error: {str(e)}",
-                confidence=0.0
-            )
\ No newline at end of file
+        Zählt parse_failures / llm_errors und jeden Retry pro Modell.
+        """
+        if llm_error is None:
+            try:
+                return _AttemptOutcome(self._validate(response.content, question_index))
+            except Exception as e:
+                error, event, delay = e, "parse_failures", 0.0
+                request = self._repair_messages(messages, response, e)
+                print(f"❌ Ungültiger Reflection Output (Frage {question_index + 1}, Versuch {attempt + 1}): {e}")
+        else:
+            error, event, delay = llm_error, "llm_errors", self.retry_backoff * 2 ** attempt
+            print(f"❌ LLM Error (Frage {question_index + 1}, Versuch {attempt + 1}): {llm_error}")
+        
+        self._count_output_event(event)
+        if attempt < self.max_retries:
+            self._count_output_event("retries")
+        return _AttemptOutcome(None, error, request, delay)
+    
+    @staticmethod
+    def _repair_messages(messages: list, response, error: Exception) -> list:
+        """Repair-Request für genau diese Antwort (bisheriger Output + Fehler)."""
+        return messages + [
+            AIMessage(content=response.content),
+            HumanMessage(content=f"""Deine Antwort war kein gültiges JSON nach dem vorgegebenen Schema.
+
+Fehler: {str(error)[:500]}
+
+Gib die Analyse erneut zurück, ausschließlich als JSON im OUTPUT FORMAT.""")
+        ]
+    
+    def _count_output_event(self, event: str) -> None:
+        """Zählt parse_failures / llm_errors / retries pro Modell."""
+        model = getattr(self._active_llm(), "model_name", "unknown")
+        with self._stats_lock:
+            stats = self.output_stats.setdefault(model, {"parse_failures": 0, "llm_errors": 0, "retries": 0})
+            stats[event] += 1
+    
+    def _to_analysis(self, result: dict, question_index: int) -> ResponseAnalysis:
+        """Normalisiert ein LLM-Resultat und validiert es als ResponseAnalysis."""
+        # FIX 1: Normalize STAR keys (LLM gibt manchmal Capitalized zurück)
+        star_raw = result.get("star_analysis", {})
+        star_normalized = {
+            "situation": star_raw.get("Situation") or star_raw.get("situation", ""),
+            "task": star_raw.get("Task") or star_raw.get("task", ""),
+            "action": star_raw.get("Action") or star_raw.get("action", ""),
+            "result": star_raw.get("Result") or star_raw.get("result", "")
+        }
+        
+        # FIX 2: Ensure evidence is always a list
+        for ind in result.get("indicators_found", []):
+            if isinstance(ind.get("evidence"), str):
+                ind["evidence"] = [ind["evidence"]] if ind["evidence"] else []
+            elif not isinstance(ind.get("evidence"), list):
+                ind["evidence"] = []
+        
+        # FIX 3: Ensure indicators_missing is list of strings (not dicts)
+        indicators_missing = result.get("indicators_missing", [])
+        if indicators_missing and isinstance(indicators_missing[0], dict):
+            indicators_missing = [ind.get("indicator", "") for ind in indicators_missing]
+        
+        # Convert to ResponseAnalysis
+        return ResponseAnalysis(
+            question_id=question_index,
+            star_analysis=STARAnalysis(**star_normalized),
+            indicators_found=[
+                IndicatorScore(**ind) for ind in result["indicators_found"]
+            ],
+            indicators_missing=indicators_missing,
+            score=result["score"],
+            reasoning=result["reasoning"],
+            confidence=result["confidence"]
+        )
+    
+    def _parse_batched_response(self, response, expected: int) -> dict[int, ResponseAnalysis]:
+        """
+        Parst die Batched-Antwort.
+        
+        Returns:
+            Dict question_id → ResponseAnalysis, nur mit den gültigen Analysen
+        """
+        result = json.loads(response.content)
+        items = result["analyses"] if isinstance(result, dict) else result
+        
+        analyses = {}
+        for idx, item in enumerate(items):
+            try:
+                question_id = int(item.get("question_id", idx))
+                if not 0 <= question_id < expected or question_id in analyses:
+                    raise ValueError(f"Unexpected question_id {question_id}")
+                analyses[question_id] = self._validate_result(item, question_id)
+            except Exception as e:
+                self._count_output_event("parse_failures")
+                print(f"❌ Ungültige Batched-Analyse #{idx}: {e}")
+        
+        return analyses
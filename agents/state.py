@@ -34,12 +34,33 @@ class ResponseAnalysis(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0)
 
 
+class ReflectionOutput(BaseModel):
+    """LLM Output Schema einer Antwort (ResponseAnalysis ohne question_id)"""
+    star_analysis: STARAnalysis
+    indicators_found: List[IndicatorScore]
+    indicators_missing: List[str]
+    score: float = Field(ge=1.0, le=5.0)
+    reasoning: str
+    confidence: float = Field(ge=0.0, le=1.0)
+
+
+class BatchedReflectionOutput(BaseModel):
+    """LLM Output Schema im Batched Mode (alle Antworten eines Skills)"""
+    analyses: List[ResponseAnalysis]
+
+
 class AgentState(TypedDict):
     """Globaler State für alle Agents"""
     
     # Chat History
     messages: Annotated[List, add_messages]
     
+    # Session (Key für die Future Map der vorab gestarteten Analysen)
+    session_id: Optional[str]
+    
+    # Token-Budget der Session ("ok", "downgrade", "exceeded"), siehe utils/budget.py
+    budget_status: Optional[str]
+    
     # User Input
     selected_skill: Optional[str]
     self_report_score: Optional[float]
@@ -2,22 +2,39 @@
 EI-Mentor Agent - Chainlit UI
 Multi-Agent System für Emotional Intelligence Assessment mit XAI.
 """
+from __future__ import annotations
+
 import chainlit as cl
-import json
-from pathlib import Path
-from agents.graph import app as agent_graph
-from agents.state import AgentState
-from utils.scoring import calculate_indicator_coverage, get_strength_and_weaknesses
-from utils.session_manager import SessionManager
+from contextlib import AsyncExitStack
+from typing import TYPE_CHECKING
+from agents.prefetch import pending_analyses
+from utils.framework import get_framework
+from utils.session_manager import AsyncSessionManager
+from utils.metrics import start_metrics_server
+from utils.budget import TokenBudget, BUDGET_ACTIONS, BUDGET_OK, BUDGET_DOWNGRADE, BUDGET_EXCEEDED
+from utils.pdf_service import PDFRenderService, PDFServiceBusy
+from utils.report_cache import ReportCache
+import asyncio
+import os
 import uuid
 from datetime import datetime
 
-# Load Goleman Framework
-FRAMEWORK_PATH = Path("data/frameworks/goleman_framework.json")
-with open(FRAMEWORK_PATH, "r", encoding="utf-8") as f:
-    GOLEMAN_FRAMEWORK = json.load(f)
+# Graph, Agents und LLM-Clients (langgraph, langchain, openai) werden erst bei
+# Bedarf importiert bzw. beim Start im Hintergrund vorgewärmt → schneller Cold Start
+if TYPE_CHECKING:
+    from agents.state import AgentState
+
+session_manager = AsyncSessionManager()
+budget = TokenBudget(session_manager)
+pdf_service = PDFRenderService()
+report_cache = ReportCache()
 
-session_manager = SessionManager()
+# Graph-Nodes, die als eigener XAI-Step erscheinen (geöffnet/geschlossen über die Node-Events)
+NODE_STEPS = {
+    "reflection": ("🧠 Reflection Agent", "llm"),
+    "assessment": ("📊 Assessment Agent", "tool"),
+    "dunning_kruger": ("🎯 Dunning-Kruger Analyse", "tool")
+}
 
 
 @cl.on_chat_start
@@ -57,9 +74,47 @@ Willkommen zum **Emotional Intelligence Assessment** basierend auf Daniel Golema
     ).send()
 
 
+@cl.on_chat_end
+async def end():
+    """Chat Ende - laufende Hintergrund-Analysen abbrechen"""
+    pending_analyses.cancel(cl.user_session.get("session_id"))
+
+
+def warm_up_agents():
+    """Importiert Graph und Agents und erstellt die LLM-Clients (läuft im Thread)."""
+    from agents.graph import warm_up
+    
+    warm_up()
+    print("🔥 Agents vorgewärmt")
+
+
+@cl.on_app_startup
+async def startup():
+    """App Start - optionaler Prometheus Metrics Endpoint, Agents und PDF-Worker im Hintergrund vorwärmen"""
+    metrics_port = int(os.getenv("METRICS_PORT", "0"))
+    if metrics_port:
+        start_metrics_server(metrics_port, host=os.getenv("METRICS_HOST", "127.0.0.1"))
+    
+    # Die App nimmt sofort Verbindungen an; das erste Assessment findet die Agents meist schon fertig vor
+    if os.getenv("PREWARM_AGENTS", "true").lower() == "true":
+        asyncio.get_running_loop().run_in_executor(None, warm_up_agents)
+        pdf_service.start()
+
+
+@cl.on_app_shutdown
+async def shutdown():
+    """App Shutdown - ausstehende Session- und Archiv-Writes persistieren, HTTP Pool und PDF-Worker schließen"""
+    from agents.llm import aclose_http_clients
+    
+    await session_manager.close()
+    await aclose_http_clients()
+    await pdf_service.flush_archive()
+    pdf_service.shutdown()
+
+
 async def show_dimensions(session_id: str):
     """Zeigt die 5 EI-Dimensionen mit Progress"""
-    progress = session_manager.get_progress(session_id)
+    progress = await session_manager.get_progress(session_id)
     
     msg = """## 🎯 Die 5 EI-Dimensionen nach Goleman
 
@@ -84,18 +139,18 @@ Die Fähigkeit, Beziehungen zu managen und andere zu beeinflussen. Du kommunizie
     
     # Progress Tracking
     if progress["count"] > 0:
-        msg += f"✅ **Bereits getestet:** {progress['count']}/5\n"
-        tested_names = [GOLEMAN_FRAMEWORK["skills"][sid]["name"] for sid in progress["tested"]]
+        msg += f"✅ **Bereits getestet:** {progress['count']}/{progress['total']}\n"
+        tested_names = [get_framework().name(sid) for sid in progress["tested"]]
         msg += f"   ({', '.join(tested_names)})\n\n"
         
         if not progress["can_download_pdf"]:
             remaining = 3 - progress["count"]
             msg += f"📊 **Noch {remaining} Dimension{'en' if remaining > 1 else ''} bis zum PDF-Report!**\n\n"
         else:
-            if progress["count"] < 5:
-                msg += f"🎉 **PDF-Report verfügbar!** Noch {5 - progress['count']} für vollständige Analyse.\n\n"
+            if progress["remaining"]:
+                msg += f"🎉 **PDF-Report verfügbar!** Noch {len(progress['remaining'])} für vollständige Analyse.\n\n"
             else:
-                msg += "🏆 **VOLLSTÄNDIG!** Alle 5 Dimensionen getestet!\n\n"
+                msg += f"🏆 **VOLLSTÄNDIG!** Alle {progress['total']} Dimensionen getestet!\n\n"
     
     msg += "**Für welche Dimension interessierst du dich am meisten?**\n\nAntworte mit **1-5** oder dem **Namen** (z.B. 'Empathie'):"
     
@@ -210,29 +265,13 @@ async def main(message: cl.Message):
     
     if onboarding_step == "dimension_selection":
         # SKILL SELECTION
-        skill_map = {
-            "1": "self_awareness",
-            "2": "self_regulation", 
-            "3": "motivation",
-            "4": "empathy",
-            "5": "social_skills",
-            "selbstwahrnehmung": "self_awareness",
-            "self awareness": "self_awareness",
-            "selbststeuerung": "self_regulation",
-            "self regulation": "self_regulation",
-            "motivation": "motivation",
-            "empathie": "empathy",
-            "empathy": "empathy",
-            "soziale kompetenz": "social_skills",
-            "social skills": "social_skills"
-        }
-        
-        skill_id = skill_map.get(user_input)
+        framework = get_framework()
+        skill_id = framework.resolve(user_input)
         
         # Check if already tested
-        progress = session_manager.get_progress(session_id)
+        progress = await session_manager.get_progress(session_id)
         if skill_id and skill_id in progress["tested"]:
-            skill_name = GOLEMAN_FRAMEWORK["skills"][skill_id]["name"]
+            skill_name = framework.name(skill_id)
             await cl.Message(
                 content=f"❌ **{skill_name}** hast du bereits getestet! Wähle eine andere Dimension."
             ).send()
@@ -244,11 +283,28 @@ async def main(message: cl.Message):
             ).send()
             return
         
-        skill_data = GOLEMAN_FRAMEWORK["skills"][skill_id]
+        # Token-Budget: neue Assessments erst ablehnen, laufende Interviews nie abbrechen
+        if await budget.status(session_id) == BUDGET_EXCEEDED:
+            BUDGET_ACTIONS.inc(action="refuse")
+            await cl.Message(
+                content="⏸️ Das Analyse-Budget für heute ist leider aufgebraucht. "
+                        "Deine bisherigen Ergebnisse bleiben gespeichert - versuch es gerne später noch einmal!"
+            ).send()
+            return
+        
+        # State hält die Skill-Daten dieser Framework-Version → spätere Reloads ändern das Interview nicht
+        skill_data = framework.skill(skill_id)
+        
+        # Offene Analysen eines abgebrochenen Interviews verwerfen
+        pending_analyses.cancel(session_id)
         
         # Initialize State
+        from agents.state import AgentState
+        
         state = AgentState(
             messages=[],
+            session_id=session_id,
+            budget_status=BUDGET_OK,
             selected_skill=skill_id,
             self_report_score=None,
             skill_definition=skill_data["definition"],
@@ -290,14 +346,14 @@ async def main(message: cl.Message):
     if onboarding_step == "quality_tips_shown":
             if user_input in ["bereit", "start", "los", "ja", "ok", "weiter"]:
                 cl.user_session.set("onboarding_step", "active_assessment")
-                await ask_self_report(GOLEMAN_FRAMEWORK["skills"][state["selected_skill"]]["name"])
+                await ask_self_report(get_framework().name(state["selected_skill"]))
             else:
                 await cl.Message(content="Schreib **'Bereit'** oder **'Start'** um fortzufahren!").send()
             return
     
     # ASSESSMENT COMPLETED - Next Action
     if cl.user_session.get("awaiting_next_action"):
-        progress = session_manager.get_progress(session_id)
+        progress = await session_manager.get_progress(session_id)
         
         if user_input in ["neu", "andere dimension", "andere", "nochmal", "weiter"]:
             cl.user_session.set("onboarding_step", "dimension_selection")
@@ -322,6 +378,15 @@ Viel Erfolg bei der Weiterentwicklung deiner emotionalen Intelligenz! 🚀"""
         await cl.Message(content="⚠️ Bitte lade die Seite neu, um zu starten.").send()
         return
     
+    # Analyse fehlgeschlagen → auf Wunsch mit denselben Antworten wiederholen
+    if cl.user_session.get("awaiting_analysis_retry"):
+        if user_input in ["nochmal", "ja", "los", "ok", "weiter"]:
+            cl.user_session.set("awaiting_analysis_retry", False)
+            await run_agent_analysis(state)
+        else:
+            await cl.Message(content="Schreib **'Nochmal'**, um die Analyse erneut zu starten.").send()
+        return
+    
     # Check if waiting for interview start
     if cl.user_session.get("awaiting_interview_start"):
         if user_input in ["los", "start", "ja", "ok", "bereit", "go", "weiter"]:
@@ -375,9 +440,15 @@ async def conduct_interview(state: AgentState):
 
 async def handle_interview_response(response: str, state: AgentState):
     """Verarbeitet User-Antwort während Interview"""
+    from agents.graph import schedule_reflection
+    
     state["user_responses"].append(response)
     question_idx = state["current_question_index"]
     
+    # Analyse sofort im Hintergrund starten, während der User weiter antwortet
+    await update_budget_status(state)
+    schedule_reflection(state, question_idx)
+    
     async with cl.Step(name=f"✅ Antwort {question_idx + 1}/3 gespeichert") as step:
         step.output = f"Deine Antwort ({len(response)} Zeichen) wurde gespeichert."
     
@@ -390,57 +461,161 @@ async def handle_interview_response(response: str, state: AgentState):
         await run_agent_analysis(state)
 
 
+async def update_budget_status(state: AgentState):
+    """
+    Prüft das Token-Budget vor den nächsten Reflection-Calls.
+    
+    Mitten im Interview wird nie abgelehnt: ist das Budget erschöpft,
+    läuft der Rest der Session mit dem günstigeren Fallback-Modell.
+    """
+    status = await budget.status(state["session_id"])
+    if status != BUDGET_OK:
+        status = BUDGET_DOWNGRADE
+    
+    if status == BUDGET_DOWNGRADE and state.get("budget_status") != BUDGET_DOWNGRADE:
+        BUDGET_ACTIONS.inc(action="downgrade")
+        print(f"💸 Budget erreicht (Session {state['session_id']}) - Reflection mit Fallback-Modell")
+    state["budget_status"] = status
+
+
 async def run_agent_analysis(state: AgentState):
     """Führt komplette Multi-Agent Analyse durch mit XAI Steps"""
+    from agents.graph import app as agent_graph, REFLECTION_ANSWER_EVENT
+    from agents.reflection_agent import ReflectionError
+    
+    await update_budget_status(state)
+    
     await cl.Message(
         content="""## 🔬 Starte Multi-Agent Analyse...
 
 Das kann 20-30 Sekunden dauern. Du siehst gleich jeden Schritt transparent!"""
     ).send()
     
-    # Run Reflection Agent
-    async with cl.Step(name="🧠 Reflection Agent", type="llm") as step:
-        step.output = "Analysiere alle 3 Antworten mit Chain-of-Thought Reasoning..."
-        result = agent_graph.invoke(state)
+    # Jeder Node wird zum Step, sobald er startet; Ergebnisse pro Antwort werden live gestreamt
+    result = None
+    last_node_state = None
+    open_steps: dict[str, tuple[cl.Step, AsyncExitStack]] = {}
+    try:
+        async for event in agent_graph.astream_events(state, version="v2"):
+            kind = event["event"]
+            # Node-Runs sind direkte Kinder des Graph-Runs
+            is_node = len(event.get("parent_ids") or []) == 1
+            
+            if kind == "on_custom_event" and event["name"] == REFLECTION_ANSWER_EVENT:
+                await show_answer_step(event["data"])
+            elif kind == "on_chain_start" and is_node and event["name"] in NODE_STEPS:
+                open_steps[event["name"]] = await open_node_step(event["name"])
+            elif kind == "on_chain_end" and is_node:
+                last_node_state = event["data"].get("output") or last_node_state
+                if event["name"] in open_steps:
+                    step, stack = open_steps.pop(event["name"])
+                    step.output = node_step_output(event["name"], event["data"].get("output") or {})
+                    await stack.aclose()
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # Root-Run beendet → finaler State
+                result = event["data"]["output"]
+    except BaseException as e:
+        for step, stack in open_steps.values():
+            step.output = f"❌ Abgebrochen: {e}"
+            step.is_error = True
+            await stack.aclose()
+        if not isinstance(e, ReflectionError):
+            raise
         
-        if result.get("response_analyses"):
-            analyses_msg = "**Analyse pro Antwort:**\n\n"
-            for i, analysis in enumerate(result["response_analyses"], 1):
-                found_count = len([ind for ind in analysis.indicators_found if ind.found])
-                analyses_msg += f"**Frage {i}:**\n"
-                analyses_msg += f"- Preliminary Score: {analysis.score}/5\n"
-                analyses_msg += f"- Confidence: {analysis.confidence:.0%}\n"
-                analyses_msg += f"- Behavioral Indicators gefunden: {found_count}/{len(analysis.indicators_found)}\n\n"
-            step.output = analyses_msg
-        else:
-            step.output = "Keine Analysen generiert (prüfe Logs)"
+        # Kein Fake-Score: Antworten bleiben im State, die Analyse kann neu gestartet werden
+        print(f"❌ Reflection fehlgeschlagen (Session {state.get('session_id')}): {e}")
+        cl.user_session.set("awaiting_analysis_retry", True)
+        await cl.Message(
+            content="❌ Die Analyse deiner Antworten ist fehlgeschlagen (KI-Dienst gerade nicht erreichbar). "
+                    "Deine Antworten sind gespeichert - schreib **'Nochmal'**, um die Analyse erneut zu starten."
+        ).send()
+        return
     
-    # Assessment Agent
-    async with cl.Step(name="📊 Assessment Agent", type="tool") as step:
-        agent_score = result.get("agent_score", 0)
-        step.output = f"""**Finaler Agent-Score:** {agent_score}/5
-
-**Berechnungsmethode:** Gewichteter Durchschnitt aller 3 Antworten basierend auf Confidence-Levels der Reflection-Analysen."""
+    # Ohne Root-Event (z.B. abgebrochener Stream) gilt der State des letzten Nodes
+    result = result if isinstance(result, dict) else last_node_state
+    if not isinstance(result, dict):
+        await cl.Message(
+            content="❌ Die Analyse wurde nicht abgeschlossen. Bitte lade die Seite neu und versuch es noch einmal."
+        ).send()
+        return
     
-    # Dunning-Kruger
-    async with cl.Step(name="🎯 Dunning-Kruger Analyse", type="tool") as step:
-        dk_msg = f"""**Self-Report:** {result.get('self_report_score', 0)}/5  
-**Agent-Score:** {result.get('agent_score', 0)}/5  
-**Gap:** {result.get('dunning_kruger_gap', 0):+.1f}  
-**Klassifikation:** {result.get('classification', 'unknown')}"""
-        step.output = dk_msg
+    # Timing (wo die Zeit der Analyse geblieben ist)
+    timing = next(
+        (d for d in result.get("agent_decisions", []) if d.get("decision") == "node_timing"),
+        None
+    )
+    if timing:
+        async with cl.Step(name="⏱️ Timing", type="tool") as step:
+            timing_msg = f"**Gesamt:** {timing['total_ms'] / 1000:.1f}s\n\n"
+            for node, record in timing["nodes"].items():
+                timing_msg += f"- {node}: {record['ms']:.0f} ms"
+                if record.get("llm_calls"):
+                    timing_msg += (f" ({record['llm_calls']} LLM-Calls, {record['tokens']} Tokens, "
+                                   f"${record['cost_usd']:.4f})")
+                timing_msg += "\n"
+            step.output = timing_msg
     
     await show_final_feedback(result)
 
 
+async def open_node_step(node: str) -> tuple[cl.Step, AsyncExitStack]:
+    """Öffnet den Step eines Nodes (bleibt offen bis zu dessen on_chain_end)."""
+    name, step_type = NODE_STEPS[node]
+    stack = AsyncExitStack()
+    step = await stack.enter_async_context(cl.Step(name=name, type=step_type))
+    if node == "reflection":
+        step.output = "Analysiere alle 3 Antworten mit Chain-of-Thought Reasoning..."
+        await step.update()
+    return step, stack
+
+
+def node_step_output(node: str, node_state: dict) -> str:
+    """XAI-Text eines Steps aus dem State nach dem Node."""
+    if node == "reflection":
+        if not node_state.get("response_analyses"):
+            return "Keine Analysen generiert (prüfe Logs)"
+        analyses_msg = "**Analyse pro Antwort:**\n\n"
+        for i, analysis in enumerate(node_state["response_analyses"], 1):
+            found_count = len([ind for ind in analysis.indicators_found if ind.found])
+            analyses_msg += f"**Frage {i}:**\n"
+            analyses_msg += f"- Preliminary Score: {analysis.score}/5\n"
+            analyses_msg += f"- Confidence: {analysis.confidence:.0%}\n"
+            analyses_msg += f"- Behavioral Indicators gefunden: {found_count}/{len(analysis.indicators_found)}\n\n"
+        return analyses_msg
+    
+    if node == "assessment":
+        return f"""**Finaler Agent-Score:** {node_state.get('agent_score', 0)}/5
+
+**Berechnungsmethode:** Gewichteter Durchschnitt aller 3 Antworten basierend auf Confidence-Levels der Reflection-Analysen."""
+    
+    return f"""**Self-Report:** {node_state.get('self_report_score', 0)}/5  
+**Agent-Score:** {node_state.get('agent_score', 0)}/5  
+**Gap:** {node_state.get('dunning_kruger_gap') or 0:+.1f}  
+**Klassifikation:** {node_state.get('classification', 'unknown')}"""
+
+
+async def show_answer_step(answer: dict):
+    """Zeigt das Ergebnis einer einzelnen Antwort als Sub-Step, sobald es fertig ist"""
+    async with cl.Step(name=f"Frage {answer['question_id'] + 1}", type="tool") as step:
+        msg = f"""- Preliminary Score: {answer['score']}/5
+- Confidence: {answer['confidence']:.0%}
+- Behavioral Indicators gefunden: {len(answer['indicators_found'])}/{answer['indicators_total']}
+"""
+        for indicator in answer["indicators_found"]:
+            msg += f"\n  • {indicator}"
+        step.output = msg
+
+
 async def show_final_feedback(state: AgentState):
     """Zeigt finales Assessment"""
+    from utils.scoring import calculate_indicator_coverage, get_strength_and_weaknesses
+    
     session_id = cl.user_session.get("session_id")
     
     # Save Assessment
     assessment_data = {
         "skill_id": state.get("selected_skill"),
-        "skill_name": GOLEMAN_FRAMEWORK["skills"][state.get("selected_skill")]["name"],
+        "skill_name": get_framework().name(state.get("selected_skill")),
         "self_report": state.get("self_report_score"),
         "agent_score": state.get("agent_score"),
         "gap": state.get("dunning_kruger_gap"),
@@ -449,15 +624,15 @@ async def show_final_feedback(state: AgentState):
         "indicators_coverage": calculate_indicator_coverage(state.get("response_analyses", []))["coverage_percentage"]
     }
     
-    session_manager.add_assessment(session_id, assessment_data)
-    progress = session_manager.get_progress(session_id)
+    await session_manager.add_assessment(session_id, assessment_data)
+    progress = await session_manager.get_progress(session_id)
     coverage = calculate_indicator_coverage(state.get("response_analyses", []))
     strengths_weaknesses = get_strength_and_weaknesses(
         state.get("response_analyses", []),
         state.get("behavioral_indicators", [])
     )
     
-    skill_name = GOLEMAN_FRAMEWORK["skills"][state.get("selected_skill")]["name"]
+    skill_name = assessment_data["skill_name"]
     
     # Build Feedback
     feedback = f"""# 🎯 Assessment Ergebnis: {skill_name}
@@ -525,7 +700,7 @@ Möchtest du nochmal versuchen? Schreib **'Neu'**!"""
 
 **Indicator Coverage:** {coverage['coverage_percentage']}% ({coverage['found_count']}/{coverage['total_indicators']})
 
-## 📊 Session Progress: {progress['count']}/5 Dimensionen
+## 📊 Session Progress: {progress['count']}/{progress['total']} Dimensionen
 """
     
     # Motivations-Messages
@@ -564,10 +739,9 @@ Möchtest du nochmal versuchen? Schreib **'Neu'**!"""
 
 async def offer_pdf_export(session_id: str):
     """Bietet PDF-Export an wenn ≥3 Dimensionen"""
-    from utils.pdf_generator import generate_pdf_report
-    import shutil
+    from utils.pdf_generator import report_filename, report_template_version
     
-    progress = session_manager.get_progress(session_id)
+    progress = await session_manager.get_progress(session_id)
     
     if not progress["can_download_pdf"]:
         return
@@ -607,48 +781,65 @@ Dies hilft, das Tool zu verbessern.""",
     ).send()
     
     if consent and consent.get("value") == "yes":
-        session_manager.update_consent(session_id, True)
+        await session_manager.update_consent(session_id, True)
     
-    # Generiere PDF
+    # Generiere PDF (im Worker-Prozess, der Event Loop bleibt für alle anderen User frei)
     async with cl.Step(name="📄 Generiere PDF-Report") as step:
-        step.output = "Erstelle Report mit Radar Chart..."
+    
+        async def show_status(status: str):
+            step.output = status
+            await step.update()
         
-        session_data = session_manager.get_session(session_id)
-        output_dir = Path("data/reports")
+        session_data = await session_manager.get_session(session_id)
+        pdf_filename = report_filename(participant_name)
+        
+        # Unveränderter Report (gleicher Name, keine neuen Assessments) kommt aus dem Cache
+        cache_key = report_cache.make_key(participant_name, session_data["assessments"], report_template_version())
+        pdf_bytes = await report_cache.aget(cache_key)
         
         try:
-            pdf_path = generate_pdf_report(
-                session_data=session_data,
-                participant_name=participant_name,
-                output_dir=output_dir
-            )
-            
-            # WICHTIG: Kopiere PDF in Chainlit's public directory
-            public_dir = Path("public")
-            public_dir.mkdir(exist_ok=True)
-            
-            pdf_filename = Path(pdf_path).name
-            public_pdf_path = public_dir / pdf_filename
-            shutil.copy(pdf_path, public_pdf_path)
+            if pdf_bytes is None:
+                pdf_bytes = await pdf_service.render(
+                    session_data=session_data,
+                    participant_name=participant_name,
+                    on_status=show_status
+                )
+                await report_cache.aset(cache_key, pdf_bytes)
+                
+                # Optional ins Archiv (PDF_ARCHIVE_DIR), ohne auf die Platte zu warten
+                pdf_service.archive(pdf_bytes, pdf_filename)
             
             step.output = f"✅ PDF erstellt: {pdf_filename}"
+        
+        except PDFServiceBusy:
+            step.output = "⏸️ Gerade werden sehr viele Reports erstellt"
+            await cl.Message(
+                content="⏸️ Gerade werden sehr viele Reports erstellt. Bitte versuch es in ein paar Minuten noch einmal!"
+            ).send()
+            return
+        
+        except TimeoutError:
+            step.output = "❌ Zeitüberschreitung"
+            await cl.Message(content="❌ Die PDF-Generierung hat zu lange gedauert. Bitte versuch es noch einmal.").send()
+            return
             
         except Exception as e:
             step.output = f"❌ Fehler: {e}"
             await cl.Message(content=f"❌ PDF-Generierung fehlgeschlagen: {e}").send()
             return
     
-    # Sende Download-Link
+    # Report direkt aus dem Speicher als Datei-Element dieser Session senden
     await cl.Message(
         content=f"""## 🎉 Dein Report ist fertig, {participant_name}!
 
-**Klicke hier zum Download:**
-
-[📄 **EI-Assessment Report herunterladen**](/{pdf_filename})
+**Dein EI-Assessment Report zum Download:**
 
 ---
 
-Möchtest du weitere Dimensionen testen? **Schreib 'Neu'!**"""
+Möchtest du weitere Dimensionen testen? **Schreib 'Neu'!**""",
+        elements=[
+            cl.File(name=pdf_filename, content=pdf_bytes, mime="application/pdf", display="inline")
+        ]
     ).send()
 
 
@@ -0,0 +1,251 @@
+"""
+Batch Assessment - bewertet historische Interview-Transkripte ohne Chainlit UI.
+
+Input: JSONL, ein Record pro Zeile:
+    {"id": "abc", "skill": "empathy", "self_report": 4, "responses": ["...", "...", "..."]}
+("id" optional, sonst die Zeilennummer)
+
+Output: JSONL mit einem Ergebnis pro Record, wird sofort nach jedem Record
+geschrieben und dient gleichzeitig als Checkpoint: beim Neustart werden alle
+IDs übersprungen, die schon im Output stehen. Zusätzlich landen alle
+Reflection-Ergebnisse im ReflectionCache, damit auch bei abgebrochenen
+Records keine fertigen LLM-Calls wiederholt werden.
+
+Ausführen:
+    python batch_assess.py transcripts.jsonl results.jsonl --workers 8
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from agents.graph import app as agent_graph, get_reflection_agent
+from agents.llm import aclose_http_clients
+from agents.state import AgentState
+from utils.framework import get_framework
+from utils.llm_cache import ReflectionCache
+from utils.rate_limit import llm_priority, PRIORITY_BATCH
+from utils.scoring import calculate_indicator_coverage
+
+
+def load_done_ids(output_path: Path) -> set[str]:
+    """
+    Liest die IDs aller bereits fertigen Records aus dem Output (Checkpoint).
+    
+    Eine nach einem Abbruch halb geschriebene letzte Zeile wird abgeschnitten,
+    damit neue Ergebnisse nicht an sie angehängt werden.
+    """
+    done = set()
+    if not output_path.exists():
+        return done
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    for line in data.decode("utf-8").splitlines():
+        try:
+            done.add(json.loads(line)["id"])
+        except (json.JSONDecodeError, KeyError):
+            continue
+    return done
+
+
+def build_state(record_id: str, record: dict) -> AgentState:
+    """Baut den State eines kompletten Interviews (alle Antworten liegen schon vor)."""
+    framework = get_framework()
+    skill_id = framework.resolve(record["skill"])
+    if skill_id is None:
+        raise ValueError(f"Unbekannter Skill: {record['skill']}")
+
+    skill_data = framework.skill(skill_id)
+    responses = record["responses"]
+    if len(responses) != len(skill_data["star_questions"]):
+        raise ValueError(
+            f"{len(responses)} Antworten, erwartet {len(skill_data['star_questions'])}"
+        )
+
+    return AgentState(
+        messages=[],
+        session_id=f"batch-{record_id}",
+        selected_skill=skill_id,
+        self_report_score=float(record["self_report"]),
+        skill_definition=skill_data["definition"],
+        behavioral_indicators=skill_data["behavioral_indicators"],
+        star_questions=skill_data["star_questions"],
+        current_question_index=len(responses),
+        user_responses=responses,
+        response_analyses=[],
+        agent_score=None,
+        dunning_kruger_gap=None,
+        classification=None,
+        agent_decisions=[],
+        next_step="self_report"
+    )
+
+
+def to_result(record_id: str, result: dict) -> dict:
+    """Serialisierbares Ergebnis eines Records (wie show_final_feedback + Analysen)."""
+    analyses = result.get("response_analyses", [])
+    return {
+        "id": record_id,
+        "skill_id": result.get("selected_skill"),
+        "self_report": result.get("self_report_score"),
+        "agent_score": result.get("agent_score"),
+        "gap": result.get("dunning_kruger_gap"),
+        "classification": result.get("classification"),
+        "interpretation": result.get("dk_interpretation"),
+        "indicators_coverage": calculate_indicator_coverage(analyses)["coverage_percentage"],
+        "response_analyses": [a.model_dump() for a in analyses],
+        "agent_decisions": result.get("agent_decisions", []),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def read_records(input_path: Path, done: set[str], on_invalid):
+    """
+    Streamt (id, record) aus dem Input; fertige IDs werden übersprungen.
+    Ungültige Zeilen gehen an on_invalid(id, fehler) statt den Lauf abzubrechen.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"Record muss ein JSON-Objekt sein, nicht {type(record).__name__}")
+            except ValueError as e:
+                on_invalid(str(line_no), e)
+                continue
+            record_id = str(record.get("id", line_no))
+            if record_id not in done:
+                yield record_id, record
+
+
+class Throughput:
+    """Zählt Records und Tokens seit dem Start für die Fortschrittsanzeige."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+        self._tokens_start = self._tokens()
+
+    @staticmethod
+    def _tokens() -> int:
+        stats = get_reflection_agent().prompt_cache_stats
+        return stats["prompt_tokens"] + stats["completion_tokens"]
+
+    def report(self, final: bool = False) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        tokens = self._tokens() - self._tokens_start
+        prefix = "✅ Fertig" if final else "📈"
+        return (f"{prefix} {self.done} Records ({self.failed} Fehler) | "
+                f"{self.done / elapsed:.2f} records/s | {tokens / elapsed:.0f} tokens/s")
+
+
+async def run_batch(
+    input_path: Path,
+    output_path: Path,
+    errors_path: Path,
+    workers: int,
+    report_every: float
+) -> Throughput:
+    """
+    Verarbeitet alle offenen Records mit einem begrenzten Worker-Pool.
+
+    Die Queue ist begrenzt, damit auch sehr große Inputs nur gestreamt
+    und nie komplett in den Speicher geladen werden.
+    """
+    done = load_done_ids(output_path)
+    if done:
+        print(f"⏭️ {len(done)} Records bereits fertig (Checkpoint), werden übersprungen")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    stats = Throughput()
+
+    with open(output_path, "a", encoding="utf-8") as out, open(errors_path, "a", encoding="utf-8") as err:
+
+        def write_error(record_id: str, error: Exception):
+            # Fehler landen separat, damit sie beim Resume erneut versucht werden
+            print(f"❌ Record {record_id}: {error}")
+            err.write(json.dumps(
+                {"id": record_id, "error_type": type(error).__name__, "error": str(error)},
+                ensure_ascii=False
+            ) + "\n")
+            err.flush()
+            stats.failed += 1
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                record_id, record = item
+                try:
+                    # Scheitert die Analyse einer Antwort endgültig, wirft der Graph ReflectionError
+                    # → kein Ergebnis mit Fake-Score im Output (und damit kein falscher Checkpoint)
+                    result = await agent_graph.ainvoke(build_state(record_id, record))
+                    out.write(json.dumps(to_result(record_id, result), ensure_ascii=False) + "\n")
+                    out.flush()
+                    stats.done += 1
+                except Exception as e:
+                    write_error(record_id, e)
+
+        async def reporter():
+            while True:
+                await asyncio.sleep(report_every)
+                print(stats.report())
+
+        # Batch-Calls stehen im Rate Limiter hinter interaktiven Sessions
+        with llm_priority(PRIORITY_BATCH):
+            tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        progress = asyncio.create_task(reporter())
+
+        try:
+            for item in read_records(input_path, done, write_error):
+                await queue.put(item)
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            progress.cancel()
+            for task in tasks:
+                task.cancel()
+            await aclose_http_clients()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL mit {skill, self_report, responses}")
+    parser.add_argument("output", help="JSONL für Ergebnisse (= Checkpoint)")
+    parser.add_argument("--workers", type=int, default=8, help="gleichzeitige Records")
+    parser.add_argument("--errors", help="JSONL für fehlgeschlagene Records (Default: <output>.errors.jsonl)")
+    parser.add_argument("--cache", default="data/cache/batch_reflection_cache.sqlite",
+                        help="ReflectionCache für Resume innerhalb eines Records")
+    parser.add_argument("--no-cache", action="store_true", help="ReflectionCache nicht verwenden")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Sekunden zwischen Fortschrittsanzeigen")
+    args = parser.parse_args()
+
+    output_path = Path(args.output)
+    errors_path = Path(args.errors) if args.errors else output_path.with_suffix(".errors.jsonl")
+
+    # Agent (und LLM-Client) erst nach dem Parsen erstellen: --help braucht keinen API-Key
+    reflection_agent = get_reflection_agent()
+    if not args.no_cache and reflection_agent.cache is None:
+        reflection_agent.cache = ReflectionCache(path=args.cache, max_entries=1_000_000)
+
+    print(f"🚀 Batch Assessment: {args.input} → {output_path} ({args.workers} Worker)")
+    stats = asyncio.run(run_batch(Path(args.input), output_path, errors_path, args.workers, args.report_every))
+    print(stats.report(final=True))
+
+
+if __name__ == "__main__":
+    main()
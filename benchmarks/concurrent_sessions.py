@@ -0,0 +1,122 @@
+"""
+Concurrency Benchmark für den Agent-Graph.
+
+Simuliert N gleichzeitige Assessments mit einem Fake-LLM (feste Latenz)
+und vergleicht den blockierenden Pfad (invoke im Event Loop) mit dem
+async Pfad (ainvoke). Beim async Pfad bleibt die Latenz pro User flach.
+
+Ausführen:
+    python -m benchmarks.concurrent_sessions --sessions 1 5 10 25 50 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from langchain_core.messages import AIMessage  # noqa: E402
+
+from agents import graph  # noqa: E402
+from agents.state import AgentState  # noqa: E402
+
+FAKE_RESPONSE = json.dumps({
+    "star_analysis": {"situation": "s", "task": "t", "action": "a", "result": "r"},
+    "indicators_found": [
+        {"indicator": "Erkennt Emotionen", "found": True, "evidence": ["..."], "confidence": 0.8}
+    ],
+    "indicators_missing": [],
+    "score": 3.5,
+    "reasoning": "Benchmark",
+    "confidence": 0.8
+})
+
+
+class SleepLLM:
+    """Fake-LLM mit fester Latenz (sync: time.sleep, async: asyncio.sleep)."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, messages, **kwargs):
+        time.sleep(self.latency)
+        return AIMessage(content=FAKE_RESPONSE)
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=FAKE_RESPONSE)
+
+
+def build_state(skill_id: str = "empathy") -> AgentState:
+    """Vollständiger State direkt vor der Reflection."""
+    skill = graph.GOLEMAN_FRAMEWORK["skills"][skill_id]
+    return AgentState(
+        messages=[],
+        session_id=None,
+        selected_skill=skill_id,
+        self_report_score=3.0,
+        skill_definition=skill["definition"],
+        behavioral_indicators=skill["behavioral_indicators"],
+        star_questions=skill["star_questions"],
+        current_question_index=2,
+        user_responses=["Antwort 1", "Antwort 2", "Antwort 3"],
+        response_analyses=[],
+        agent_score=None,
+        dunning_kruger_gap=None,
+        classification=None,
+        agent_decisions=[],
+        next_step="self_report"
+    )
+
+
+async def blocking_session(submitted_at: float) -> float:
+    """Alter Pfad: synchrones invoke direkt im Coroutine-Handler."""
+    graph.app.invoke(build_state())
+    return time.perf_counter() - submitted_at
+
+
+async def async_session(submitted_at: float) -> float:
+    """Neuer Pfad: ainvoke, der Event Loop bleibt frei."""
+    await graph.app.ainvoke(build_state())
+    return time.perf_counter() - submitted_at
+
+
+async def run_level(session_fn, sessions: int) -> list[float]:
+    """
+    Startet alle Sessions gleichzeitig (wie N User die gleichzeitig abschicken).
+    
+    Latenz = Zeit vom gemeinsamen Absenden bis zum Ergebnis der jeweiligen Session.
+    """
+    submitted_at = time.perf_counter()
+    return await asyncio.gather(*(session_fn(submitted_at) for _ in range(sessions)))
+
+
+def summarize(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return f"mean={statistics.mean(ordered):6.2f}s  p95={p95:6.2f}s  max={ordered[-1]:6.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 25, 50])
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake-LLM Latenz pro Call in Sekunden")
+    parser.add_argument("--skip-blocking", action="store_true", help="Nur den async Pfad messen")
+    args = parser.parse_args()
+
+    graph.reflection_agent.llm = SleepLLM(args.latency)
+    graph.print = lambda *a, **k: None  # DEBUG-Output der Nodes unterdrücken
+
+    print(f"🔬 Concurrency Benchmark (Fake-LLM Latenz: {args.latency}s pro Call)\n")
+    for sessions in args.sessions:
+        if not args.skip_blocking:
+            latencies = asyncio.run(run_level(blocking_session, sessions))
+            print(f"invoke  (blockierend) | {sessions:3d} Sessions | {summarize(latencies)}")
+        latencies = asyncio.run(run_level(async_session, sessions))
+        print(f"ainvoke (async)       | {sessions:3d} Sessions | {summarize(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+HTTP Pool Benchmark: Verbindungsaufbau und Tail-Latenz der OpenAI-Calls.
+
+Startet einen lokalen OpenAI-kompatiblen Server (HTTPS mit selbst signiertem
+Zertifikat, falls openssl vorhanden ist) mit fester Server-Latenz und ruft
+ihn über ChatOpenAI auf - einmal mit dem gemeinsamen Keep-Alive Pool aus
+agents.llm, einmal ohne Keep-Alive (jeder Call baut eine neue Verbindung
+auf, wie ein Pool nach dem Idle-Timeout oder ein Client pro Agent).
+
+Gemessen werden der einmalige Verbindungsaufbau (erster vs. warmer Call),
+p50/p99 bei N gleichzeitigen Calls, die Client-CPU pro Call (TLS-Handshakes,
+Pool-Verwaltung) und die Anzahl neu geöffneter Verbindungen.
+
+Client und Server laufen auf derselben Maschine: bei sehr kurzer Server-Latenz
+und hoher Concurrency misst der Benchmark vor allem die Client-CPU. Die
+Pool-Verwaltung von httpcore wächst mit der Zahl der Verbindungen im Pool,
+deshalb LLM_HTTP_MAX_CONNECTIONS nicht größer wählen als nötig.
+
+Ausführen:
+    python -m benchmarks.http_pool --concurrency 1 10 50 --calls 200 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import shutil
+import ssl
+import subprocess
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from langchain_openai import ChatOpenAI
+
+from agents.llm import create_http_clients
+from benchmarks.load_test import percentile
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [
+        {"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}
+    ],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11}
+}
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header und Body sonst in zwei Paketen → Nagle + Delayed ACK (~40ms pro Call)
+    disable_nagle_algorithm = True
+    latency = 0.0
+    connections = None  # multiprocessing.Value, vom Benchmark-Prozess gelesen
+
+    def setup(self):
+        super().setup()
+        with self.connections.get_lock():
+            self.connections.value += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+        body = json.dumps(COMPLETION).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_certificate(tmp: Path):
+    """Selbst signiertes Zertifikat für localhost (None ohne openssl → HTTP)."""
+    if not shutil.which("openssl"):
+        return None
+    cert, key = tmp / "cert.pem", tmp / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True
+    )
+    return cert, key
+
+
+def serve(port_queue, latency: float, certificate, connections) -> None:
+    """Server-Prozess (eigener Prozess, damit er nicht um die GIL des Clients konkurriert)."""
+    CompletionHandler.latency = latency
+    CompletionHandler.connections = connections
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionHandler)
+    server.daemon_threads = True
+    if certificate:
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(*certificate)
+        # Handshake im Handler-Thread statt im accept() → parallel wie bei einem echten Server
+        server.socket = server_context.wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(tmp: Path, latency: float):
+    certificate = make_certificate(tmp)
+    connections = multiprocessing.Value("i", 0)
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve, args=(port_queue, latency, certificate, connections), daemon=True
+    )
+    process.start()
+    port = port_queue.get(timeout=10)
+
+    scheme, verify = "http", True
+    if certificate:
+        scheme, verify = "https", ssl.create_default_context(cafile=str(certificate[0]))
+    return process, connections, f"{scheme}://127.0.0.1:{port}/v1", verify
+
+
+def make_model(base_url: str, verify, pooled: bool) -> ChatOpenAI:
+    # Pool-Einstellungen wie in der App (LLM_HTTP_*); ohne Keep-Alive wird jede Verbindung nach dem Call geschlossen
+    http_client, http_async_client = create_http_clients(verify=verify, max_keepalive=None if pooled else 0)
+    return ChatOpenAI(
+        model="gpt-4o",
+        api_key="sk-benchmark",
+        base_url=base_url,
+        max_retries=0,
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+
+async def run_scenario(model: ChatOpenAI, concurrency: int, calls: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await model.ainvoke(f"Benchmark {i}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    return latencies
+
+
+async def measure_setup(model: ChatOpenAI, warm_calls: int = 20) -> tuple[float, float]:
+    """Erster Call (inkl. Verbindungsaufbau) vs. Median warmer Calls."""
+    start = time.perf_counter()
+    await model.ainvoke("setup")
+    first = time.perf_counter() - start
+    warm = await run_scenario(model, 1, warm_calls)
+    return first, percentile(warm, 50)
+
+
+async def main_async(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        process, connections, base_url, verify = start_server(Path(tmp), args.latency)
+        print(f"🔬 HTTP Pool Benchmark ({base_url}, Server-Latenz {args.latency * 1000:.0f}ms, "
+              f"{args.calls} Calls pro Messung)\n")
+
+        pooled = make_model(base_url, verify, pooled=True)
+        fresh = make_model(base_url, verify, pooled=False)
+
+        first, warm = await measure_setup(make_model(base_url, verify, pooled=True))
+        print(f"Verbindungsaufbau: erster Call {first * 1000:.1f}ms, warmer Call {warm * 1000:.1f}ms "
+              f"→ {max(first - warm, 0) * 1000:.1f}ms Overhead\n")
+
+        print(f"{'Concurrency':>11} | {'Client':<10} | {'p50':>8} | {'p99':>8} | {'CPU/Call':>8} | "
+              f"{'Verbindungen':>12}")
+        for concurrency in args.concurrency:
+            for name, model in (("pooled", pooled), ("no-pool", fresh)):
+                await run_scenario(model, concurrency, concurrency)  # Warm-up
+                connections.value = 0
+                cpu_start = time.process_time()
+                latencies = await run_scenario(model, concurrency, args.calls)
+                cpu_per_call = (time.process_time() - cpu_start) / args.calls
+                print(f"{concurrency:>11} | {name:<10} | {percentile(latencies, 50) * 1000:6.1f}ms | "
+                      f"{percentile(latencies, 99) * 1000:6.1f}ms | {cpu_per_call * 1000:6.2f}ms | "
+                      f"{connections.value:>12}")
+
+        process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--calls", type=int, default=200, help="Calls pro Messung")
+    parser.add_argument("--latency", type=float, default=0.5, help="Server-Latenz in Sekunden")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Import-Time Budget: Cold Start der App und des Graphs mit -X importtime.
+
+Importiert jedes Ziel-Modul mehrfach in einem frischen Interpreter, parst die
+importtime-Ausgabe (kumulativ pro Modul) und prüft zwei Dinge:
+
+- Verbotene Module: schwere Pakete, die beim Import noch nicht geladen sein
+  dürfen (z.B. langgraph/openai beim App-Start) - maschinenunabhängig, das
+  eigentliche Gate
+- Budget: eigene Import-Zeit in ms (Median der Läufe, kumulativ minus
+  ausgenommene Pakete wie chainlit, deren Import-Zeit wir nicht beeinflussen).
+  Die Budgets lassen bewusst ~50% Luft über dem gemessenen Wert, damit
+  Schwankungen der Maschine nicht zu Fehlalarmen führen; sie fangen nur
+  grobe Rückschritte (z.B. wieder eager geladene Agents).
+
+Ausführen:
+    python -m benchmarks.import_time                       # Exit 1 bei Verstoß
+    python -m benchmarks.import_time --budget app=800 --repeat 5
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Ziel-Modul → (Budget in ms ohne ausgenommene Pakete, ausgenommene Pakete, verbotene Module)
+# Gemessen (Median): app ~12ms, agents.graph ~1050ms (vor dem Lazy Import ~2000ms)
+CHECKS = {
+    "app": (150, ("chainlit",), ("langgraph", "langchain_openai", "openai", "matplotlib", "reportlab")),
+    "agents.graph": (1600, (), ("langchain_openai", "openai", "matplotlib", "reportlab"))
+}
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, float, float]]:
+    """Zeilen der -X importtime Ausgabe → [(Modul, Tiefe, self ms, kumulativ ms)]."""
+    rows = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, len(indent) // 2, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def measure(module: str, app_root: str) -> list[tuple[str, int, float, float]]:
+    # Chainlit legt seine Config im App Root an - nicht im Repo
+    env = {**os.environ, "CHAINLIT_APP_ROOT": app_root}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import von {module} fehlgeschlagen:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def cumulative(rows, module: str) -> float:
+    return next((total for name, _, _, total in rows if name == module), 0.0)
+
+
+def heaviest_children(rows, module: str, limit: int) -> list[tuple[str, float]]:
+    """Direkte Imports des Moduls nach kumulativer Zeit (die Ausgabe listet Kinder vor dem Eltern-Modul)."""
+    index = next(i for i, row in enumerate(rows) if row[0] == module)
+    depth = rows[index][1]
+    children = []
+    for name, row_depth, _, total in reversed(rows[:index]):
+        if row_depth <= depth:
+            break
+        if row_depth == depth + 1:
+            children.append((name, total))
+    return sorted(children, key=lambda child: -child[1])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODUL=MS",
+                        help="Budget überschreiben, z.B. app=800 (mehrfach möglich)")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports pro Modul (Median zählt)")
+    parser.add_argument("--top", type=int, default=8, help="schwerste direkte Imports anzeigen")
+    args = parser.parse_args()
+
+    budgets = {module: check[0] for module, check in CHECKS.items()}
+    for override in args.budget:
+        module, _, value = override.partition("=")
+        budgets[module] = float(value)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as app_root:
+        for module, (_, excluded, forbidden) in CHECKS.items():
+            runs = [measure(module, app_root) for _ in range(args.repeat)]
+            own_ms = [cumulative(run, module) - sum(cumulative(run, p) for p in excluded) for run in runs]
+            own = statistics.median(own_ms)
+            # Für die Detailausgabe den Lauf, der dem Median am nächsten liegt
+            rows = runs[min(range(len(runs)), key=lambda i: abs(own_ms[i] - own))]
+            excluded_ms = statistics.median(
+                sum(cumulative(run, package) for package in excluded) for run in runs
+            )
+            loaded = sorted({name for run in runs for name, *_ in run} & set(forbidden))
+
+            status = "✅" if own <= budgets[module] and not loaded else "❌"
+            excluded_note = f" (+{excluded_ms:.0f}ms {', '.join(excluded)})" if excluded else ""
+            print(f"{status} import {module}: {own:.0f}ms / Budget {budgets[module]:.0f}ms{excluded_note}")
+            for child, child_ms in heaviest_children(rows, module, args.top):
+                print(f"     {child_ms:8.1f}ms  {child}")
+
+            if own > budgets[module]:
+                failures.append(f"{module} {own:.0f}ms > {budgets[module]:.0f}ms")
+            if loaded:
+                failures.append(f"{module} lädt {', '.join(loaded)}")
+            print()
+
+    if failures:
+        print(f"❌ Import-Budget verletzt: {'; '.join(failures)}")
+        sys.exit(1)
+    print("✅ Alle Import-Budgets eingehalten")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Load Test: N gleichzeitige Chainlit-Sessions gegen das Fake-LLM (LLM_PROVIDER=fake).
+
+Jede simulierte Session durchläuft dieselbe Abfolge wie app.py - ohne UI:
+Onboarding (Progress laden) → pro Skill Self-Report + 3 Interview-Antworten
+(mit Denkpause, Reflection startet im Hintergrund) → Graph via astream_events
+→ Assessment speichern → PDF-Report nach dem letzten Skill.
+
+Gemessen werden p50/p95/p99 der Analyse-Latenz (letzte Antwort → Ergebnis),
+der PDF-Generierung und der ganzen Session sowie der Event-Loop Lag
+(Verspätung eines 10ms Timers), der zeigt, wie stark blockierender Code
+alle anderen Sessions ausbremst.
+
+Ausführen:
+    python -m benchmarks.load_test --sessions 10 50 --latency lognormal:0.8,0.4
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+METRICS = ["analysis", "pdf", "session"]
+
+ANSWER = (
+    "Letzte Woche war mein Teamkollege frustriert, weil sein Feature nicht fertig wurde. "
+    "Ich habe gemerkt, dass er gestresst wirkte, und ihn gefragt, wie es ihm geht. "
+    "Dann habe ich zugehört und gemeinsam mit ihm Prioritäten gesetzt."
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-Rank Perzentil (0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+async def monitor_loop_lag(samples: list[float], interval: float = 0.01) -> None:
+    """Misst, wie viel später als geplant ein Timer im Event Loop feuert."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def simulate_session(index: int, args, manager, pdf_service, timings: dict) -> None:
+    """Eine Session wie in app.py: Onboarding → Skills → Graph → PDF."""
+    from agents.graph import app as agent_graph, schedule_reflection
+    from agents.state import AgentState
+    from utils.framework import get_framework
+    from utils.pdf_service import PDFServiceBusy
+    from utils.scoring import calculate_indicator_coverage
+
+    framework = get_framework()
+    session_id = f"load{index:05d}"
+    skill_ids = framework.skill_ids
+    session_start = time.perf_counter()
+
+    # Onboarding: Welcome + Dimensionen mit Progress
+    await asyncio.sleep(args.think_time)
+    await manager.get_progress(session_id)
+
+    for offset in range(args.skills):
+        skill_id = skill_ids[(index + offset) % len(skill_ids)]
+        skill_data = framework.skill(skill_id)
+        state = AgentState(
+            messages=[],
+            session_id=session_id,
+            selected_skill=skill_id,
+            self_report_score=None,
+            skill_definition=skill_data["definition"],
+            behavioral_indicators=skill_data["behavioral_indicators"],
+            star_questions=skill_data["star_questions"],
+            current_question_index=0,
+            user_responses=[],
+            response_analyses=[],
+            agent_score=None,
+            dunning_kruger_gap=None,
+            classification=None,
+            agent_decisions=[],
+            next_step="self_report"
+        )
+
+        await asyncio.sleep(args.think_time)
+        state["self_report_score"] = float(1 + (index + offset) % 5)
+
+        # Interview: Reflection jeder Antwort startet sofort im Hintergrund
+        for question_idx in range(len(state["star_questions"])):
+            await asyncio.sleep(args.think_time)
+            state["user_responses"].append(f"{ANSWER} (Session {index}, Frage {question_idx + 1})")
+            schedule_reflection(state, question_idx)
+            state["current_question_index"] = question_idx
+
+        start = time.perf_counter()
+        result = None
+        async for event in agent_graph.astream_events(state, version="v2"):
+            if event["event"] == "on_chain_end" and not event.get("parent_ids"):
+                result = event["data"]["output"]
+        timings["analysis"].append(time.perf_counter() - start)
+
+        await manager.add_assessment(session_id, {
+            "skill_id": skill_id,
+            "skill_name": skill_data["name"],
+            "self_report": result.get("self_report_score"),
+            "agent_score": result.get("agent_score"),
+            "gap": result.get("dunning_kruger_gap"),
+            "classification": result.get("classification"),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "indicators_coverage": calculate_indicator_coverage(
+                result.get("response_analyses", [])
+            )["coverage_percentage"]
+        })
+        await manager.get_progress(session_id)
+
+    if args.pdf and (await manager.get_progress(session_id))["can_download_pdf"]:
+        start = time.perf_counter()
+        session_data = await manager.get_session(session_id)
+        # Wie app.py: Rendering im Worker-Prozess des PDF-Service
+        try:
+            await pdf_service.render(session_data, f"Load{index}")
+        except PDFServiceBusy:
+            timings["pdf_rejected"].append(time.perf_counter() - start)
+            return
+        timings["pdf"].append(time.perf_counter() - start)
+
+    timings["session"].append(time.perf_counter() - session_start)
+
+
+async def run(sessions: int, args) -> tuple[dict, list[float]]:
+    from utils.pdf_service import PDFRenderService
+    from utils.session_manager import AsyncSessionManager
+    from utils.session_store import JsonFileBackend
+
+    timings = {metric: [] for metric in METRICS + ["pdf_rejected"]}
+    lag: list[float] = []
+
+    pdf_service = PDFRenderService()
+    # Worker wie beim App-Start vorab starten, ihr Start zählt nicht zur PDF-Latenz
+    await asyncio.get_running_loop().run_in_executor(None, pdf_service.warm_up)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = AsyncSessionManager(JsonFileBackend(str(Path(tmp) / "sessions")))
+        monitor = asyncio.create_task(monitor_loop_lag(lag))
+        try:
+            await asyncio.gather(*(
+                simulate_session(i, args, manager, pdf_service, timings)
+                for i in range(sessions)
+            ))
+        finally:
+            monitor.cancel()
+            await manager.close()
+            pdf_service.shutdown()
+
+    return timings, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--skills", type=int, default=3, help="Skills pro Session (ab 3 gibt es den PDF-Report)")
+    parser.add_argument("--think-time", type=float, default=0.2, help="Sekunden pro User-Eingabe")
+    parser.add_argument("--latency", default="lognormal:0.8,0.4", help="FAKE_LLM_LATENCY Verteilung")
+    parser.add_argument("--output-tokens", type=int, default=350)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-pdf", dest="pdf", action="store_false")
+    args = parser.parse_args()
+
+    # Vor dem Import der Agents setzen, die das Modell beim Import erstellen
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = args.latency
+    os.environ["FAKE_LLM_OUTPUT_TOKENS"] = str(args.output_tokens)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+
+    # Schwere Imports vor der Messung, sonst zählen sie als Loop Lag der ersten Session
+    import agents.graph  # noqa: F401
+
+    print(f"🔬 Load Test (Fake-LLM {args.latency}, {args.skills} Skills/Session, "
+          f"Denkpause {args.think_time}s)\n")
+    print(f"{'Sessions':>8} | {'Metrik':<9} | {'p50':>8} | {'p95':>8} | {'p99':>8}")
+
+    for sessions in args.sessions:
+        timings, lag = asyncio.run(run(sessions, args))
+        for metric in METRICS + ["loop_lag"]:
+            values = lag if metric == "loop_lag" else timings[metric]
+            if not values:
+                continue
+            print(f"{sessions:>8} | {metric:<9} | {percentile(values, 50):7.3f}s | "
+                  f"{percentile(values, 95):7.3f}s | {percentile(values, 99):7.3f}s")
+        print(f"{'':>8} | max loop lag {max(lag, default=0.0):.3f}s, "
+              f"PDF abgelehnt (Queue voll): {len(timings['pdf_rejected'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Micro-Benchmarks der CPU-seitigen Hot Paths (ohne LLM) mit Regression-Gate.
+
+Misst pro Session laufenden Code mit synthetischen ResponseAnalysis-Daten
+in mehreren Größen (n = Anzahl Analysen bzw. Indicators/Assessments):
+Scoring, Assessment Agent, Dunning-Kruger, JSON-Normalisierung der
+Reflection, SessionManager I/O (JSON/SQLite) und PDF-Report.
+
+Ausführen:
+    python -m benchmarks.micro --save-baseline     # Baseline auf dieser Maschine speichern
+    python -m benchmarks.micro                     # gegen Baseline prüfen (Exit 1 bei Regression)
+    python -m benchmarks.micro --filter scoring --threshold 0.2
+    python -m benchmarks.micro --filter pdf --save-baseline   # nur diese Einträge der Baseline ersetzen
+
+Baselines sind maschinenabhängig und werden deshalb nicht eingecheckt - vor dem
+Deploy immer auf derselben Maschine (bzw. demselben CI-Runner) speichern und
+vergleichen. Fehlt die Baseline oder ein Eintrag darin, schlägt der Check fehl
+(Exit 1), außer mit --allow-missing.
+
+CI: Baseline-Datei pro Runner-Typ als Cache/Artefakt ablegen (Key z.B. Runner-Image
++ Python-Version). Einmalig bzw. nach gewollten Änderungen auf dem Main-Branch
+mit --save-baseline erzeugen, in PRs ohne --allow-missing prüfen.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+from agents.assessment_agent import AssessmentAgent  # noqa: E402
+from agents.dunning_kruger import DunningKrugerAnalyzer  # noqa: E402
+from agents.reflection_agent import ReflectionAgent  # noqa: E402
+from agents.state import ResponseAnalysis, STARAnalysis, IndicatorScore  # noqa: E402
+from utils.framework import get_framework  # noqa: E402
+from utils.pdf_generator import generate_pdf_report  # noqa: E402
+from utils.scoring import calculate_indicator_coverage, get_strength_and_weaknesses  # noqa: E402
+from utils.session_manager import SessionManager  # noqa: E402
+from utils.session_store import JsonFileBackend, SQLiteBackend, new_session  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "micro.json"
+
+FRAMEWORK = get_framework()
+
+SKILL_ID = "empathy"
+INDICATORS = FRAMEWORK.skill(SKILL_ID)["behavioral_indicators"]
+
+
+def make_analysis(rng: random.Random, question_id: int, indicators: list[str]) -> ResponseAnalysis:
+    """Realistische Analyse: ~60% Indicators gefunden, 1-2 Evidence-Zitate."""
+    scores = [
+        IndicatorScore(
+            indicator=ind,
+            found=rng.random() < 0.6,
+            evidence=[f"Zitat {i} zu {ind}" for i in range(rng.randint(1, 2))],
+            confidence=round(rng.uniform(0.5, 0.95), 2)
+        )
+        for ind in indicators
+    ]
+    return ResponseAnalysis(
+        question_id=question_id,
+        star_analysis=STARAnalysis(
+            situation="Teamkollege war frustriert",
+            task="Unterstützen ohne zu bevormunden",
+            action="Zugehört und nachgefragt",
+            result="Gemeinsam Prioritäten gesetzt"
+        ),
+        indicators_found=scores,
+        indicators_missing=[s.indicator for s in scores if not s.found],
+        score=round(rng.uniform(1.0, 5.0) * 2) / 2,
+        reasoning="Synthetische Analyse für Micro-Benchmarks",
+        confidence=round(rng.uniform(0.5, 0.95), 2)
+    )
+
+
+def make_analyses(n: int, indicators: list[str] = INDICATORS, seed: int = 42) -> list[ResponseAnalysis]:
+    rng = random.Random(seed)
+    return [make_analysis(rng, i % 3, indicators) for i in range(n)]
+
+
+def make_state(analyses: list[ResponseAnalysis]) -> dict:
+    return {
+        "selected_skill": SKILL_ID,
+        "self_report_score": 4.0,
+        "agent_score": 3.2,
+        "response_analyses": analyses,
+        "behavioral_indicators": INDICATORS
+    }
+
+
+def make_session(assessments: int) -> dict:
+    skills = list(FRAMEWORK.skill_ids)
+    session = new_session("micro")
+    session["assessments"] = [
+        {
+            "skill_id": skill_id,
+            "skill_name": FRAMEWORK.name(skill_id),
+            "self_report": 4.0,
+            "agent_score": 3.0 + 0.3 * i,
+            "gap": 1.0 - 0.3 * i,
+            "classification": "calibrated",
+            "timestamp": "2025-01-01T12:00:00",
+            "indicators_coverage": 60.0
+        }
+        for i, skill_id in enumerate(skills[:assessments])
+    ]
+    return session
+
+
+def legacy_reflection_json(indicators: list[str]) -> str:
+    """Output im alten Format (Großbuchstaben-Keys, Evidence als String) → Normalisierungspfad."""
+    return json.dumps({
+        "star_analysis": {"Situation": "s", "Task": "t", "Action": "a", "Result": "r"},
+        "indicators_found": [
+            {"indicator": ind, "found": True, "evidence": "Zitat", "confidence": 0.8}
+            for ind in indicators
+        ],
+        "indicators_missing": [],
+        "score": 3.5,
+        "reasoning": "ok",
+        "confidence": 0.8
+    })
+
+
+def build_benchmarks(tmp: Path) -> dict:
+    """Name → Callable ohne Argumente. Setup passiert hier, nicht in der Messung."""
+    assessment_agent = AssessmentAgent()
+    dk_analyzer = DunningKrugerAnalyzer(goleman_framework=FRAMEWORK.data)
+    reflection_agent = ReflectionAgent()
+    benchmarks = {}
+
+    # n = Anzahl Analysen: 1 Skill, volle Session (5 Skills), Batch-Auswertung
+    for n in (3, 15, 150):
+        analyses = make_analyses(n)
+        state = make_state(analyses)
+        benchmarks[f"scoring.indicator_coverage[n={n}]"] = lambda a=analyses: calculate_indicator_coverage(a)
+        benchmarks[f"scoring.strengths_weaknesses[n={n}]"] = (
+            lambda a=analyses: get_strength_and_weaknesses(a, INDICATORS)
+        )
+        benchmarks[f"assessment.final_score[n={n}]"] = lambda s=state: assessment_agent.calculate_final_score(s)
+        benchmarks[f"assessment.validate[n={n}]"] = (
+            lambda a=analyses: assessment_agent.validate_with_reflection(3.2, a)
+        )
+        benchmarks[f"dunning_kruger.analyze[n={n}]"] = lambda s=state: dk_analyzer.analyze(s)
+
+    # n = Anzahl Indicators im LLM-Output
+    for n in (5, 20):
+        indicators = [f"Indicator {i}" for i in range(n)]
+        canonical = json.dumps(
+            make_analyses(1, indicators)[0].model_dump(exclude={"question_id"}), ensure_ascii=False
+        )
+        legacy = legacy_reflection_json(indicators)
+        benchmarks[f"reflection.validate_json[n={n}]"] = lambda c=canonical: reflection_agent._validate(c, 0)
+        benchmarks[f"reflection.normalize_legacy_json[n={n}]"] = lambda c=legacy: reflection_agent._validate(c, 0)
+
+    # Ein Skill-Abschluss: Assessment speichern + Progress (+ Session für den Report)
+    backends = {
+        "json": JsonFileBackend(str(tmp / "sessions")),
+        "sqlite": SQLiteBackend(str(tmp / "sessions.sqlite"))
+    }
+    assessment = make_session(1)["assessments"][0]
+    for name, backend in backends.items():
+        manager = SessionManager(backend)
+        ids = itertools.count()
+
+        def session_cycle(manager=manager, ids=ids):
+            session_id = f"micro{next(ids):08d}"
+            manager.add_assessment(session_id, assessment)
+            manager.get_progress(session_id)
+            manager.get_session(session_id)
+
+        benchmarks[f"session_manager.{name}.assessment_cycle"] = session_cycle
+
+    # n = Anzahl Assessments im Report
+    for n in (3, 5):
+        session = make_session(n)
+        benchmarks[f"pdf.generate_report[n={n}]"] = (
+            lambda s=session: generate_pdf_report(s, "Micro Benchmark", tmp / "reports")
+        )
+
+    return benchmarks
+
+
+def measure(fn, repeat: int) -> float:
+    """Beste Zeit pro Aufruf (Sekunden); Anzahl Loops automatisch auf ≥0.2s pro Messung."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def format_time(seconds: float) -> str:
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.2f} µs"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--threshold", type=float, default=0.25, help="erlaubte Verlangsamung (0.25 = +25%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen pro Benchmark (Minimum zählt)")
+    parser.add_argument("--filter", default="", help="nur Benchmarks, deren Name das enthält")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="fehlende Baseline bzw. Einträge nur melden statt fehlschlagen")
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    elif not args.save_baseline and not args.allow_missing:
+        print(f"❌ Keine Baseline unter {baseline_path} - erst mit --save-baseline speichern "
+              f"(oder --allow-missing).")
+        sys.exit(1)
+
+    print(f"🔬 Micro-Benchmarks (Minimum aus {args.repeat} Messungen, Threshold +{args.threshold:.0%})\n")
+    print(f"{'Benchmark':<46} | {'Zeit/Op':>11} | {'Baseline':>11} | {'Delta':>7}")
+
+    results = {}
+    regressions = []
+    missing = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in build_benchmarks(Path(tmp)).items():
+            if args.filter not in name:
+                continue
+            results[name] = seconds = measure(fn, args.repeat)
+
+            if name in baseline:
+                delta = seconds / baseline[name] - 1
+                status = "❌" if delta > args.threshold else ("🚀" if delta < -args.threshold else "  ")
+                if delta > args.threshold:
+                    regressions.append(name)
+                print(f"{name:<46} | {format_time(seconds)} | {format_time(baseline[name])} | "
+                      f"{delta:+6.0%} {status}")
+            else:
+                missing.append(name)
+                print(f"{name:<46} | {format_time(seconds)} | {'-':>11} | {'-':>7}")
+
+    if args.save_baseline:
+        if args.filter:
+            # Teilmessung: nur die gemessenen Benchmarks in der bestehenden Baseline ersetzen
+            results = {**baseline, **results}
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.now().isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "node": platform.node()
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\n💾 Baseline gespeichert: {baseline_path}")
+        return
+
+    failed = False
+    if missing:
+        icon = "⚠️" if args.allow_missing else "❌"
+        print(f"\n{icon} {len(missing)} Benchmark(s) ohne Baseline: {', '.join(missing)}")
+        failed = not args.allow_missing
+    if regressions:
+        print(f"\n❌ {len(regressions)} Regression(en) über +{args.threshold:.0%}: {', '.join(regressions)}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\n✅ Keine Regressionen")
+
+
+if __name__ == "__main__":
+    main()
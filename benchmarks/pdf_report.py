@@ -0,0 +1,162 @@
+"""
+PDF Report Benchmark: vorgerendertes Template vs. alles zeichnen vs. früherer
+matplotlib-PNG-Pfad.
+
+Jede Variante läuft in einem eigenen Interpreter (Peak RSS inkl. Imports ist
+sonst nicht vergleichbar) und erzeugt N Reports mit 5 Dimensionen:
+
+- template:   aktueller render_pdf_report (statische Seiten als Form XObject,
+              nur die Felder werden gezeichnet; braucht pdfrw)
+- vector:     derselbe Report, alles pro Report gezeichnet
+              (PDF_PRERENDER_TEMPLATE=false)
+- matplotlib: wie vector, Radar Chart aber wie früher als 8×8" Figure mit
+              150 dpi → PNG-Datei → drawImage → PNG löschen
+
+Gemessen werden der erste Report (inkl. Import von matplotlib/Fonts bzw.
+Template-Rendering), p50 und Mittelwert der folgenden Reports, CPU-Zeit pro
+Report, Peak RSS des Prozesses und PDF-Größe.
+
+Ausführen:
+    python -m benchmarks.pdf_report --reports 30
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.load_test import percentile
+
+VARIANTS = ("template", "vector", "matplotlib")
+
+
+def make_session() -> dict:
+    from utils.framework import get_framework
+
+    framework = get_framework()
+    return {
+        "assessments": [
+            {
+                "skill_id": skill_id,
+                "skill_name": framework.name(skill_id),
+                "self_report": 4.0,
+                "agent_score": 2.5 + 0.5 * i,
+                "gap": 1.5 - 0.5 * i,
+                "classification": "calibrated",
+                "timestamp": "2025-01-01T12:00:00",
+                "indicators_coverage": 60.0
+            }
+            for i, skill_id in enumerate(framework.skill_ids)
+        ]
+    }
+
+
+def matplotlib_radar_chart(c, session_data: dict, x: float, y: float, width: float, height: float) -> None:
+    """Der frühere Pfad: Polarplot mit matplotlib → PNG → drawImage → PNG löschen."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from utils.pdf_generator import radar_scores
+
+    dimensions = radar_scores(session_data)
+    angles = np.linspace(0, 2 * np.pi, len(dimensions), endpoint=False).tolist()
+    values = [score for _, score in dimensions]
+    angles += angles[:1]
+    values += values[:1]
+
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection="polar"))
+    ax.plot(angles, values, "o-", linewidth=2, color="#2E86AB", label="Agent-Score")
+    ax.fill(angles, values, alpha=0.25, color="#2E86AB")
+    ax.set_ylim(0, 5)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels([name for name, _ in dimensions], size=12)
+    ax.set_yticks([1, 2, 3, 4, 5])
+    ax.set_yticklabels(["1", "2", "3", "4", "5"])
+    ax.grid(True)
+
+    chart_path = Path(tempfile.gettempdir()) / f"radar_chart_{time.time_ns()}.png"
+    plt.tight_layout()
+    plt.savefig(chart_path, dpi=150, bbox_inches="tight")
+    plt.close()
+
+    c.drawImage(str(chart_path), x, y, width=width, height=height, preserveAspectRatio=True)
+    chart_path.unlink()
+
+
+def run_worker(variant: str, reports: int) -> dict:
+    """Läuft im Kind-Prozess: N Reports erzeugen, Kennzahlen als JSON zurückgeben."""
+    os.environ["PDF_PRERENDER_TEMPLATE"] = "true" if variant == "template" else "false"
+    import utils.pdf_generator as pdf_generator
+
+    if variant == "matplotlib":
+        # Ohne Template zeichnet _draw_results_static das Gitter über draw_radar_grid
+        pdf_generator.draw_radar_grid = lambda c, x, y, width, height: None
+        pdf_generator.draw_radar_scores = matplotlib_radar_chart
+
+    session = make_session()
+    timings = []
+    cpu_times = []
+    sizes = []
+    for i in range(reports):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        pdf_bytes = pdf_generator.render_pdf_report(session, f"Bench{i}")
+        cpu_times.append(time.process_time() - cpu_start)
+        timings.append(time.perf_counter() - start)
+        sizes.append(len(pdf_bytes))
+
+    # ru_maxrss: KiB unter Linux, Bytes unter macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    warm = timings[1:] or timings
+    warm_cpu = cpu_times[1:] or cpu_times
+    return {
+        "first": timings[0],
+        "p50": percentile(warm, 50),
+        "mean": sum(warm) / len(warm),
+        "cpu": sum(warm_cpu) / len(warm_cpu),
+        "rss_mb": peak_rss_mb,
+        "size_kb": sum(sizes) / len(sizes) / 1024
+    }
+
+
+def run_variant(variant: str, reports: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.pdf_report", "--worker", variant, "--reports", str(reports)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{variant} fehlgeschlagen:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=30, help="Reports pro Variante")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--worker", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.reports)))
+        return
+
+    print(f"🔬 PDF Report Benchmark ({args.reports} Reports pro Variante, 5 Dimensionen)\n")
+    print(f"{'Variante':<10} | {'erster':>9} | {'p50':>9} | {'mean':>9} | {'CPU':>9} | {'Peak RSS':>9} | {'PDF':>9}")
+    for variant in args.variants:
+        try:
+            stats = run_variant(variant, args.reports)
+        except RuntimeError as e:
+            print(f"{variant:<10} | ⚠️ {str(e).splitlines()[-1]}")
+            continue
+        print(f"{variant:<10} | {stats['first'] * 1000:7.1f}ms | {stats['p50'] * 1000:7.1f}ms | "
+              f"{stats['mean'] * 1000:7.1f}ms | {stats['cpu'] * 1000:7.1f}ms | {stats['rss_mb']:6.1f} MB | {stats['size_kb']:6.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
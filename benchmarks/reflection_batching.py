@@ -0,0 +1,147 @@
+"""
+Benchmark: Batched Reflection (1 Call pro Skill) vs. Per-Answer (1 Call pro Antwort).
+
+Ohne --live werden nur die Prompt-Tokens mit tiktoken gezählt (kein API Key nötig).
+Mit --live laufen beide Modi gegen das konfigurierte Modell und es werden
+Latenz sowie die tatsächlichen Tokens aus usage_metadata gemessen.
+
+Ausführen:
+    python -m benchmarks.reflection_batching
+    python -m benchmarks.reflection_batching --live --runs 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from agents.reflection_agent import ReflectionAgent  # noqa: E402
+from utils.framework import get_framework  # noqa: E402
+
+SAMPLE_RESPONSES = [
+    "Letzte Woche war mein Teamkollege frustriert, weil sein Feature nicht rechtzeitig fertig wurde. "
+    "Ich hab gemerkt, dass er gestresst wirkte und hab ihn gefragt, wie es ihm damit geht. "
+    "Ich hab erstmal nur zugehört und dann gemeinsam mit ihm die Aufgaben neu priorisiert. "
+    "Am Ende haben wir den Release zusammen geschafft.",
+    "Eine Kundin war im Call sehr aufgebracht, weil ihre Bestellung zum zweiten Mal falsch geliefert wurde. "
+    "Ich habe ihre Verärgerung gespiegelt und mich entschuldigt, bevor ich nach Lösungen gesucht habe. "
+    "Wir haben eine Expresslieferung organisiert und sie hat sich später für die Geduld bedankt.",
+    "In einem Workshop hat eine neue Kollegin kaum etwas gesagt. Ich habe in der Pause nachgefragt "
+    "und gemerkt, dass sie unsicher war. Danach habe ich sie gezielt nach ihrer Meinung gefragt "
+    "und ihre Idee wurde am Ende umgesetzt."
+]
+
+
+class UsageRecorder:
+    """Proxy um das LLM, der usage_metadata und Latenz jedes Calls aufzeichnet."""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = []
+
+    async def ainvoke(self, messages, **kwargs):
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, **kwargs)
+        usage = getattr(response, "usage_metadata", None) or {}
+        self.calls.append({
+            "latency": time.perf_counter() - start,
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0)
+        })
+        return response
+
+    def invoke(self, messages, **kwargs):
+        return self.llm.invoke(messages, **kwargs)
+
+
+def count_prompt_tokens(agent: ReflectionAgent, skill: dict) -> dict:
+    """
+    Zählt die Input-Tokens beider Modi offline mit tiktoken.
+    
+    Ist das Encoding nicht verfügbar (offline), wird mit ~4 Zeichen/Token geschätzt.
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(agent.llm.model_name)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        encode = encoding.encode
+    except Exception as e:
+        print(f"⚠️ tiktoken nicht verfügbar ({type(e).__name__}), schätze Tokens über Zeichen/4\n")
+        encode = lambda text: range(len(text) // 4)  # noqa: E731
+
+    def tokens(messages) -> int:
+        return sum(len(encode(m.content)) for m in messages)
+
+    per_answer = sum(
+        tokens(agent._build_messages(response, skill["star_questions"][idx], skill["behavioral_indicators"]))
+        for idx, response in enumerate(SAMPLE_RESPONSES)
+    )
+    batched = tokens(agent._build_batched_messages(
+        SAMPLE_RESPONSES, skill["star_questions"], skill["behavioral_indicators"]
+    ))
+    return {"per_answer": per_answer, "batched": batched}
+
+
+async def run_live(agent: ReflectionAgent, skill: dict, runs: int) -> dict:
+    """Misst Latenz und Tokens beider Modi gegen das echte Modell."""
+    recorder = UsageRecorder(agent.llm)
+    agent.llm = recorder
+    results = {}
+
+    for mode in ["per_answer", "batched"]:
+        latencies, input_tokens, output_tokens = [], [], []
+        for _ in range(runs):
+            recorder.calls.clear()
+            start = time.perf_counter()
+            if mode == "batched":
+                await agent.aanalyze_responses_batched(
+                    SAMPLE_RESPONSES, skill["star_questions"], skill["behavioral_indicators"]
+                )
+            else:
+                # Wie der Reflection Node: alle Antworten parallel
+                await asyncio.gather(*(
+                    agent.aanalyze_response(response, skill["star_questions"][idx], skill["behavioral_indicators"], idx)
+                    for idx, response in enumerate(SAMPLE_RESPONSES)
+                ))
+            latencies.append(time.perf_counter() - start)
+            input_tokens.append(sum(c["input_tokens"] for c in recorder.calls))
+            output_tokens.append(sum(c["output_tokens"] for c in recorder.calls))
+
+        results[mode] = {
+            "latency_s": round(statistics.median(latencies), 2),
+            "input_tokens": int(statistics.median(input_tokens)),
+            "output_tokens": int(statistics.median(output_tokens))
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skill", default="empathy")
+    parser.add_argument("--live", action="store_true", help="Gegen das konfigurierte Modell messen")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    skill = get_framework().skill(args.skill)
+
+    agent = ReflectionAgent()
+    prompt_tokens = count_prompt_tokens(agent, skill)
+    saved = 1 - prompt_tokens["batched"] / prompt_tokens["per_answer"]
+    print(f"🔬 Reflection Batching ({args.skill}, {len(SAMPLE_RESPONSES)} Antworten)\n")
+    print(f"Prompt-Tokens per_answer: {prompt_tokens['per_answer']}")
+    print(f"Prompt-Tokens batched:    {prompt_tokens['batched']}  ({saved:.0%} gespart)")
+
+    if args.live:
+        results = asyncio.run(run_live(agent, skill, args.runs))
+        print(f"\nLive ({agent.llm.llm.model_name}, Median über {args.runs} Runs):")
+        for mode, r in results.items():
+            print(f"{mode:<11} | {r['latency_s']:6.2f}s | in={r['input_tokens']:5d} | out={r['output_tokens']:5d}")
+        print(f"\nProvider Prompt Cache Hit-Rate: {agent.prompt_cache_hit_rate():.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: JSON-Datei Backend vs. SQLite Backend des SessionManagers.
+
+Simuliert typische Sessions (5 Assessments, Progress-Abfragen pro Nachricht,
+ein Consent-Update) in einem temporären Verzeichnis.
+
+Ausführen:
+    python -m benchmarks.session_store --sessions 500
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from utils.session_manager import SessionManager
+from utils.session_store import JsonFileBackend, SQLiteBackend
+
+SKILLS = ["self_awareness", "self_regulation", "motivation", "empathy", "social_skills"]
+
+
+def assessment(skill_id: str) -> dict:
+    return {
+        "skill_id": skill_id,
+        "skill_name": skill_id,
+        "self_report": 4.0,
+        "agent_score": 3.5,
+        "gap": 0.5,
+        "classification": "calibrated",
+        "timestamp": "2025-01-01T12:00:00",
+        "indicators_coverage": 60.0
+    }
+
+
+def run(manager: SessionManager, sessions: int, progress_reads: int) -> dict:
+    """Misst Writes (add_assessment), Reads (get_progress) und Consent-Updates in op/s."""
+    timings = {"add_assessment": 0.0, "get_progress": 0.0, "update_consent": 0.0}
+    counts = {key: 0 for key in timings}
+
+    for i in range(sessions):
+        session_id = f"bench{i:06d}"
+        for skill_id in SKILLS:
+            start = time.perf_counter()
+            manager.add_assessment(session_id, assessment(skill_id))
+            timings["add_assessment"] += time.perf_counter() - start
+            counts["add_assessment"] += 1
+
+            start = time.perf_counter()
+            for _ in range(progress_reads):
+                manager.get_progress(session_id)
+            timings["get_progress"] += time.perf_counter() - start
+            counts["get_progress"] += progress_reads
+
+        start = time.perf_counter()
+        manager.update_consent(session_id, True)
+        timings["update_consent"] += time.perf_counter() - start
+        counts["update_consent"] += 1
+
+    return {key: counts[key] / timings[key] for key in timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--progress-reads", type=int, default=3, help="get_progress Calls pro Nachricht")
+    args = parser.parse_args()
+
+    print(f"🔬 Session Store Benchmark ({args.sessions} Sessions x {len(SKILLS)} Assessments)\n")
+    print(f"{'Backend':<8} | {'add_assessment':>16} | {'get_progress':>14} | {'update_consent':>16}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "json": JsonFileBackend(str(Path(tmp) / "json")),
+            "sqlite": SQLiteBackend(str(Path(tmp) / "sessions.sqlite"))
+        }
+        for name, backend in backends.items():
+            ops = run(SessionManager(backend), args.sessions, args.progress_reads)
+            print(f"{name:<8} | {ops['add_assessment']:12.0f} op/s | {ops['get_progress']:10.0f} op/s | "
+                  f"{ops['update_consent']:12.0f} op/s")
+        backends["sqlite"].close()
+
+
+if __name__ == "__main__":
+    main()
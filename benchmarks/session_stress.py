@@ -0,0 +1,123 @@
+"""
+Stress-Test: viele Prozesse schreiben gleichzeitig in dieselbe Session-Datei.
+
+Prüft, dass mit Locking + atomaren Writes kein Assessment verloren geht und
+Leser nie eine halbe Datei sehen. Zum Vergleich läuft das alte, ungelockte
+Read-Modify-Write (in-place) mit - inklusive Durchsatz beider Varianten.
+
+Ausführen:
+    python -m benchmarks.session_stress --processes 8 --writes 50
+
+Exit Code 1, wenn das gelockte Backend Assessments verliert oder Leser kaputte Dateien sehen.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import sys
+import tempfile
+import time
+
+from utils.session_store import JsonFileBackend
+
+SESSION_ID = "stress"
+
+
+class LegacyJsonFileBackend(JsonFileBackend):
+    """Altes Verhalten: kein Lock, Datei wird in-place überschrieben."""
+
+    def _locked(self, session_id: str):
+        return contextlib.nullcontext()
+
+    def _write(self, session_id: str, session: dict) -> None:
+        with open(self._path(session_id), 'w', encoding='utf-8') as f:
+            json.dump(session, f, indent=2, ensure_ascii=False)
+
+
+BACKENDS = {"legacy": LegacyJsonFileBackend, "locked": JsonFileBackend}
+
+
+def writer(backend_name: str, directory: str, worker_id: int, writes: int, errors) -> None:
+    backend = BACKENDS[backend_name](directory)
+    for i in range(writes):
+        try:
+            backend.append_assessment(SESSION_ID, {"skill_id": f"worker{worker_id}", "n": i})
+        except Exception:
+            # Alte Variante: halbe Datei gelesen → JSONDecodeError
+            with errors.get_lock():
+                errors.value += 1
+
+
+def reader(backend_name: str, directory: str, stop, torn_reads) -> None:
+    backend = BACKENDS[backend_name](directory)
+    while not stop.is_set():
+        try:
+            backend.load(SESSION_ID)
+        except json.JSONDecodeError:
+            with torn_reads.get_lock():
+                torn_reads.value += 1
+
+
+def run(backend_name: str, processes: int, writes: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        errors = multiprocessing.Value("i", 0)
+        torn_reads = multiprocessing.Value("i", 0)
+        stop = multiprocessing.Event()
+
+        read_proc = multiprocessing.Process(target=reader, args=(backend_name, directory, stop, torn_reads))
+        read_proc.start()
+
+        start = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=writer, args=(backend_name, directory, worker_id, writes, errors))
+            for worker_id in range(processes)
+        ]
+        for proc in workers:
+            proc.start()
+        for proc in workers:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        read_proc.join()
+
+        try:
+            stored = len(BACKENDS[backend_name](directory).load(SESSION_ID)["assessments"])
+        except Exception:
+            stored = 0
+
+    expected = processes * writes
+    return {
+        "expected": expected,
+        "stored": stored,
+        "lost": expected - stored,
+        "write_errors": errors.value,
+        "torn_reads": torn_reads.value,
+        "writes_per_s": expected / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50, help="Assessments pro Prozess")
+    args = parser.parse_args()
+
+    print(f"🔬 Session Stress-Test ({args.processes} Prozesse x {args.writes} Writes, 1 Session)\n")
+    results = {}
+    for name in BACKENDS:
+        r = results[name] = run(name, args.processes, args.writes)
+        print(f"{name:<7} | gespeichert {r['stored']:5d}/{r['expected']} | verloren {r['lost']:5d} | "
+              f"Write-Fehler {r['write_errors']:4d} | halbe Reads {r['torn_reads']:4d} | "
+              f"{r['writes_per_s']:8.0f} writes/s")
+
+    locked = results["locked"]
+    ok = locked["lost"] == 0 and locked["write_errors"] == 0 and locked["torn_reads"] == 0
+    print(f"\nDurchsatz-Kosten Locking + fsync: "
+          f"{1 - locked['writes_per_s'] / results['legacy']['writes_per_s']:.0%}")
+    print("✅ Kein Assessment verloren" if ok else "❌ Assessments verloren oder kaputte Reads!")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Reflection Prompts - einmal pro Skill vorkompiliert.
+
+Aufbau: [statische Instruktionen][Output Format][Skill-Indicators].
+Der statische Teil steht vorne und ist für alle Skills byte-identisch,
+damit Provider-seitiges Prompt Caching (Prefix-Match) greifen kann.
+"""
+from functools import lru_cache
+import json
+
+STATIC_INSTRUCTIONS = """Du bist ein Reflection Agent für EI-Assessment.
+
+Analysiere User-Antworten schrittweise mit Chain-of-Thought:
+
+WICHTIG - BEWERTUNGSPRINZIPIEN:
+- Sei wohlwollend: Wenn ein Indicator auch nur ansatzweise erkennbar ist → found=true
+- Implizite Hinweise zählen: "hab das gelöst" → zeigt Problemlösungskompetenz
+- Kurze Antworten: Extrahiere das Maximum aus wenigen Worten
+- Benefit of the doubt: Im Zweifel für den User
+- Fokus auf Stärken: Suche aktiv nach positiven Signalen
+
+SCHRITT 1: STAR Extraction
+- Situation: Was war der Kontext?
+- Task: Welche Herausforderung?
+- Action: Was hat User gemacht?
+- Result: Was war das Ergebnis?
+
+SCHRITT 2: EI Indicator Mapping
+Prüfe jeden der Behavioral Indicators, die am Ende unter BEHAVIORAL INDICATORS aufgelistet sind.
+
+Für jeden Indicator:
+- Gefunden? (true/false)
+- Evidence: Konkrete Zitate aus der Antwort (als Liste)
+- Confidence: 0.0-1.0
+
+SCHRITT 3: Scoring (1-5 Skala)
+- 5 = Alle 5 Indicators demonstriert (auch implizit)
+- 4 = 4 Indicators ODER 3 sehr stark
+- 3 = 3 Indicators klar vorhanden
+- 2 = 1-2 Indicators
+- 1 = Keine klaren Indicators
+
+SCHRITT 4: Reasoning
+Erkläre deine Bewertung evidence-based, fokussiere auf Stärken.
+
+"""
+
+ANALYSIS_FIELDS_FORMAT = """  "star_analysis": {
+    "situation": "...",
+    "task": "...",
+    "action": "...",
+    "result": "..."
+  },
+  "indicators_found": [
+    {
+      "indicator": "Indicator Name",
+      "found": true,
+      "evidence": ["Zitat 1", "Zitat 2"],
+      "confidence": 0.85
+    }
+  ],
+  "indicators_missing": ["Indicator Name 1", "Indicator Name 2"],
+  "score": 3.5,
+  "reasoning": "Detaillierte Begründung...",
+  "confidence": 0.80"""
+
+SINGLE_OUTPUT_FORMAT = f"""OUTPUT FORMAT (nur JSON, keine Markdown, lowercase keys):
+{{
+{ANALYSIS_FIELDS_FORMAT}
+}}
+"""
+
+BATCHED_OUTPUT_FORMAT = f"""OUTPUT FORMAT (nur JSON, keine Markdown, lowercase keys):
+Ein Objekt pro Antwort, in der Reihenfolge der question_id.
+{{
+  "analyses": [
+    {{
+      "question_id": 0,
+{ANALYSIS_FIELDS_FORMAT}
+    }}
+  ]
+}}
+"""
+
+
+@lru_cache(maxsize=64)
+def compile_system_prompt(behavioral_indicators: tuple[str, ...], batched: bool = False) -> str:
+    """
+    Baut den System-Prompt für eine Indicator-Liste (gecached, also nur einmal pro Skill).
+    
+    Args:
+        behavioral_indicators: Indicators des Skills (Tuple, damit hashbar)
+        batched: Output Format für alle Antworten in einem Call
+    """
+    output_format = BATCHED_OUTPUT_FORMAT if batched else SINGLE_OUTPUT_FORMAT
+    return f"""{STATIC_INSTRUCTIONS}{output_format}
+BEHAVIORAL INDICATORS:
+{json.dumps(list(behavioral_indicators), indent=2, ensure_ascii=False)}
+"""
+
+
+def precompile_reflection_prompts(framework: dict) -> int:
+    """
+    Kompiliert beim Start alle System-Prompts des Frameworks vor.
+    
+    Returns:
+        Anzahl der kompilierten Prompts
+    """
+    count = 0
+    for skill in framework.get("skills", {}).values():
+        indicators = tuple(skill["behavioral_indicators"])
+        for batched in (False, True):
+            compile_system_prompt(indicators, batched)
+            count += 1
+    return count
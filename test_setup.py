@@ -35,6 +35,15 @@ def test_setup():
     
     # 3. .env laden
     load_dotenv()
+    
+    # Offline-Modus: Fake-LLM statt OpenAI (Benchmarks, Load Tests)
+    if os.getenv("LLM_PROVIDER", "openai").lower() == "fake":
+        from agents.llm import create_chat_model
+        result = create_chat_model(temperature=0.0).invoke("Say 'Setup OK!'").content
+        print(f"✅ Fake LLM Test: {result}")
+        print("\n🎉 SETUP KOMPLETT! (LLM_PROVIDER=fake, keine API Calls)")
+        return True
+    
     api_key = os.getenv("OPENAI_API_KEY")
     
     if not api_key:
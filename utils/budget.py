@@ -0,0 +1,203 @@
+"""
+Token-Budgets pro Session und pro Tag.
+
+Jeder LLM-Call wird über die Metrics-Labels (session) der Session zugeordnet,
+im Speicher summiert und per Write-Behind im Session-Dokument bzw. der
+Tages-Summe des Backends persistiert. Die Tages-Summe wird regelmäßig neu
+aus dem Backend gelesen, damit mehrere Worker sich ein Budget teilen.
+Ist ein Budget erreicht, nutzt die
+Reflection ein günstigeres Modell (BUDGET_ACTION=downgrade) oder neue
+Assessments werden freundlich abgelehnt.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+from utils.metrics import registry, add_usage_listener
+from utils.session_store import empty_usage, add_to_usage
+
+BUDGET_OK = "ok"
+BUDGET_DOWNGRADE = "downgrade"
+BUDGET_EXCEEDED = "exceeded"
+
+BUDGET_ACTIONS = registry.counter(
+    "ei_budget_actions_total", "Budget-Eingriffe (downgrade, refuse)", ("action",)
+)
+
+
+def _today() -> str:
+    return date.today().isoformat()
+
+
+def _env_limit(name: str) -> Optional[float]:
+    """0 oder leer = kein Limit."""
+    value = float(os.getenv(name, "0") or 0)
+    return value if value > 0 else None
+
+
+class TokenBudget:
+    """
+    Verbrauchs-Accounting und Budget-Entscheidung pro Session und Tag.
+
+    Der Stand wird beim ersten Zugriff aus dem SessionManager geladen
+    (überlebt also Neustarts) und danach im Speicher mitgezählt. Im Speicher
+    bleiben nur die zuletzt aktiven Sessions (LRU) und der heutige Tag; die
+    Tages-Summe wird spätestens nach daily_refresh_seconds neu gelesen.
+    """
+    
+    def __init__(
+        self,
+        session_manager,
+        session_tokens: Optional[float] = None,
+        session_cost_usd: Optional[float] = None,
+        daily_tokens: Optional[float] = None,
+        daily_cost_usd: Optional[float] = None,
+        action: Optional[str] = None,
+        downgrade_headroom: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+        daily_refresh_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            session_manager: AsyncSessionManager (Persistenz)
+            session_tokens / session_cost_usd: Limits pro Session (Default aus SESSION_*_BUDGET)
+            daily_tokens / daily_cost_usd: Limits pro Tag über alle Sessions (Default aus DAILY_*_BUDGET)
+            action: "downgrade" (günstigeres Modell, dann ablehnen) oder "refuse" (sofort ablehnen)
+            downgrade_headroom: Anteil über dem Budget, der noch mit dem günstigen Modell läuft
+            max_sessions: Sessions im Speicher, älteste werden verdrängt (Default aus BUDGET_MAX_SESSIONS)
+            daily_refresh_seconds: Max. Alter der Tages-Summe (Default aus BUDGET_DAILY_REFRESH_SECONDS)
+        """
+        self.session_manager = session_manager
+        self.session_tokens = session_tokens or _env_limit("SESSION_TOKEN_BUDGET")
+        self.session_cost_usd = session_cost_usd or _env_limit("SESSION_COST_BUDGET_USD")
+        self.daily_tokens = daily_tokens or _env_limit("DAILY_TOKEN_BUDGET")
+        self.daily_cost_usd = daily_cost_usd or _env_limit("DAILY_COST_BUDGET_USD")
+        self.action = action or os.getenv("BUDGET_ACTION", "downgrade")
+        self.downgrade_headroom = (
+            downgrade_headroom if downgrade_headroom is not None
+            else float(os.getenv("BUDGET_DOWNGRADE_HEADROOM", "0.5"))
+        )
+        self.max_sessions = max_sessions or int(os.getenv("BUDGET_MAX_SESSIONS", "10000"))
+        self.daily_refresh_seconds = (
+            daily_refresh_seconds if daily_refresh_seconds is not None
+            else float(os.getenv("BUDGET_DAILY_REFRESH_SECONDS", "10"))
+        )
+        
+        self._sessions: OrderedDict[str, dict] = OrderedDict()
+        self._daily_day: Optional[str] = None
+        self._daily = empty_usage()
+        self._daily_loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._persisting: set[asyncio.Task] = set()
+        
+        add_usage_listener(self._on_usage)
+        registry.add_collector(self._collect)
+    
+    async def _ensure_loaded(self, session_id: str) -> None:
+        """
+        Lädt den gespeicherten Verbrauch der Session (einmalig bzw. nach Verdrängung)
+        und die Tages-Summe aller Worker (wenn älter als daily_refresh_seconds).
+        """
+        self._loop = asyncio.get_running_loop()
+        
+        with self._lock:
+            loaded = session_id in self._sessions
+            if loaded:
+                self._sessions.move_to_end(session_id)
+        
+        if not loaded:
+            stored = (await self.session_manager.get_session(session_id)).get("usage") or {}
+            usage = empty_usage()
+            add_to_usage(usage, stored.get("tokens", 0), stored.get("cost_usd", 0.0), stored.get("llm_calls", 0))
+            with self._lock:
+                self._sessions.setdefault(session_id, usage)
+                self._sessions.move_to_end(session_id)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+        
+        day = _today()
+        if day != self._daily_day or time.monotonic() - self._daily_loaded_at >= self.daily_refresh_seconds:
+            # Enthält die Calls aller Worker; eigene, noch nicht geflushte Calls rechnet der SessionManager hinzu
+            usage = await self.session_manager.daily_usage(day)
+            with self._lock:
+                self._daily_day, self._daily, self._daily_loaded_at = day, usage, time.monotonic()
+    
+    def _on_usage(self, labels: dict, tokens: int, cost_usd: float) -> None:
+        """Usage Listener: läuft pro LLM-Call (auch aus Worker-Threads)."""
+        session_id = labels.get("session")
+        if not session_id:
+            return
+        
+        day = _today()
+        with self._lock:
+            # Nicht geladene (oder verdrängte) Sessions liest _ensure_loaded später inkl. dieses Calls
+            if session_id in self._sessions:
+                add_to_usage(self._sessions[session_id], tokens, cost_usd, 1)
+            if day == self._daily_day:
+                add_to_usage(self._daily, tokens, cost_usd, 1)
+        
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._persist, session_id, day, tokens, cost_usd)
+    
+    def _persist(self, session_id: str, day: str, tokens: int, cost_usd: float) -> None:
+        task = asyncio.ensure_future(self.session_manager.add_usage(session_id, day, tokens, cost_usd))
+        self._persisting.add(task)
+        task.add_done_callback(self._persisting.discard)
+    
+    @staticmethod
+    def _ratio(usage: dict, token_limit: Optional[float], cost_limit: Optional[float]) -> float:
+        """Ausschöpfung des strengeren Limits (1.0 = Budget erreicht)."""
+        ratios = [0.0]
+        if token_limit:
+            ratios.append(usage["tokens"] / token_limit)
+        if cost_limit:
+            ratios.append(usage["cost_usd"] / cost_limit)
+        return max(ratios)
+    
+    async def status(self, session_id: str) -> str:
+        """
+        Budget-Entscheidung für den nächsten Reflection-Call.
+
+        Returns:
+            BUDGET_OK, BUDGET_DOWNGRADE (günstigeres Modell) oder BUDGET_EXCEEDED (ablehnen)
+        """
+        await self._ensure_loaded(session_id)
+        with self._lock:
+            ratio = max(
+                self._ratio(self._sessions[session_id], self.session_tokens, self.session_cost_usd),
+                self._ratio(self._daily, self.daily_tokens, self.daily_cost_usd)
+            )
+        
+        if ratio < 1.0:
+            return BUDGET_OK
+        if self.action == "downgrade" and ratio < 1.0 + self.downgrade_headroom:
+            return BUDGET_DOWNGRADE
+        return BUDGET_EXCEEDED
+    
+    def _collect(self) -> None:
+        """Collector: Verbrauch und Rest-Budget des Tages, Sessions über Budget."""
+        with self._lock:
+            daily = dict(self._daily) if self._daily_day == _today() else empty_usage()
+            over_budget = sum(
+                1 for usage in self._sessions.values()
+                if self._ratio(usage, self.session_tokens, self.session_cost_usd) >= 1.0
+            )
+        
+        used = registry.gauge("ei_budget_daily_used", "Verbrauch heute über alle Sessions", ("unit",))
+        used.set(daily["tokens"], unit="tokens")
+        used.set(daily["cost_usd"], unit="usd")
+        
+        remaining = registry.gauge("ei_budget_daily_remaining", "Rest-Budget heute (nur mit Limit)", ("unit",))
+        if self.daily_tokens:
+            remaining.set(max(self.daily_tokens - daily["tokens"], 0), unit="tokens")
+        if self.daily_cost_usd:
+            remaining.set(max(self.daily_cost_usd - daily["cost_usd"], 0), unit="usd")
+        
+        registry.gauge(
+            "ei_budget_sessions_over_limit", "Sessions, die ihr Session-Budget erreicht haben"
+        ).set(over_budget)
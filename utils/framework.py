@@ -0,0 +1,140 @@
+"""
+Goleman Framework - unveränderliche Registry mit vorberechneten Indizes,
+von App, Graph, PDF-Report und Tools gemeinsam genutzt.
+
+Ändert sich die JSON-Datei (mtime), baut get_framework() eine neue Registry
+und tauscht die Referenz atomar aus. Laufende Sessions sind nicht betroffen:
+ihr State hält Definition, Indicators und Fragen des gewählten Skills aus der
+Version beim Start, und eine Registry wird nach dem Bau nie mehr verändert.
+"""
+from types import MappingProxyType
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+import json
+import os
+import re
+import threading
+import time
+
+load_dotenv()
+
+FRAMEWORK_PATH = Path("data/frameworks/goleman_framework.json")
+
+# Sekunden zwischen zwei mtime-Prüfungen (0 = kein Hot Reload)
+RELOAD_INTERVAL = float(os.getenv("FRAMEWORK_RELOAD_INTERVAL", "5"))
+
+_WORD_SEPARATORS = re.compile(r"[\s_\-]+")
+
+
+def normalize_alias(text: str) -> str:
+    """'Self-Awareness', 'self_awareness ' → 'self awareness'."""
+    return _WORD_SEPARATORS.sub(" ", text.strip().lower()).strip()
+
+
+class FrameworkRegistry:
+    """
+    Eine Version des Frameworks mit Indizes (nach dem Bau nicht mehr verändert).
+
+    - skills: id → Skill-Dict (Reihenfolge wie in der JSON-Datei)
+    - aliases: normalisierter Alias (Nummer, id, deutscher/englischer Name) → id
+    - names: id → deutscher Anzeigename
+    """
+    
+    __slots__ = ("data", "version", "skill_ids", "skills", "aliases", "names")
+    
+    def __init__(self, data: dict, version: float = 0.0):
+        """
+        Args:
+            data: Geparste Framework-JSON (wird geteilt, nicht verändern)
+            version: mtime der Datei, aus der die Registry gebaut wurde
+        """
+        skills = data["skills"]
+        aliases = {}
+        for number, (skill_id, skill) in enumerate(skills.items(), start=1):
+            for alias in (str(number), skill_id, skill["name"], skill.get("name_en", "")):
+                if alias:
+                    aliases.setdefault(normalize_alias(alias), skill_id)
+        
+        self.data = data
+        self.version = version
+        self.skill_ids = tuple(skills)
+        self.skills = MappingProxyType(dict(skills))
+        self.aliases = MappingProxyType(aliases)
+        self.names = MappingProxyType({skill_id: skill["name"] for skill_id, skill in skills.items()})
+    
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f"FrameworkRegistry ist unveränderlich ({name})")
+        super().__setattr__(name, value)
+    
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self.skills
+    
+    def skill(self, skill_id: str) -> dict:
+        """Skill-Dict zur id (KeyError bei unbekannter id)."""
+        return self.skills[skill_id]
+    
+    def resolve(self, user_input: str) -> Optional[str]:
+        """Nutzereingabe ('1', 'Empathie', 'social skills', ...) → Skill-id oder None."""
+        return self.aliases.get(normalize_alias(user_input))
+    
+    def name(self, skill_id: str) -> str:
+        """Anzeigename; die id selbst, falls der Skill nach einem Reload fehlt."""
+        return self.names.get(skill_id, skill_id)
+
+
+_registry: Optional[FrameworkRegistry] = None
+_checked_at = 0.0
+_failed_version = None  # mtime einer fehlerhaften Datei (nur einmal warnen)
+_lock = threading.Lock()
+
+
+def _file_version(path: Path) -> float:
+    return path.stat().st_mtime
+
+
+def _build(path: Path) -> FrameworkRegistry:
+    version = _file_version(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return FrameworkRegistry(json.load(f), version)
+
+
+def get_framework() -> FrameworkRegistry:
+    """
+    Aktuelle Registry. Prüft höchstens alle RELOAD_INTERVAL Sekunden
+    die mtime der Datei und lädt bei Änderung neu.
+    Schlägt der Reload fehl (z.B. halb geschriebene Datei), bleibt die alte
+    Registry aktiv.
+    """
+    global _registry, _checked_at, _failed_version
+    registry = _registry
+    now = time.monotonic()
+    if registry is not None and (RELOAD_INTERVAL <= 0 or now - _checked_at < RELOAD_INTERVAL):
+        return registry
+    
+    with _lock:
+        if _registry is not None and now - _checked_at < RELOAD_INTERVAL:
+            return _registry
+        _checked_at = now
+        
+        if _registry is None:
+            _registry = _build(FRAMEWORK_PATH)
+            return _registry
+        
+        version = None
+        try:
+            version = _file_version(FRAMEWORK_PATH)
+            if version not in (_registry.version, _failed_version):
+                reloaded = _build(FRAMEWORK_PATH)
+                _registry = reloaded
+                print(f"🔄 Framework neu geladen ({len(reloaded.skill_ids)} Skills)")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            _failed_version = version
+            print(f"⚠️ Framework-Reload fehlgeschlagen, alte Version bleibt aktiv: {e}")
+        return _registry
+
+
+def load_goleman_framework() -> dict:
+    """Framework-Daten der aktuellen Registry (geteilt, nicht verändern)."""
+    return get_framework().data
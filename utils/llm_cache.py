@@ -0,0 +1,143 @@
+"""
+Persistenter Cache für Reflection-Ergebnisse (SQLite).
+Key = Hash aus (Modell, Temperature, System-Prompt, User-Prompt),
+Value = validierte ResponseAnalysis als JSON.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agents.state import ResponseAnalysis
+
+
+class ReflectionCache:
+    """
+    Content-addressed Cache mit LRU-Größenlimit und TTL.
+    
+    Thread-safe, damit auch der Thread-Pool im sync Reflection Node ihn nutzen kann.
+    """
+    
+    def __init__(
+        self,
+        path: str = "data/cache/reflection_cache.sqlite",
+        max_entries: int = 10000,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reflection_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reflection_cache_access ON reflection_cache(last_access)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, user_prompt: str) -> str:
+        """SHA-256 über alle Inputs, die das LLM-Ergebnis bestimmen."""
+        payload = json.dumps(
+            [model, temperature, system_prompt, user_prompt],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[ResponseAnalysis]:
+        """Lädt eine Analyse; abgelaufene Einträge zählen als Miss und werden gelöscht."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM reflection_cache WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM reflection_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                "UPDATE reflection_cache SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        
+        return ResponseAnalysis.model_validate_json(value)
+    
+    def set(self, key: str, analysis: ResponseAnalysis) -> None:
+        """Speichert eine Analyse und evicted bei Bedarf (TTL zuerst, dann LRU)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reflection_cache (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, analysis.model_dump_json(), now, now)
+            )
+            
+            expired = self._conn.execute(
+                "DELETE FROM reflection_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            
+            overflow = self._conn.execute("SELECT COUNT(*) FROM reflection_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM reflection_cache WHERE key IN "
+                    "(SELECT key FROM reflection_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+            
+            self._conn.commit()
+            self.evictions += expired + max(overflow, 0)
+    
+    async def aget(self, key: str) -> Optional[ResponseAnalysis]:
+        """Wie get(); SQLite-Zugriff läuft im Thread-Pool statt im Event Loop."""
+        return await asyncio.to_thread(self.get, key)
+    
+    async def aset(self, key: str, analysis: ResponseAnalysis) -> None:
+        """Wie set(); SQLite-Zugriff läuft im Thread-Pool statt im Event Loop."""
+        await asyncio.to_thread(self.set, key, analysis)
+    
+    def clear(self) -> None:
+        """Leert den Cache komplett."""
+        with self._lock:
+            self._conn.execute("DELETE FROM reflection_cache")
+            self._conn.commit()
+    
+    def stats(self) -> dict:
+        """Hit/Miss/Eviction Counter für Monitoring."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM reflection_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -0,0 +1,262 @@
+"""
+Metrics Registry - Counter, Gauges und Histogramme im Prometheus Text Format.
+
+Ohne externe Dependency: Aggregation im Prozess, Export über einen kleinen
+HTTP-Endpoint (METRICS_PORT). Labels wie der aktuelle Skill werden per
+ContextVar durchgereicht, damit LLM-Calls tief im Agent-Code ihrem Skill
+zugeordnet werden können.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+import threading
+
+# Latenz-Buckets in Sekunden (LLM-Calls und Graph-Nodes: ms bis Minute)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_labels: ContextVar[dict] = ContextVar("metric_labels", default={})
+_usage: ContextVar[Optional["UsageAccumulator"]] = ContextVar("llm_usage", default=None)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Basis: Name, Help-Text und Werte pro Label-Kombination."""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"]
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Momentaufnahme (z.B. Cache-Größe, Rest-Budget)."""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Verteilung mit kumulativen Buckets, Summe und Anzahl."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_sample(self, key: tuple, state: dict) -> list[str]:
+        lines = []
+        for bound, count in zip(self.buckets, state["counts"]):
+            le = 'le="%s"' % bound
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {state['count']}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Hält alle Metriken eines Prozesses.
+
+    Collectors sind Callbacks, die vor jedem Export Gauges aus bestehenden
+    Statistiken aktualisieren (z.B. Reflection Cache, Prompt Cache).
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Alle Metriken im Prometheus Text Format (Version 0.0.4)."""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️ Metrics Collector Fehler: {e}")
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def metric_labels(**labels):
+    """Setzt Labels (z.B. skill) für alle Metriken im aktuellen Kontext."""
+    token = _labels.set({**_labels.get(), **{k: v for k, v in labels.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def current_label(name: str, default: str = "unknown") -> str:
+    return _labels.get().get(name, default)
+
+
+class UsageAccumulator:
+    """Summiert LLM-Calls, Tokens und Kosten eines Abschnitts (z.B. eines Graph-Nodes)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.tokens = 0
+        self.cost_usd = 0.0
+        self.queue_wait = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, tokens: int, cost_usd: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+            self.cost_usd += cost_usd
+    
+    def add_queue_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_wait += seconds
+
+
+@contextmanager
+def track_llm_usage():
+    """Sammelt alle LLM-Calls im Kontext (auch in Child-Tasks und kopierten Thread-Kontexten)."""
+    accumulator = UsageAccumulator()
+    token = _usage.set(accumulator)
+    try:
+        yield accumulator
+    finally:
+        _usage.reset(token)
+
+
+def current_usage() -> Optional[UsageAccumulator]:
+    return _usage.get()
+
+
+_usage_listeners: list[Callable[[dict, int, float], None]] = []
+
+
+def add_usage_listener(listener: Callable[[dict, int, float], None]) -> None:
+    """Registriert einen Callback (labels, tokens, cost_usd) für jeden LLM-Call (z.B. Budgets)."""
+    _usage_listeners.append(listener)
+
+
+def report_usage(tokens: int, cost_usd: float) -> None:
+    """Meldet einen LLM-Call an den Accumulator des Kontexts und alle Listener."""
+    accumulator = _usage.get()
+    if accumulator is not None:
+        accumulator.add(tokens, cost_usd)
+    
+    labels = _labels.get()
+    for listener in _usage_listeners:
+        try:
+            listener(labels, tokens, cost_usd)
+        except Exception as e:
+            print(f"⚠️ Usage Listener Fehler: {e}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Kein Access-Log pro Scrape
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Startet GET /metrics in einem Daemon-Thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"📈 Metrics Endpoint: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,54 @@
+"""
+Migration: importiert bestehende session_<id>.json Dateien in das SQLite Backend.
+
+Ausführen:
+    python -m utils.migrate_sessions --source data/assessments --db data/sessions.sqlite
+
+Der Import ist idempotent: bereits vorhandene Sessions werden übersprungen.
+"""
+import argparse
+
+from utils.session_store import JsonFileBackend, SQLiteBackend
+
+
+def migrate(source_dir: str, db_path: str) -> dict:
+    """
+    Kopiert alle JSON-Sessions in die SQLite-Datenbank.
+
+    Returns:
+        Dict mit imported/skipped/failed Counts
+    """
+    source = JsonFileBackend(source_dir)
+    target = SQLiteBackend(db_path)
+    stats = {"imported": 0, "skipped": 0, "failed": 0}
+
+    try:
+        for session_file in sorted(source.assessments_dir.glob("session_*.json")):
+            try:
+                session = source.load(session_file.stem.removeprefix("session_"))
+                if target.import_session(session):
+                    stats["imported"] += 1
+                else:
+                    stats["skipped"] += 1
+            except Exception as e:
+                print(f"❌ {session_file.name}: {e}")
+                stats["failed"] += 1
+    finally:
+        target.close()
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="data/assessments", help="Verzeichnis mit session_*.json")
+    parser.add_argument("--db", default="data/sessions.sqlite", help="Ziel-Datenbank")
+    args = parser.parse_args()
+
+    stats = migrate(args.source, args.db)
+    print(f"✅ Migration fertig: {stats['imported']} importiert, "
+          f"{stats['skipped']} übersprungen, {stats['failed']} fehlgeschlagen")
+
+
+if __name__ == "__main__":
+    main()
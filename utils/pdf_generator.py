@@ -1,66 +1,190 @@
 """
 PDF Report Generator für EI-Assessment
 Erstellt 2-seitige Reports mit Radar Chart
+
+Alles, was für jeden Teilnehmer gleich ist (Seite 1 ohne Name/Datum,
+Überschriften, Radar-Gitter und Seitenzahlen auf Seite 2), wird einmal pro
+Prozess und Template-Version als Form XObject vorgerendert (pdfrw); pro Report
+werden nur noch die Felder darüber gezeichnet.
 """
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.platypus import Table, TableStyle
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-import numpy as np
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+from utils.framework import get_framework
+import importlib.util
 import io
+import math
+import os
+import threading
+
+# Bei jeder Layout-Änderung erhöhen - ungültig macht alle gecachten Reports (utils/report_cache.py)
+TEMPLATE_VERSION = "4"
+
+# Radar Chart (Layout wie der frühere matplotlib-Polarplot, aber als Vektorgrafik)
+RADAR_COLOR = "#2E86AB"
+RADAR_GRID_COLOR = "#B0B0B0"
+RADAR_MAX_SCORE = 5
+
 
-# Dimensionen nach Goleman
-DIMENSIONS = ["Selbstwahrnehmung", "Selbststeuerung", "Motivation", "Empathie", "Soziale Kompetenz"]
+def _radar_area(height: float) -> tuple[float, float, float, float]:
+    """Zielbereich des Radar Charts auf Seite 2 (Gitter und Scores müssen deckungsgleich sein)."""
+    return 4*cm, height - 14*cm, 13*cm, 9*cm
 
 
-def create_radar_chart(session_data: dict, output_path: str) -> str:
+# Vorgerenderte statische Seiten: (Template-Version, [Form XObject pro Seite])
+_template = None
+_template_lock = threading.Lock()
+
+
+def radar_scores(session_data: dict) -> list[tuple[str, float]]:
     """
-    Erstellt Radar Chart für alle getesteten Dimensionen.
-    
-    Args:
-        session_data: Session mit assessments
-        output_path: Pfad für Chart-Image
+    Agent-Scores aller Dimensionen in Framework-Reihenfolge (0 = nicht getestet).
     
     Returns:
-        Pfad zum gespeicherten Chart
+        [(Dimension, Score)]
     """
-    # Sammle Scores
-    scores = {dim: 0 for dim in DIMENSIONS}
+    framework = get_framework()
+    scores = {skill_id: 0 for skill_id in framework.skill_ids}
     
+    # Über die Skill-id, ältere Assessments nur mit Namen
     for assessment in session_data["assessments"]:
-        skill_name = assessment["skill_name"]
-        agent_score = assessment["agent_score"]
-        scores[skill_name] = agent_score
+        skill_id = assessment.get("skill_id") or framework.resolve(assessment["skill_name"])
+        if skill_id in scores:
+            scores[skill_id] = assessment["agent_score"]
     
-    # Radar Chart Setup
-    angles = np.linspace(0, 2 * np.pi, len(DIMENSIONS), endpoint=False).tolist()
-    values = [scores[dim] for dim in DIMENSIONS]
+    return [(framework.name(skill_id), scores[skill_id]) for skill_id in framework.skill_ids]
+
+
+def _radar_geometry(x: float, y: float, width: float, height: float, count: int):
+    """Mittelpunkt, Radius und Winkel (erste Dimension rechts, dann gegen den Uhrzeigersinn wie matplotlib polar)."""
+    center_x, center_y = x + width / 2, y + height / 2
+    radius = min(width, height) / 2 - 1.0*cm
+    angles = [2 * math.pi * i / count for i in range(count)]
     
-    # Schließe den Kreis
-    angles += angles[:1]
-    values += values[:1]
+    def point(angle: float, value: float) -> tuple[float, float]:
+        r = radius * value / RADAR_MAX_SCORE
+        return center_x + r * math.cos(angle), center_y + r * math.sin(angle)
     
-    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
-    ax.plot(angles, values, 'o-', linewidth=2, color='#2E86AB', label='Agent-Score')
-    ax.fill(angles, values, alpha=0.25, color='#2E86AB')
-    ax.set_ylim(0, 5)
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(DIMENSIONS, size=12)
-    ax.set_yticks([1, 2, 3, 4, 5])
-    ax.set_yticklabels(['1', '2', '3', '4', '5'])
-    ax.grid(True)
+    return center_x, center_y, radius, angles, point
+
+
+def draw_radar_grid(c: canvas.Canvas, x: float, y: float, width: float, height: float) -> None:
+    """
+    Zeichnet den statischen Teil des Radar Charts (Gitter, Skala, Dimensionsnamen).
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    Args:
+        c: Canvas der aktuellen Seite
+        x, y, width, height: Zielbereich (Chart zentriert, Labels innerhalb)
+    """
+    framework = get_framework()
+    names = [framework.name(skill_id) for skill_id in framework.skill_ids]
+    center_x, center_y, radius, angles, point = _radar_geometry(x, y, width, height, len(names))
+    
+    c.saveState()
+    
+    # Gitter: Kreise pro Score-Stufe und Speichen pro Dimension
+    c.setStrokeColor(colors.HexColor(RADAR_GRID_COLOR))
+    c.setLineWidth(0.5)
+    for level in range(1, RADAR_MAX_SCORE):
+        c.circle(center_x, center_y, radius * level / RADAR_MAX_SCORE, fill=0, stroke=1)
+    for angle in angles:
+        c.line(center_x, center_y, *point(angle, RADAR_MAX_SCORE))
+    c.setStrokeColor(colors.black)
+    c.circle(center_x, center_y, radius, fill=0, stroke=1)
+    
+    # Score-Skala entlang 22.5°
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica", 7)
+    for level in range(1, RADAR_MAX_SCORE + 1):
+        label_x, label_y = point(math.radians(22.5), level)
+        c.drawString(label_x + 1, label_y + 1, str(level))
+    
+    # Dimensionen außerhalb des Kreises, je nach Seite links/rechts ausgerichtet
+    c.setFont("Helvetica", 9)
+    for name, angle in zip(names, angles):
+        label_x, label_y = point(angle, RADAR_MAX_SCORE)
+        label_x += 0.3*cm * math.cos(angle)
+        label_y += 0.3*cm * math.sin(angle) - 3
+        if math.cos(angle) > 0.1:
+            c.drawString(label_x, label_y, name)
+        elif math.cos(angle) < -0.1:
+            c.drawRightString(label_x, label_y, name)
+        else:
+            c.drawCentredString(label_x, label_y + 3 * math.sin(angle), name)
+    
+    c.restoreState()
+
+
+def draw_radar_scores(c: canvas.Canvas, session_data: dict, x: float, y: float, width: float, height: float) -> None:
+    """
+    Zeichnet die Agent-Scores (transparente Fläche, Linie und Marker) über das Gitter.
+    
+    Args:
+        c: Canvas der aktuellen Seite
+        session_data: Session mit assessments
+        x, y, width, height: Zielbereich wie bei draw_radar_grid
+    """
+    dimensions = radar_scores(session_data)
+    _, _, _, angles, point = _radar_geometry(x, y, width, height, len(dimensions))
+    
+    points = [point(angle, score or 0) for (_, score), angle in zip(dimensions, angles)]
+    path = c.beginPath()
+    path.moveTo(*points[0])
+    for px, py in points[1:]:
+        path.lineTo(px, py)
+    path.close()
+    
+    c.saveState()
+    c.setFillColor(colors.HexColor(RADAR_COLOR))
+    c.setStrokeColor(colors.HexColor(RADAR_COLOR))
+    c.setFillAlpha(0.25)
+    c.drawPath(path, fill=1, stroke=0)
+    c.setFillAlpha(1)
+    c.setLineWidth(2)
+    c.setLineJoin(1)
+    c.drawPath(path, fill=0, stroke=1)
+    for px, py in points:
+        c.circle(px, py, 2.5, fill=1, stroke=0)
+    c.restoreState()
+
+
+def draw_radar_chart(c: canvas.Canvas, session_data: dict, x: float, y: float, width: float, height: float) -> None:
+    """
+    Zeichnet den Radar Chart aller Dimensionen direkt auf den Canvas.
     
-    return output_path
+    Args:
+        c: Canvas der aktuellen Seite
+        session_data: Session mit assessments
+        x, y, width, height: Zielbereich (Chart zentriert, Labels innerhalb)
+    """
+    draw_radar_grid(c, x, y, width, height)
+    draw_radar_scores(c, session_data, x, y, width, height)
+
+
+def report_template_version() -> str:
+    """Template-Version inkl. Framework-Version (Dimensionsnamen stehen im Report)."""
+    return f"{TEMPLATE_VERSION}:{get_framework().version}"
+
+
+def report_date(session_data: dict) -> datetime:
+    """Datum des letzten Assessments (Report-Inhalt hängt nur von den Session-Daten ab)."""
+    timestamps = [a["timestamp"] for a in session_data["assessments"] if a.get("timestamp")]
+    try:
+        return datetime.fromisoformat(max(timestamps)) if timestamps else datetime.now()
+    except ValueError:
+        return datetime.now()
+
+
+def report_filename(participant_name: str, created: datetime = None) -> str:
+    """Dateiname des Reports (nur sichere Zeichen aus dem Namen)."""
+    created = created or datetime.now()
+    safe_name = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in participant_name.strip()) or "Report"
+    return f"EI_Report_{safe_name}_{created.strftime('%Y%m%d_%H%M%S')}.pdf"
 
 
 def generate_pdf_report(
@@ -69,7 +193,7 @@ def generate_pdf_report(
     output_dir: Path
 ) -> str:
     """
-    Generiert kompletten 2-seitigen PDF-Report.
+    Generiert den Report und schreibt ihn als Datei (Archiv, Tools).
     
     Args:
         session_data: Session mit allen assessments
@@ -79,23 +203,14 @@ def generate_pdf_report(
     Returns:
         Pfad zum generierten PDF
     """
-    # Erstelle Output-Verzeichnis
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Dateinamen
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    pdf_path = output_dir / f"EI_Report_{participant_name}_{timestamp}.pdf"
-    chart_path = output_dir / f"radar_chart_{timestamp}.png"
-    
-    # Erstelle Radar Chart
-    create_radar_chart(session_data, str(chart_path))
-    
-    # PDF erstellen
-    c = canvas.Canvas(str(pdf_path), pagesize=A4)
-    width, height = A4
-    
-# ============ SEITE 1: INTRO ============
-    
+    pdf_path = output_dir / report_filename(participant_name)
+    pdf_path.write_bytes(render_pdf_report(session_data, participant_name))
+    return str(pdf_path)
+
+
+def _draw_intro_static(c: canvas.Canvas, width: float, height: float) -> None:
+    """Seite 1 ohne Name und Datum (für alle Teilnehmer gleich)."""
     # Farbiger Header-Bereich
     c.setFillColor(colors.HexColor("#2E86AB"))
     c.rect(0, height - 5.5*cm, width, 3*cm, fill=1, stroke=0)
@@ -125,15 +240,6 @@ def generate_pdf_report(
     # Zurück zu schwarz für Rest
     c.setFillColor(colors.black)
     
-    # Teilnehmer Name
-    c.setFont("Helvetica-Bold", 16)
-    c.drawCentredString(width/2, height - 7*cm, participant_name)
-    
-    # Datum
-    c.setFont("Helvetica", 12)
-    date_str = datetime.now().strftime("%d. %B %Y")
-    c.drawCentredString(width/2, height - 8*cm, f"Assessment durchgeführt am: {date_str}")
-    
     # Linie
     c.setStrokeColor(colors.HexColor("#2E86AB"))
     c.setLineWidth(2)
@@ -204,29 +310,55 @@ def generate_pdf_report(
     c.setFillColor(colors.grey)
     c.drawString(3*cm, 2*cm, "Powered by Multi-Agent AI System | Basierend auf STAR-Interview & Goleman Framework")
     c.drawRightString(width - 3*cm, 2*cm, "Seite 1/2")
+
+
+def _draw_intro_fields(c: canvas.Canvas, session_data: dict, participant_name: str, width: float, height: float) -> None:
+    """Name und Datum auf Seite 1."""
+    c.setFillColor(colors.black)
     
-    # Neue Seite
-    c.showPage()
-    
-    # ============ SEITE 2: ERGEBNISSE ============
+    # Teilnehmer Name
+    c.setFont("Helvetica-Bold", 16)
+    c.drawCentredString(width/2, height - 7*cm, participant_name)
     
+    # Datum
+    c.setFont("Helvetica", 12)
+    date_str = report_date(session_data).strftime("%d. %B %Y")
+    c.drawCentredString(width/2, height - 8*cm, f"Assessment durchgeführt am: {date_str}")
+
+
+def _draw_results_static(c: canvas.Canvas, width: float, height: float) -> None:
+    """Überschriften, Radar-Gitter und Seitenzahl auf Seite 2."""
     # Header
     c.setFillColor(colors.black)
     c.setFont("Helvetica-Bold", 20)
     c.drawCentredString(width/2, height - 2.5*cm, "DEINE ERGEBNISSE")
     
+    # Radar Chart (Gitter)
+    draw_radar_grid(c, *_radar_area(height))
+    
+    # Detaillierte Scores
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(3*cm, height - 16*cm, "DETAILLIERTE SCORES")
+    
+    # Footer
+    c.setFont("Helvetica-Oblique", 9)
+    c.setFillColor(colors.grey)
+    c.drawRightString(width - 3*cm, 2*cm, "Seite 2/2")
+
+
+def _draw_results_fields(c: canvas.Canvas, session_data: dict, width: float, height: float) -> None:
+    """Scores, Radar-Fläche, Details und Stärken/Entwicklungspotenzial auf Seite 2."""
+    c.setFillColor(colors.black)
+    
     # Getestete Dimensionen
     num_tested = len(session_data["assessments"])
     c.setFont("Helvetica", 12)
     c.drawCentredString(width/2, height - 3.5*cm, f"Getestete Dimensionen: {num_tested}/5")
     
-    # Radar Chart
-    c.drawImage(str(chart_path), 4*cm, height - 14*cm, width=13*cm, height=9*cm, preserveAspectRatio=True)
-    
-    # Detaillierte Scores
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(3*cm, height - 16*cm, "DETAILLIERTE SCORES")
+    # Radar Chart (Scores)
+    draw_radar_scores(c, session_data, *_radar_area(height))
     
+    c.setFillColor(colors.black)
     detail_y = height - 17.5*cm
     
     for assessment in session_data["assessments"]:
@@ -285,12 +417,95 @@ def generate_pdf_report(
     c.setFont("Helvetica-Oblique", 9)
     c.setFillColor(colors.grey)
     c.drawString(3*cm, 2*cm, f"Validiert durch Multi-Agent System | N={num_tested} behavioral assessments")
-    c.drawRightString(width - 3*cm, 2*cm, "Seite 2/2")
+
+
+def _render_static_pages() -> bytes:
+    """Beide Seiten nur mit den statischen Teilen als PDF."""
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    _draw_intro_static(c, width, height)
+    c.showPage()
+    _draw_results_static(c, width, height)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _template_enabled() -> bool:
+    setting = os.getenv("PDF_PRERENDER_TEMPLATE", "auto").lower()
+    if setting == "auto":
+        return importlib.util.find_spec("pdfrw") is not None
+    return setting == "true"
+
+
+def _template_pages() -> Optional[list]:
+    """
+    Statische Seiten als Form XObjects (pdfrw), einmal pro Prozess und
+    Template-Version gerendert. None = direkt zeichnen (pdfrw fehlt oder
+    PDF_PRERENDER_TEMPLATE=false).
+    """
+    global _template
+    if not _template_enabled():
+        return None
+    
+    version = report_template_version()
+    with _template_lock:
+        if _template is None or _template[0] != version:
+            from pdfrw import PdfReader
+            from pdfrw.buildxobj import pagexobj
+            
+            pages = [pagexobj(page) for page in PdfReader(fdata=_render_static_pages()).pages]
+            _template = (version, pages)
+        return _template[1]
+
+
+def _draw_template_page(c: canvas.Canvas, page) -> None:
+    from pdfrw.toreportlab import makerl
+    
+    c.doForm(makerl(c, page))
+
+
+def prerender_template() -> bool:
+    """Rendert das Template vorab (z.B. beim Start eines Worker-Prozesses)."""
+    return _template_pages() is not None
+
+
+def render_pdf_report(session_data: dict, participant_name: str) -> bytes:
+    """
+    Generiert kompletten 2-seitigen PDF-Report im Speicher.
+    
+    Die statischen Teile beider Seiten kommen - wenn möglich - aus dem
+    vorgerenderten Template, gezeichnet werden nur noch die Felder.
+    
+    Args:
+        session_data: Session mit allen assessments
+        participant_name: Name des Teilnehmers
+    
+    Returns:
+        PDF als Bytes
+    """
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    template = _template_pages()
+    
+    # ============ SEITE 1: INTRO ============
+    if template:
+        _draw_template_page(c, template[0])
+    else:
+        _draw_intro_static(c, width, height)
+    _draw_intro_fields(c, session_data, participant_name, width, height)
+    c.showPage()
+    
+    # ============ SEITE 2: ERGEBNISSE ============
+    if template:
+        _draw_template_page(c, template[1])
+    else:
+        _draw_results_static(c, width, height)
+    _draw_results_fields(c, session_data, width, height)
     
     # Save PDF
     c.save()
     
-    # Cleanup Chart
-    chart_path.unlink()
-    
-    return str(pdf_path)
\ No newline at end of file
+    return buffer.getvalue()
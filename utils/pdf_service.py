@@ -0,0 +1,272 @@
+"""
+PDF Rendering Service - erzeugt Reports in einem Prozess-Pool statt im Event Loop.
+
+Das Rendern ist reine CPU-Arbeit (reportlab); direkt in einer
+Chainlit-Coroutine blockiert sie alle verbundenen User für die ganze Dauer.
+Der Service rendert in PDF_RENDER_WORKERS Prozessen. Weitere Jobs warten in
+einer FIFO-Queue mit höchstens PDF_RENDER_QUEUE Plätzen; ist sie voll, wird der
+Job sofort mit PDFServiceBusy abgelehnt statt den Server zu überlasten.
+
+Reports kommen als Bytes zurück und werden direkt an die Session geschickt;
+nur mit PDF_ARCHIVE_DIR schreibt archive() sie zusätzlich im Hintergrund auf
+die Platte.
+
+Jeder Job hat ein Timeout (PDF_RENDER_TIMEOUT). Hängt ein Worker, werden neue
+Jobs auf einen frischen Pool geleitet und der alte beendet; Jobs, die dabei
+abbrechen, laufen einmal auf dem neuen Pool weiter.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from utils.metrics import registry
+import asyncio
+import multiprocessing
+import os
+import time
+
+StatusCallback = Callable[[str], Awaitable[None]]
+
+PDF_RENDER_DURATION = registry.histogram(
+    "ei_pdf_render_seconds", "Dauer einer PDF-Generierung im Worker-Prozess",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+PDF_QUEUE_WAIT = registry.histogram(
+    "ei_pdf_queue_wait_seconds", "Wartezeit eines PDF-Jobs in der Queue",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+PDF_JOBS = registry.counter(
+    "ei_pdf_jobs_total", "PDF-Jobs nach Ergebnis", ("outcome",)
+)
+
+
+class PDFServiceBusy(RuntimeError):
+    """Queue voll - der Job wurde nicht angenommen."""
+
+
+def _render(session_data: dict, participant_name: str) -> tuple[bytes, float]:
+    """Läuft im Worker-Prozess; das PDF kommt als Bytes zurück (keine Datei)."""
+    from utils.pdf_generator import render_pdf_report
+    
+    start = time.perf_counter()
+    pdf_bytes = render_pdf_report(session_data, participant_name)
+    return pdf_bytes, time.perf_counter() - start
+
+
+def _write_archive(archive_dir: Path, filename: str, pdf_bytes: bytes) -> Path:
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    target = archive_dir / filename
+    partial = target.with_suffix(".pdf.part")
+    partial.write_bytes(pdf_bytes)
+    os.replace(partial, target)
+    return target
+
+
+def _warm_up() -> None:
+    """Importiert reportlab und rendert das statische Template im Worker vorab (erster Report sonst ~0.5s langsamer)."""
+    from utils.pdf_generator import prerender_template
+    
+    prerender_template()
+
+
+class PDFRenderService:
+    """
+    Prozess-Pool mit begrenzter Job-Queue für PDF-Reports.
+
+    Nur aus einem Event Loop verwenden (Queue-Verwaltung ist nicht thread-safe).
+    """
+    
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_tasks_per_child: Optional[int] = None
+    ):
+        """
+        Args:
+            max_workers: Worker-Prozesse (Default PDF_RENDER_WORKERS bzw. 2)
+            max_queue: Wartende Jobs, darüber wird abgelehnt (Default PDF_RENDER_QUEUE bzw. 20)
+            timeout: Sekunden pro Job im Worker (Default PDF_RENDER_TIMEOUT bzw. 60)
+            max_tasks_per_child: Worker nach N Jobs neu starten, begrenzt Speicherwachstum
+                (Default PDF_RENDER_MAX_TASKS_PER_CHILD bzw. 50, 0 = nie)
+        """
+        self.max_workers = max_workers or int(os.getenv("PDF_RENDER_WORKERS", "2"))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("PDF_RENDER_QUEUE", "20"))
+        self.timeout = timeout or float(os.getenv("PDF_RENDER_TIMEOUT", "60"))
+        if max_tasks_per_child is None:
+            max_tasks_per_child = int(os.getenv("PDF_RENDER_MAX_TASKS_PER_CHILD", "50"))
+        self.max_tasks_per_child = max_tasks_per_child or None
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._running = 0
+        self._waiting: list[tuple[asyncio.Future, Optional[StatusCallback]]] = []
+        self._archive_tasks: set[asyncio.Task] = set()
+        registry.add_collector(self._collect)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: kein fork eines Prozesses mit Event Loop, Threads und offenen Sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._executor
+    
+    def start(self) -> list:
+        """Startet die Worker im Hintergrund vor (nicht blockierend, gibt die Futures zurück)."""
+        executor = self._get_executor()
+        return [executor.submit(_warm_up) for _ in range(self.max_workers)]
+    
+    def warm_up(self) -> None:
+        """Wie start(), wartet aber, bis alle Worker bereit sind."""
+        for future in self.start():
+            future.result()
+    
+    def _retire(self, executor: ProcessPoolExecutor) -> None:
+        """Ersetzt einen Pool mit hängendem Worker; laufende Jobs darauf brechen ab."""
+        if self._executor is not executor:
+            return
+        self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        print("⚠️ PDF-Worker hängt - Prozess-Pool neu gestartet")
+    
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+    
+    async def _notify_positions(self) -> None:
+        for position, (_, on_status) in enumerate(list(self._waiting), start=1):
+            if on_status is None:
+                continue
+            try:
+                await on_status(f"⏳ In der Warteschlange (Position {position})")
+            except Exception as e:
+                # Statusmeldung ist optional (z.B. Session inzwischen getrennt)
+                print(f"⚠️ PDF-Status nicht gesendet: {e}")
+    
+    async def _acquire(self, on_status: Optional[StatusCallback]) -> None:
+        if self._running < self.max_workers and not self._waiting:
+            self._running += 1
+            return
+        if len(self._waiting) >= self.max_queue:
+            PDF_JOBS.inc(outcome="rejected")
+            raise PDFServiceBusy(f"PDF-Queue voll ({self.max_queue} Jobs)")
+        
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, on_status)
+        self._waiting.append(entry)
+        start = time.perf_counter()
+        try:
+            if on_status is not None:
+                await on_status(f"⏳ In der Warteschlange (Position {len(self._waiting)})")
+            await waiter
+        except BaseException:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+            elif waiter.done() and not waiter.cancelled():
+                # Slot wurde schon übergeben, der Job aber abgebrochen → weitergeben
+                self._release()
+            raise
+        PDF_QUEUE_WAIT.observe(time.perf_counter() - start)
+    
+    def _release(self) -> None:
+        """Gibt den Slot an den nächsten wartenden Job weiter (oder frei)."""
+        if self._waiting:
+            waiter, _ = self._waiting.pop(0)
+            waiter.set_result(None)
+            asyncio.ensure_future(self._notify_positions())
+        else:
+            self._running -= 1
+    
+    async def _run(self, args: tuple, retry: bool = True) -> tuple[bytes, float]:
+        executor = self._get_executor()
+        future = asyncio.wrap_future(executor.submit(_render, *args))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._retire(executor)
+            raise
+        except BrokenProcessPool:
+            # Pool wurde wegen eines anderen hängenden Jobs ersetzt (oder ein Worker ist abgestürzt)
+            if self._executor is executor:
+                self._executor = None
+            if not retry:
+                raise
+            return await self._run(args, retry=False)
+    
+    async def render(
+        self,
+        session_data: dict,
+        participant_name: str,
+        on_status: Optional[StatusCallback] = None
+    ) -> bytes:
+        """
+        Erzeugt den Report in einem Worker-Prozess.
+
+        Args:
+            session_data / participant_name: wie render_pdf_report
+            on_status: async Callback für Statusmeldungen (Queue-Position, Rendering)
+
+        Returns:
+            PDF als Bytes
+
+        Raises:
+            PDFServiceBusy: Queue voll
+            TimeoutError: Job hat länger als timeout gedauert
+        """
+        await self._acquire(on_status)
+        try:
+            if on_status is not None:
+                await on_status("🖨️ Erstelle Report mit Radar Chart...")
+            pdf_bytes, duration = await self._run((session_data, participant_name))
+        except asyncio.TimeoutError:
+            PDF_JOBS.inc(outcome="timeout")
+            raise
+        except Exception:
+            PDF_JOBS.inc(outcome="error")
+            raise
+        finally:
+            self._release()
+        
+        PDF_RENDER_DURATION.observe(duration)
+        PDF_JOBS.inc(outcome="ok")
+        return pdf_bytes
+    
+    def archive(self, pdf_bytes: bytes, filename: str) -> Optional[asyncio.Task]:
+        """
+        Schreibt den Report im Hintergrund nach PDF_ARCHIVE_DIR (nichts, wenn nicht gesetzt).
+        
+        Returns:
+            Task des Schreibvorgangs oder None
+        """
+        archive_dir = os.getenv("PDF_ARCHIVE_DIR")
+        if not archive_dir:
+            return None
+        
+        task = asyncio.ensure_future(asyncio.to_thread(_write_archive, Path(archive_dir), filename, pdf_bytes))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_done)
+        return task
+    
+    def _archive_done(self, task: asyncio.Task) -> None:
+        self._archive_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ PDF-Archivierung fehlgeschlagen: {task.exception()}")
+    
+    async def flush_archive(self) -> None:
+        """Wartet auf alle laufenden Archiv-Schreibvorgänge (z.B. beim Shutdown)."""
+        if self._archive_tasks:
+            await asyncio.gather(*self._archive_tasks, return_exceptions=True)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _collect(self) -> None:
+        registry.gauge("ei_pdf_queue_depth", "Wartende PDF-Jobs").set(self.queue_depth())
+        registry.gauge("ei_pdf_jobs_running", "PDF-Jobs in den Worker-Prozessen").set(self._running)
@@ -0,0 +1,308 @@
+"""
+Rate Limiter für alle LLM-Calls - Token Buckets für Requests/min und Tokens/min.
+
+Statt dass jede Session ungebremst Calls abschickt (429 → Retries mit
+Backoff → lange Tail-Latenzen), wartet jeder Call vor dem Request auf einen
+Slot. Wartende Calls stehen in einer Priority Queue: interaktive Sessions
+kommen vor Batch-Jobs (llm_priority). Mit LLM_RATE_LIMIT_DB teilen sich
+mehrere Prozesse (Chainlit Worker, batch_assess.py) die Buckets über SQLite.
+
+Tokens sind erst nach dem Call bekannt und werden dann abgebucht; ein
+negativer Token-Bucket hält die nächsten Calls zurück, bis er nachgefüllt ist.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.rate_limiters import BaseRateLimiter
+from utils.metrics import registry, add_usage_listener, current_usage
+from pathlib import Path
+from typing import Optional
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+# Wartezeit des laufenden Calls; mutable, weil LangChain den Request in einem Child-Task ausführt
+_wait_holder: ContextVar[Optional[list]] = ContextVar("llm_queue_wait", default=None)
+
+QUEUE_WAIT = registry.histogram(
+    "ei_llm_queue_wait_seconds", "Wartezeit eines LLM-Calls im Rate Limiter", ("priority",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Setzt die Priorität aller LLM-Calls im Kontext (auch in Child-Tasks)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def begin_queue_wait() -> list:
+    """
+    Legt beim Start eines Calls (im Kontext des Aufrufers) den Platz an,
+    in den der Limiter die Wartezeit schreibt: holder[0] in Sekunden.
+    """
+    holder = [0.0]
+    _wait_holder.set(holder)
+    return holder
+
+
+def _refill(level: float, updated: float, capacity: float, now: float) -> float:
+    return min(capacity, level + (now - updated) * capacity / 60.0)
+
+
+def _take(levels: dict, limits: dict, reserve: float, now: float) -> float:
+    """
+    Versucht einen Request-Slot zu nehmen (levels wird in-place aktualisiert).
+
+    Args:
+        levels: {bucket: [level, updated]}
+        limits: {bucket: Kapazität pro Minute}
+        reserve: Anteil der Kapazität, der für höhere Prioritäten frei bleibt
+
+    Returns:
+        0.0 bei Erfolg, sonst Sekunden bis zum nächsten sinnvollen Versuch
+    """
+    wait = 0.0
+    for bucket, capacity in limits.items():
+        level, updated = levels.setdefault(bucket, [capacity, now])
+        level = _refill(level, updated, capacity, now)
+        levels[bucket] = [level, now]
+        
+        # Requests brauchen einen ganzen Slot, Tokens nur einen nicht-negativen Stand
+        needed = capacity * reserve + (1.0 if bucket == "requests" else 0.0)
+        if level < needed:
+            wait = max(wait, (needed - level) * 60.0 / capacity)
+    
+    if wait == 0.0 and "requests" in limits:
+        levels["requests"][0] -= 1.0
+    return wait
+
+
+class _MemoryBuckets:
+    """Bucket-Stand im Prozess."""
+    
+    def __init__(self, limits: dict):
+        self.limits = limits
+        self._levels = {}
+        self._lock = threading.Lock()
+    
+    def try_take(self, reserve: float) -> float:
+        with self._lock:
+            return _take(self._levels, self.limits, reserve, time.time())
+    
+    def debit(self, tokens: int) -> None:
+        if "tokens" not in self.limits:
+            return
+        with self._lock:
+            level, updated = self._levels.setdefault("tokens", [self.limits["tokens"], time.time()])
+            self._levels["tokens"] = [level - tokens, updated]
+
+
+class _SQLiteBuckets:
+    """Bucket-Stand in SQLite, geteilt von allen Prozessen mit derselben Datei."""
+    
+    def __init__(self, limits: dict, path: str):
+        self.limits = limits
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)"
+        )
+        self._lock = threading.Lock()
+    
+    def _transaction(self, update) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {
+                    name: [level, updated]
+                    for name, level, updated in self._conn.execute("SELECT name, level, updated FROM rate_buckets")
+                }
+                result = update(levels)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets (name, level, updated) VALUES (?, ?, ?)",
+                    [(name, level, updated) for name, (level, updated) in levels.items()]
+                )
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def try_take(self, reserve: float) -> float:
+        return self._transaction(lambda levels: _take(levels, self.limits, reserve, time.time()))
+    
+    def debit(self, tokens: int) -> None:
+        if "tokens" not in self.limits:
+            return
+        
+        def update(levels):
+            level, updated = levels.setdefault("tokens", [self.limits["tokens"], time.time()])
+            levels["tokens"] = [level - tokens, updated]
+        
+        self._transaction(update)
+
+
+class LLMRateLimiter(BaseRateLimiter):
+    """
+    Token Buckets (Requests/min, Tokens/min) mit Priority Queue.
+
+    Wird den Chat-Modellen als rate_limiter übergeben; LangChain ruft
+    acquire/aacquire direkt vor jedem Request auf.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        db_path: Optional[str] = None,
+        batch_reserve: float = 0.2,
+        poll_interval: float = 0.05
+    ):
+        """
+        Args:
+            requests_per_minute / tokens_per_minute: Limits (0 = kein Limit für diesen Bucket)
+            db_path: SQLite-Datei für prozessübergreifende Buckets (None = nur im Prozess)
+            batch_reserve: Anteil der Kapazität, den Batch-Calls nicht nutzen dürfen
+                (hält auch über Prozessgrenzen Platz für interaktive Sessions frei)
+            poll_interval: Prüfintervall wartender Calls hinter dem Kopf der Queue
+        """
+        limits = {}
+        if requests_per_minute:
+            limits["requests"] = float(requests_per_minute)
+        if tokens_per_minute:
+            limits["tokens"] = float(tokens_per_minute)
+        self._buckets = _SQLiteBuckets(limits, db_path) if db_path else _MemoryBuckets(limits)
+        self.batch_reserve = batch_reserve
+        self.poll_interval = poll_interval
+        
+        self._waiters: list[list] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        
+        # Abbuchung nach dem Call; SQLite nicht im Event Loop (Lock anderer Prozesse)
+        self._debit_executor = None
+        if isinstance(self._buckets, _SQLiteBuckets):
+            self._debit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+        add_usage_listener(self._on_usage)
+        registry.add_collector(self._collect)
+    
+    def _on_usage(self, labels: dict, tokens: int, cost_usd: float) -> None:
+        if self._debit_executor is not None:
+            self._debit_executor.submit(self._buckets.debit, tokens)
+        else:
+            self._buckets.debit(tokens)
+    
+    def _enqueue(self) -> list:
+        entry = [_priority.get(), next(self._sequence)]
+        with self._lock:
+            heapq.heappush(self._waiters, entry)
+        return entry
+    
+    def _dequeue(self, entry: list) -> None:
+        with self._lock:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+    
+    def _attempt(self, entry: list) -> float:
+        """0.0 = Slot bekommen, sonst Sekunden bis zum nächsten Versuch."""
+        with self._lock:
+            if self._waiters[0] is not entry:
+                return self.poll_interval
+        
+        reserve = self.batch_reserve if entry[0] >= PRIORITY_BATCH else 0.0
+        wait = self._buckets.try_take(reserve)
+        return wait if wait == 0.0 else min(wait, 1.0)
+    
+    def _record_wait(self, entry: list, start: float) -> None:
+        wait = time.perf_counter() - start
+        QUEUE_WAIT.observe(wait, priority=PRIORITY_NAMES.get(entry[0], str(entry[0])))
+        holder = _wait_holder.get()
+        if holder is not None:
+            holder[0] += wait
+        usage = current_usage()
+        if usage is not None:
+            usage.add_queue_wait(wait)
+    
+    def acquire(self, *, blocking: bool = True) -> bool:
+        entry = self._enqueue()
+        start = time.perf_counter()
+        try:
+            while True:
+                wait = self._attempt(entry)
+                if wait == 0.0:
+                    self._record_wait(entry, start)
+                    return True
+                if not blocking:
+                    return False
+                time.sleep(wait)
+        finally:
+            self._dequeue(entry)
+    
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        entry = self._enqueue()
+        start = time.perf_counter()
+        try:
+            while True:
+                # SQLite-Buckets können kurz auf den Lock anderer Prozesse warten
+                if isinstance(self._buckets, _SQLiteBuckets):
+                    wait = await asyncio.to_thread(self._attempt, entry)
+                else:
+                    wait = self._attempt(entry)
+                if wait == 0.0:
+                    self._record_wait(entry, start)
+                    return True
+                if not blocking:
+                    return False
+                await asyncio.sleep(wait)
+        finally:
+            self._dequeue(entry)
+    
+    def queue_depth(self) -> dict[str, int]:
+        """Wartende Calls pro Priorität."""
+        with self._lock:
+            priorities = [entry[0] for entry in self._waiters]
+        return {name: priorities.count(priority) for priority, name in PRIORITY_NAMES.items()}
+    
+    def _collect(self) -> None:
+        depth = registry.gauge("ei_llm_queue_depth", "Wartende LLM-Calls im Rate Limiter", ("priority",))
+        for name, count in self.queue_depth().items():
+            depth.set(count, priority=name)
+
+
+_limiter: Optional[LLMRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[LLMRateLimiter]:
+    """Prozessweiter Limiter aus LLM_RATE_LIMIT_* (None, wenn beide Limits 0 sind)."""
+    global _limiter
+    rpm = float(os.getenv("LLM_RATE_LIMIT_RPM", "0") or 0)
+    tpm = float(os.getenv("LLM_RATE_LIMIT_TPM", "0") or 0)
+    if not rpm and not tpm:
+        return None
+    
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = LLMRateLimiter(
+                requests_per_minute=rpm,
+                tokens_per_minute=tpm,
+                db_path=os.getenv("LLM_RATE_LIMIT_DB") or None,
+                batch_reserve=float(os.getenv("LLM_RATE_LIMIT_BATCH_RESERVE", "0.2"))
+            )
+        return _limiter
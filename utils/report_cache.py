@@ -0,0 +1,222 @@
+"""
+Cache für fertige PDF-Reports.
+Key = Hash aus (Teilnehmer-Name, Assessments, Template-Version),
+Value = PDF-Bytes - im Speicher (LRU) und opt-in in SQLite (LRU, REPORT_CACHE_DB).
+
+Ein unveränderter Report (gleicher Name, keine neuen Assessments) wird ohne
+Rendering ausgeliefert. Beide Ebenen sind über ihre Gesamtgröße begrenzt.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from utils.metrics import registry
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+REPORT_CACHE_LOOKUPS = registry.counter(
+    "ei_report_cache_lookups_total", "Report-Cache Lookups nach Ergebnis", ("result",)
+)
+REPORT_CACHE_EVICTIONS = registry.counter(
+    "ei_report_cache_evictions_total", "Aus dem Report-Cache verdrängte Reports", ("tier",)
+)
+
+
+class ReportCache:
+    """
+    Zwei Ebenen: Speicher-LRU für wiederholte Downloads in derselben Instanz,
+    SQLite-LRU für Neustarts und mehrere Worker.
+
+    Thread-safe; Zugriffe auf SQLite aus dem Event Loop über aget/aset.
+    Die Datenbank wird erst beim ersten Zugriff geöffnet.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_bytes: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            path: SQLite-Datei (Default REPORT_CACHE_DB; leer = nur Speicher)
+            max_memory_bytes: Limit der Speicher-Ebene (Default REPORT_CACHE_MEMORY_MB bzw. 32 MB)
+            max_disk_bytes: Limit der SQLite-Ebene (Default REPORT_CACHE_DISK_MB bzw. 256 MB)
+        """
+        if path is None:
+            path = os.getenv("REPORT_CACHE_DB", "")
+        if max_memory_bytes is None:
+            max_memory_bytes = int(float(os.getenv("REPORT_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+        if max_disk_bytes is None:
+            max_disk_bytes = int(float(os.getenv("REPORT_CACHE_DISK_MB", "256")) * 1024 * 1024)
+        self.path = path
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self.evictions = {"memory": 0, "disk": 0}
+        
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        
+        self._conn: Optional[sqlite3.Connection] = None
+        registry.add_collector(self._collect)
+    
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """SQLite-Verbindung, beim ersten Aufruf geöffnet (Lock muss gehalten werden)."""
+        if self._conn is None and self.path:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS report_cache (
+                    key TEXT PRIMARY KEY,
+                    pdf BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_report_cache_access ON report_cache(last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+    
+    @staticmethod
+    def make_key(participant_name: str, assessments: list[dict], template_version: str) -> str:
+        """SHA-256 über alle Inputs, die den Report-Inhalt bestimmen."""
+        payload = json.dumps(
+            [participant_name, assessments, template_version],
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _remember(self, key: str, pdf_bytes: bytes) -> None:
+        """Speicher-Ebene aktualisieren (Lock muss gehalten werden)."""
+        if len(pdf_bytes) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = pdf_bytes
+        self._memory_bytes += len(pdf_bytes)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions["memory"] += 1
+            REPORT_CACHE_EVICTIONS.inc(tier="memory")
+    
+    def get_cached(self, key: str) -> Optional[bytes]:
+        """Nur Speicher-Ebene (ohne I/O, direkt im Event Loop nutzbar)."""
+        with self._lock:
+            pdf_bytes = self._memory.get(key)
+            if pdf_bytes is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                REPORT_CACHE_LOOKUPS.inc(result="hit_memory")
+            return pdf_bytes
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Lädt einen Report; Treffer auf der Platte wandern in den Speicher."""
+        pdf_bytes = self.get_cached(key)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        return self._get_disk(key)
+    
+    def _get_disk(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            conn = self._connection()
+            row = None
+            if conn is not None:
+                row = conn.execute("SELECT pdf FROM report_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                REPORT_CACHE_LOOKUPS.inc(result="miss")
+                return None
+            
+            conn.execute("UPDATE report_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            pdf_bytes = bytes(row[0])
+            self._remember(key, pdf_bytes)
+            self.hits["disk"] += 1
+            REPORT_CACHE_LOOKUPS.inc(result="hit_disk")
+        return pdf_bytes
+    
+    def set(self, key: str, pdf_bytes: bytes) -> None:
+        """Speichert einen Report in beiden Ebenen und evicted nach LRU."""
+        with self._lock:
+            self._remember(key, pdf_bytes)
+            conn = self._connection()
+            if conn is None:
+                return
+            
+            conn.execute(
+                "INSERT OR REPLACE INTO report_cache (key, pdf, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, pdf_bytes, len(pdf_bytes), time.time())
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM report_cache").fetchone()[0]
+            if total > self.max_disk_bytes:
+                # Älteste Einträge löschen, bis die Summe wieder unter dem Limit liegt
+                evict = []
+                for old_key, size in conn.execute(
+                    "SELECT key, size FROM report_cache ORDER BY last_access ASC"
+                ):
+                    if total <= self.max_disk_bytes:
+                        break
+                    evict.append((old_key,))
+                    total -= size
+                conn.executemany("DELETE FROM report_cache WHERE key = ?", evict)
+                self.evictions["disk"] += len(evict)
+                REPORT_CACHE_EVICTIONS.inc(len(evict), tier="disk")
+            conn.commit()
+    
+    async def aget(self, key: str) -> Optional[bytes]:
+        """Wie get(); SQLite-Zugriffe laufen im Thread-Pool."""
+        pdf_bytes = self.get_cached(key)
+        if pdf_bytes is not None:
+            return pdf_bytes
+        if not self.path:
+            return self._get_disk(key)  # zählt nur den Miss
+        return await asyncio.to_thread(self._get_disk, key)
+    
+    async def aset(self, key: str, pdf_bytes: bytes) -> None:
+        """Wie set(); SQLite-Zugriffe laufen im Thread-Pool."""
+        if not self.path:
+            self.set(key, pdf_bytes)
+        else:
+            await asyncio.to_thread(self.set, key, pdf_bytes)
+    
+    def stats(self) -> dict:
+        """Hit/Miss/Eviction Counter und Größen für Monitoring."""
+        with self._lock:
+            disk_entries, disk_bytes = 0, 0
+            if self._conn is not None:
+                disk_entries, disk_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM report_cache"
+                ).fetchone()
+            hits = sum(self.hits.values())
+            total = hits + self.misses
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "evictions": dict(self.evictions),
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+                "hit_rate": round(hits / total, 3) if total else 0.0
+            }
+    
+    def _collect(self) -> None:
+        """Collector: Größen der Ebenen (Lookups/Evictions sind Counter)."""
+        stats = self.stats()
+        size = registry.gauge("ei_report_cache_bytes", "Größe des Report-Caches", ("tier",))
+        size.set(stats["memory_bytes"], tier="memory")
+        size.set(stats["disk_bytes"], tier="disk")
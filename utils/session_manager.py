@@ -1,64 +1,276 @@
 """Session Management für Multi-Dimension Assessments"""
-import json
-from pathlib import Path
-from datetime import datetime
-from typing import Dict, List
-import uuid
+import asyncio
+import copy
+from collections import OrderedDict
+from typing import Optional
+
+from utils.framework import get_framework
+from utils.session_store import SessionBackend, create_backend, new_session, empty_usage, add_to_usage
+
+# Obergrenze für den Backoff, mit dem fehlgeschlagene Flushes wiederholt werden (Sekunden)
+FLUSH_RETRY_MAX_DELAY = 30.0
+
+
+def compute_progress(session: dict) -> dict:
+    """Berechnet Progress aus einem Session-Dokument (Skills aus der aktuellen Framework-Registry)"""
+    tested = [a["skill_id"] for a in session["assessments"]]
+    skill_ids = get_framework().skill_ids
+    return {
+        "count": len(tested),
+        "total": len(skill_ids),
+        "tested": tested,
+        "remaining": [s for s in skill_ids if s not in tested],
+        "can_download_pdf": len(tested) >= 3
+    }
 
 
 class SessionManager:
-    """Verwaltet Session History und JSON Export"""
+    """Verwaltet Session History über ein austauschbares Storage Backend"""
     
-    def __init__(self):
-        self.assessments_dir = Path("data/assessments")
-        self.assessments_dir.mkdir(parents=True, exist_ok=True)
+    def __init__(self, backend: Optional[SessionBackend] = None):
+        # Default: SESSION_BACKEND (json | sqlite)
+        self.backend = backend or create_backend()
     
     def add_assessment(self, session_id: str, assessment_data: dict) -> None:
         """Fügt Assessment zu Session hinzu"""
-        session_file = self.assessments_dir / f"session_{session_id}.json"
-        
-        if session_file.exists():
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session = json.load(f)
-        else:
-            session = {
-                "session_id": session_id,
-                "created_at": datetime.now().isoformat(),
-                "user_consented": False,
-                "assessments": []
-            }
-        
-        session["assessments"].append(assessment_data)
-        session["updated_at"] = datetime.now().isoformat()
-        
-        with open(session_file, 'w', encoding='utf-8') as f:
-            json.dump(session, f, indent=2, ensure_ascii=False)
+        self.backend.append_assessment(session_id, assessment_data)
     
     def get_session(self, session_id: str) -> dict:
         """Lädt Session Data"""
-        session_file = self.assessments_dir / f"session_{session_id}.json"
-        if session_file.exists():
-            with open(session_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {"assessments": []}
+        return self.backend.load(session_id) or {"assessments": []}
     
     def update_consent(self, session_id: str, consented: bool) -> None:
         """Updated User Consent"""
-        session_file = self.assessments_dir / f"session_{session_id}.json"
-        if session_file.exists():
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session = json.load(f)
-            session["user_consented"] = consented
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session, f, indent=2, ensure_ascii=False)
+        self.backend.set_consent(session_id, consented)
     
     def get_progress(self, session_id: str) -> dict:
         """Berechnet Progress"""
-        session = self.get_session(session_id)
-        tested = [a["skill_id"] for a in session["assessments"]]
-        return {
-            "count": len(tested),
-            "tested": tested,
-            "remaining": [s for s in ["self_awareness", "self_regulation", "motivation", "empathy", "social_skills"] if s not in tested],
-            "can_download_pdf": len(tested) >= 3
-        }
\ No newline at end of file
+        return compute_progress(self.get_session(session_id))
+    
+    def add_usage(self, session_id: str, day: str, tokens: int, cost_usd: float, llm_calls: int = 1) -> None:
+        """Bucht LLM-Verbrauch (Tokens, Kosten) auf Session und Tag"""
+        self.backend.add_usage(session_id, day, tokens, cost_usd, llm_calls)
+    
+    def daily_usage(self, day: str) -> dict:
+        """LLM-Verbrauch aller Sessions an einem Tag"""
+        return self.backend.daily_usage(day)
+
+
+class _CachedSession:
+    """Session-Dokument im Speicher + vorberechneter Progress + noch nicht persistierte Writes"""
+    
+    def __init__(self, session: Optional[dict]):
+        self.session = session
+        self.pending: list[tuple[str, object]] = []
+        self._progress: Optional[dict] = None
+        self._progress_version: Optional[float] = None
+    
+    def progress(self) -> dict:
+        """Progress, neu berechnet nach neuen Assessments oder einem Framework-Reload"""
+        version = get_framework().version
+        if self._progress is None or self._progress_version != version:
+            self._progress = compute_progress(self.session or {"assessments": []})
+            self._progress_version = version
+        return self._progress
+    
+    def invalidate_progress(self) -> None:
+        self._progress = None
+
+
+class AsyncSessionManager:
+    """
+    Async SessionManager mit In-Process Cache und Write-Behind.
+    
+    Reads kommen aus dem Cache (Progress ist vorberechnet), Writes werden sofort
+    im Cache sichtbar und von einem Background-Flusher per Thread ins Backend
+    geschrieben - der Event Loop macht nie Datei- oder DB-I/O.
+    """
+    
+    def __init__(
+        self,
+        backend: Optional[SessionBackend] = None,
+        max_sessions: int = 1000,
+        flush_interval: float = 0.5
+    ):
+        """
+        Args:
+            backend: Storage Backend (Default aus SESSION_BACKEND)
+            max_sessions: Max. Sessions im Cache; idle Sessions werden per LRU verdrängt
+            flush_interval: Max. Verzögerung (Sekunden) bis ein Write persistiert ist
+        """
+        self.backend = backend or create_backend()
+        self.max_sessions = max_sessions
+        self.flush_interval = flush_interval
+        
+        self._cache: OrderedDict[str, _CachedSession] = OrderedDict()
+        self._loading: dict[str, asyncio.Future] = {}
+        self._dirty: set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+    
+    async def _entry(self, session_id: str) -> _CachedSession:
+        """Cache-Eintrag einer Session (lädt beim ersten Zugriff per Thread)."""
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            self._cache.move_to_end(session_id)
+            return entry
+        
+        # Parallele Zugriffe auf dieselbe Session teilen sich einen Load
+        loading = self._loading.get(session_id)
+        if loading is None:
+            loading = asyncio.ensure_future(asyncio.to_thread(self.backend.load, session_id))
+            self._loading[session_id] = loading
+            try:
+                session = await loading
+            finally:
+                self._loading.pop(session_id, None)
+            entry = self._cache.setdefault(session_id, _CachedSession(session))
+            self._evict_idle()
+        else:
+            await loading
+            entry = self._cache[session_id]
+        
+        self._cache.move_to_end(session_id)
+        return entry
+    
+    def _evict_idle(self) -> None:
+        """LRU: verdrängt die ältesten Sessions ohne ausstehende Writes."""
+        overflow = len(self._cache) - self.max_sessions
+        if overflow <= 0:
+            return
+        for session_id in list(self._cache):
+            if overflow <= 0:
+                break
+            if session_id not in self._dirty:
+                del self._cache[session_id]
+                overflow -= 1
+    
+    async def get_session(self, session_id: str) -> dict:
+        """Lädt Session Data (Kopie, damit Aufrufer den Cache nicht verändern)"""
+        entry = await self._entry(session_id)
+        return copy.deepcopy(entry.session) if entry.session else {"assessments": []}
+    
+    async def get_progress(self, session_id: str) -> dict:
+        """Vorberechneter Progress aus dem Cache"""
+        entry = await self._entry(session_id)
+        return copy.deepcopy(entry.progress())
+    
+    async def add_assessment(self, session_id: str, assessment_data: dict) -> None:
+        """Fügt Assessment hinzu (sofort im Cache, persistiert per Write-Behind)"""
+        entry = await self._entry(session_id)
+        if entry.session is None:
+            entry.session = new_session(session_id)
+        entry.session["assessments"].append(assessment_data)
+        entry.invalidate_progress()
+        self._schedule(session_id, entry, ("append", assessment_data))
+    
+    async def update_consent(self, session_id: str, consented: bool) -> None:
+        """Updated User Consent (nur für existierende Sessions, wie SessionManager)"""
+        entry = await self._entry(session_id)
+        if entry.session is None:
+            return
+        entry.session["user_consented"] = consented
+        self._schedule(session_id, entry, ("consent", consented))
+    
+    async def add_usage(self, session_id: str, day: str, tokens: int, cost_usd: float, llm_calls: int = 1) -> None:
+        """Bucht LLM-Verbrauch auf Session und Tag (sofort im Cache, persistiert per Write-Behind)"""
+        entry = await self._entry(session_id)
+        if entry.session is None:
+            entry.session = new_session(session_id)
+        usage = entry.session.setdefault("usage", {**empty_usage(), "days": {}})
+        add_to_usage(usage, tokens, cost_usd, llm_calls)
+        add_to_usage(usage["days"].setdefault(day, empty_usage()), tokens, cost_usd, llm_calls)
+        self._schedule(session_id, entry, ("usage", (day, tokens, cost_usd, llm_calls)))
+    
+    async def daily_usage(self, day: str) -> dict:
+        """LLM-Verbrauch aller Sessions an einem Tag (inkl. noch nicht persistierter Writes)"""
+        usage = await asyncio.to_thread(self.backend.daily_usage, day)
+        for entry in self._cache.values():
+            for kind, value in entry.pending:
+                if kind == "usage" and value[0] == day:
+                    add_to_usage(usage, *value[1:])
+        return usage
+    
+    def _schedule(self, session_id: str, entry: _CachedSession, op: tuple) -> None:
+        """Merkt einen Write vor und weckt den Flusher."""
+        entry.pending.append(op)
+        self._dirty.add(session_id)
+        
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flusher = asyncio.create_task(self._flush_loop(), name="session-write-behind")
+        self._wakeup.set()
+    
+    async def _flush_loop(self) -> None:
+        """
+        Background-Flusher: sammelt Writes kurz und schreibt sie gebündelt.
+        Schlägt ein Flush fehl, wird er mit exponentiellem Backoff wiederholt,
+        statt bis zum nächsten Write nur im Speicher zu liegen.
+        """
+        failures = 0
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            if await self.flush():
+                failures += 1
+                await asyncio.sleep(min(self.flush_interval * 2 ** failures, FLUSH_RETRY_MAX_DELAY))
+                self._wakeup.set()
+            else:
+                failures = 0
+    
+    def _apply(self, session_id: str, ops: list[tuple]) -> None:
+        """Schreibt die Writes einer Session in Reihenfolge ins Backend (läuft im Thread)."""
+        while ops:
+            kind, value = ops[0]
+            if kind == "append":
+                self.backend.append_assessment(session_id, value)
+            elif kind == "consent":
+                self.backend.set_consent(session_id, value)
+            elif kind == "usage":
+                self.backend.add_usage(session_id, *value)
+            # Erst nach erfolgreichem Write entfernen → kein doppeltes Append beim Retry
+            ops.pop(0)
+    
+    async def flush(self) -> int:
+        """
+        Persistiert alle ausstehenden Writes (z.B. beim Shutdown).
+        
+        Returns:
+            Anzahl Sessions, deren Writes fehlgeschlagen sind (bleiben vorgemerkt)
+        """
+        if self._flush_lock is None:
+            return 0
+        failed = 0
+        async with self._flush_lock:
+            for session_id in list(self._dirty):
+                entry = self._cache.get(session_id)
+                if entry is None or not entry.pending:
+                    self._dirty.discard(session_id)
+                    continue
+                
+                ops, entry.pending = entry.pending, []
+                try:
+                    await asyncio.to_thread(self._apply, session_id, ops)
+                except Exception as e:
+                    # Nicht geschriebene Ops beim nächsten Flush erneut versuchen
+                    print(f"❌ Session Flush fehlgeschlagen ({session_id}): {e}")
+                    entry.pending = ops + entry.pending
+                    failed += 1
+                    continue
+                
+                # Dirty bleibt, bis alles persistiert ist (schützt vor LRU-Eviction)
+                if not entry.pending:
+                    self._dirty.discard(session_id)
+            
+            self._evict_idle()
+        return failed
+    
+    async def close(self) -> None:
+        """Flush + Flusher beenden."""
+        await self.flush()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
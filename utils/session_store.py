@@ -0,0 +1,371 @@
+"""
+Storage Backends für den SessionManager.
+JSON-Dateien (eine Datei pro Session) oder SQLite (WAL, indizierte Tabellen).
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class SessionBackend(ABC):
+    """
+    Interface für Session-Storage. Sessions haben das Format der JSON-Dateien.
+    Ein Backend ohne alle Methoden lässt sich nicht instanziieren.
+    """
+    
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[dict]:
+        """Lädt eine Session oder None, wenn sie nicht existiert."""
+    
+    @abstractmethod
+    def append_assessment(self, session_id: str, assessment_data: dict) -> None:
+        """Hängt ein Assessment an (legt die Session bei Bedarf an)."""
+    
+    @abstractmethod
+    def set_consent(self, session_id: str, consented: bool) -> None:
+        """Setzt den Consent einer existierenden Session."""
+    
+    @abstractmethod
+    def add_usage(self, session_id: str, day: str, tokens: int, cost_usd: float, llm_calls: int) -> None:
+        """Bucht LLM-Verbrauch auf Session und Tag (legt die Session bei Bedarf an)."""
+    
+    @abstractmethod
+    def daily_usage(self, day: str) -> dict:
+        """Summierter LLM-Verbrauch aller Sessions an einem Tag (ISO-Datum)."""
+
+
+def empty_usage() -> dict:
+    """Leerer Verbrauchs-Zähler (Session, Tag)."""
+    return {"tokens": 0, "cost_usd": 0.0, "llm_calls": 0}
+
+
+def add_to_usage(usage: dict, tokens: int, cost_usd: float, llm_calls: int) -> None:
+    usage["tokens"] += tokens
+    usage["cost_usd"] = round(usage["cost_usd"] + cost_usd, 6)
+    usage["llm_calls"] += llm_calls
+
+
+def new_session(session_id: str) -> dict:
+    """Leere Session im gemeinsamen Dokument-Format."""
+    return {
+        "session_id": session_id,
+        "created_at": datetime.now().isoformat(),
+        "user_consented": False,
+        "assessments": []
+    }
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """Exklusiver Advisory Lock (prozess- und threadübergreifend) auf einer Lock-Datei."""
+    with open(lock_path, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_json(path: Path, data: dict) -> None:
+    """
+    Schreibt JSON crash-safe: Temp-Datei + fsync + rename.
+    
+    Leser sehen so immer entweder die alte oder die neue, nie eine halbe Datei.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    
+    # Rename selbst persistieren (nur POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class JsonFileBackend(SessionBackend):
+    """
+    Eine JSON-Datei pro Session unter data/assessments.
+    
+    Read-Modify-Write läuft unter einem Advisory Lock pro Session und
+    schreibt atomar, damit mehrere Worker (oder Tabs) keine Assessments verlieren.
+    """
+    
+    def __init__(self, assessments_dir: str = "data/assessments"):
+        self.assessments_dir = Path(assessments_dir)
+        self.assessments_dir.mkdir(parents=True, exist_ok=True)
+        self.locks_dir = self.assessments_dir / ".locks"
+        self.locks_dir.mkdir(exist_ok=True)
+    
+    def _path(self, session_id: str) -> Path:
+        return self.assessments_dir / f"session_{session_id}.json"
+    
+    def _locked(self, session_id: str):
+        """Lock für das Read-Modify-Write einer Session."""
+        return file_lock(self.locks_dir / f"session_{session_id}.lock")
+    
+    def load(self, session_id: str) -> Optional[dict]:
+        session_file = self._path(session_id)
+        try:
+            with open(session_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _write(self, session_id: str, session: dict) -> None:
+        atomic_write_json(self._path(session_id), session)
+    
+    def append_assessment(self, session_id: str, assessment_data: dict) -> None:
+        with self._locked(session_id):
+            session = self.load(session_id) or new_session(session_id)
+            session["assessments"].append(assessment_data)
+            session["updated_at"] = datetime.now().isoformat()
+            self._write(session_id, session)
+    
+    def set_consent(self, session_id: str, consented: bool) -> None:
+        with self._locked(session_id):
+            session = self.load(session_id)
+            if session is not None:
+                session["user_consented"] = consented
+                self._write(session_id, session)
+    
+    def _daily_path(self) -> Path:
+        return self.assessments_dir / "usage_daily.json"
+    
+    def add_usage(self, session_id: str, day: str, tokens: int, cost_usd: float, llm_calls: int) -> None:
+        with self._locked(session_id):
+            session = self.load(session_id) or new_session(session_id)
+            usage = session.setdefault("usage", {**empty_usage(), "days": {}})
+            add_to_usage(usage, tokens, cost_usd, llm_calls)
+            add_to_usage(usage["days"].setdefault(day, empty_usage()), tokens, cost_usd, llm_calls)
+            self._write(session_id, session)
+        
+        # Tages-Summe aller Sessions in einer eigenen Datei (sonst müssten alle Sessions gelesen werden)
+        with file_lock(self.locks_dir / "usage_daily.lock"):
+            try:
+                with open(self._daily_path(), 'r', encoding='utf-8') as f:
+                    daily = json.load(f)
+            except FileNotFoundError:
+                daily = {}
+            add_to_usage(daily.setdefault(day, empty_usage()), tokens, cost_usd, llm_calls)
+            atomic_write_json(self._daily_path(), daily)
+    
+    def daily_usage(self, day: str) -> dict:
+        try:
+            with open(self._daily_path(), 'r', encoding='utf-8') as f:
+                return json.load(f).get(day) or empty_usage()
+        except FileNotFoundError:
+            return empty_usage()
+
+
+class SQLiteBackend(SessionBackend):
+    """
+    SQLite im WAL-Modus: Append-only Inserts für Assessments,
+    transaktionale Consent-Updates, Indizes für Auswertungen.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            created_at TEXT NOT NULL,
+            updated_at TEXT,
+            user_consented INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL REFERENCES sessions(session_id),
+            skill_id TEXT,
+            created_at TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_assessments_session ON assessments(session_id, id);
+        CREATE INDEX IF NOT EXISTS idx_assessments_skill ON assessments(skill_id);
+        CREATE INDEX IF NOT EXISTS idx_sessions_consent ON sessions(user_consented);
+        CREATE TABLE IF NOT EXISTS usage (
+            session_id TEXT NOT NULL REFERENCES sessions(session_id),
+            day TEXT NOT NULL,
+            tokens INTEGER NOT NULL DEFAULT 0,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            llm_calls INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (session_id, day)
+        );
+        CREATE INDEX IF NOT EXISTS idx_usage_day ON usage(day);
+    """
+    
+    def __init__(self, db_path: str = "data/sessions.sqlite"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+    
+    def load(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, updated_at, user_consented FROM sessions WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            assessments = self._conn.execute(
+                "SELECT data FROM assessments WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            ).fetchall()
+            usage_rows = self._conn.execute(
+                "SELECT day, tokens, cost_usd, llm_calls FROM usage WHERE session_id = ? ORDER BY day",
+                (session_id,)
+            ).fetchall()
+        
+        created_at, updated_at, consented = row
+        session = {
+            "session_id": session_id,
+            "created_at": created_at,
+            "user_consented": bool(consented),
+            "assessments": [json.loads(data) for (data,) in assessments]
+        }
+        if updated_at:
+            session["updated_at"] = updated_at
+        if usage_rows:
+            usage = {**empty_usage(), "days": {}}
+            for day, tokens, cost_usd, llm_calls in usage_rows:
+                usage["days"][day] = {"tokens": tokens, "cost_usd": cost_usd, "llm_calls": llm_calls}
+                add_to_usage(usage, tokens, cost_usd, llm_calls)
+            session["usage"] = usage
+        return session
+    
+    def append_assessment(self, session_id: str, assessment_data: dict) -> None:
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)",
+                (session_id, now)
+            )
+            self._conn.execute(
+                "UPDATE sessions SET updated_at = ? WHERE session_id = ?",
+                (now, session_id)
+            )
+            self._conn.execute(
+                "INSERT INTO assessments (session_id, skill_id, created_at, data) VALUES (?, ?, ?, ?)",
+                (session_id, assessment_data.get("skill_id"), now, json.dumps(assessment_data, ensure_ascii=False))
+            )
+    
+    def set_consent(self, session_id: str, consented: bool) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sessions SET user_consented = ? WHERE session_id = ?",
+                (int(consented), session_id)
+            )
+    
+    def add_usage(self, session_id: str, day: str, tokens: int, cost_usd: float, llm_calls: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at) VALUES (?, ?)",
+                (session_id, datetime.now().isoformat())
+            )
+            self._conn.execute(
+                "INSERT INTO usage (session_id, day, tokens, cost_usd, llm_calls) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(session_id, day) DO UPDATE SET "
+                "tokens = tokens + excluded.tokens, "
+                "cost_usd = cost_usd + excluded.cost_usd, "
+                "llm_calls = llm_calls + excluded.llm_calls",
+                (session_id, day, tokens, cost_usd, llm_calls)
+            )
+    
+    def daily_usage(self, day: str) -> dict:
+        with self._lock:
+            tokens, cost_usd, llm_calls = self._conn.execute(
+                "SELECT COALESCE(SUM(tokens), 0), COALESCE(SUM(cost_usd), 0), COALESCE(SUM(llm_calls), 0) "
+                "FROM usage WHERE day = ?",
+                (day,)
+            ).fetchone()
+        return {"tokens": tokens, "cost_usd": round(cost_usd, 6), "llm_calls": llm_calls}
+    
+    def import_session(self, session: dict) -> bool:
+        """
+        Importiert eine Session im JSON-Format (Migration).
+        
+        Returns:
+            False wenn die Session bereits existiert (Import ist idempotent)
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, created_at, updated_at, user_consented) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    session["session_id"],
+                    session.get("created_at") or datetime.now().isoformat(),
+                    session.get("updated_at"),
+                    int(session.get("user_consented", False))
+                )
+            )
+            if cursor.rowcount == 0:
+                return False
+            
+            self._conn.executemany(
+                "INSERT INTO assessments (session_id, skill_id, created_at, data) VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        session["session_id"],
+                        assessment.get("skill_id"),
+                        assessment.get("timestamp") or session.get("created_at") or datetime.now().isoformat(),
+                        json.dumps(assessment, ensure_ascii=False)
+                    )
+                    for assessment in session.get("assessments", [])
+                ]
+            )
+            self._conn.executemany(
+                "INSERT INTO usage (session_id, day, tokens, cost_usd, llm_calls) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (session["session_id"], day, usage["tokens"], usage["cost_usd"], usage["llm_calls"])
+                    for day, usage in session.get("usage", {}).get("days", {}).items()
+                ]
+            )
+        return True
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_backend(name: Optional[str] = None) -> SessionBackend:
+    """Backend nach Name oder SESSION_BACKEND ("json" | "sqlite")."""
+    name = name or os.getenv("SESSION_BACKEND", "json")
+    if name == "sqlite":
+        return SQLiteBackend(os.getenv("SESSION_DB_PATH", "data/sessions.sqlite"))
+    if name == "json":
+        return JsonFileBackend(os.getenv("SESSION_DIR", "data/assessments"))
+    raise ValueError(f"Unbekanntes Session Backend: {name}")